@@ -0,0 +1,122 @@
+"""Compares the size of the database of minutes, and of the text stored in
+it, and the time to read its text back when the text is stored as is,
+compressed with zlib, or compressed with a zlib (or zstd, if it's
+installed) dictionary trained on the pages. The corpus is made of the
+pages of the sample pdfs in tests/parse/, shuffled and renumbered into
+synthetic meetings
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_compress
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from common.compress_utils import TextCodec, zstandard
+from common.db_utils import (
+    compress_text,
+    connect,
+    create_schema,
+    load_minutes,
+    minutes_text,
+    train_codec,
+)
+from tests.db.db_data import fake_minutes
+from common.parse_utils import clean_raw_text, parse_pdf
+
+PDF_DIR = Path("tests/parse")
+
+
+def sample_pages():
+    """Returns the cleaned pages of the sample pdfs"""
+    pages = []
+    for pdf_path in sorted(PDF_DIR.glob("*.pdf")):
+        try:
+            minutes = parse_pdf(pdf_path)
+        except ValueError:
+            continue
+        pages += [
+            clean_raw_text(page, profiles=minutes.profiles) for page in minutes.pages
+        ]
+    return pages
+
+
+def synthetic_minutes(pages, count, pages_per_meeting, seed=0):
+    """Yields stand-ins for parsed Minutes objects made of sample pages with
+    their numbers changed, so that no two meetings are identical"""
+    rand = random.Random(seed)
+    for i in range(count):
+        meeting_pages = [
+            re.sub(r"\d", lambda _: str(rand.randrange(10)), page)
+            for page in rand.sample(pages, min(pages_per_meeting, len(pages)))
+        ]
+        yield fake_minutes(
+            f"meeting_{i:05d}.pdf",
+            meeting_pages,
+            meeting_date=f"{2009 + i // 50}-01-01",
+            clean_text=" ".join(meeting_pages),
+            sha256=f"{i:064x}",
+        )
+
+
+def measure(db_path, filenames):
+    """Returns the size of the database file and of the text stored in it,
+    and the time to read the text of every meeting"""
+    conn = connect(db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    (text_size,) = conn.execute(
+        "SELECT (SELECT SUM(LENGTH(min_text)) FROM minutes) "
+        "+ (SELECT SUM(LENGTH(page_text)) FROM minutes_pages)"
+    ).fetchone()
+    start = time.perf_counter()
+    for filename in filenames:
+        minutes_text(conn, filename)
+    seconds = time.perf_counter() - start
+    conn.close()
+    return db_path.stat().st_size, text_size, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=60, help="per meeting")
+    args = parser.parse_args()
+
+    pages = sample_pages()
+    minutes = list(synthetic_minutes(pages, args.meetings, args.pages))
+    filenames = [m.pdf_path.name for m in minutes]
+    methods = {"plain": None, "zlib": lambda conn: TextCodec()}
+    methods["zlib + dictionary"] = lambda conn: train_codec(conn)
+    if zstandard:
+        methods["zstd + dictionary"] = lambda conn: train_codec(conn, method="zstd")
+
+    print(
+        f"{'storage':>18} {'db size (MB)':>13} {'text (MB)':>10} {'ratio':>6} "
+        f"{'read (ms)':>10}"
+    )
+    baseline = None
+    for name, make_codec in methods.items():
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "minutes.db"
+            conn = connect(db_path)
+            create_schema(conn)
+            load_minutes(conn, minutes)
+            if make_codec:
+                compress_text(conn, make_codec(conn))
+            else:
+                conn.execute("VACUUM")
+            conn.close()
+            size, text_size, seconds = measure(db_path, filenames)
+        baseline = baseline or text_size
+        print(
+            f"{name:>18} {size / 1e6:>13.1f} {text_size / 1e6:>10.1f} "
+            f"{baseline / text_size:>5.1f}x {seconds * 1e3:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
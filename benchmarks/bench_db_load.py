@@ -0,0 +1,112 @@
+"""Compares loading the minutes and their pages one row per transaction, with
+SQLite's default rollback journal, against load_minutes() which inserts
+batches of meetings with executemany() in a transaction per batch on a WAL
+database. Also times lookups by date, which use the min_date_idx index
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_db_load
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from common.db_utils import (
+    connect,
+    create_schema,
+    load_minutes,
+    minutes_row,
+    page_rows,
+    MINUTES_SQL,
+    PAGES_SQL,
+)
+from tests.db.db_data import fake_minutes
+
+
+def synthetic_minutes(count, text_size):
+    """Yields stand-ins for parsed Minutes objects"""
+    text = ("BOARD OF ESTIMATES MINUTES " * (text_size // 27 + 1))[:text_size]
+    start = date(2009, 1, 7)
+    for i in range(count):
+        meeting_date = start + timedelta(weeks=i)
+        yield fake_minutes(
+            meeting_date.strftime("%Y_%m_%d") + ".pdf",
+            [text[start : start + 3000] for start in range(0, text_size, 3000)],
+            sha256=f"{i:064x}",
+        )
+
+
+def load_row_by_row(db_path, minutes_iter):
+    """Inserts each row in its own transaction with SQLite's default journal
+    and syncing"""
+    conn = connect(db_path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+    create_schema(conn)
+    for minutes in minutes_iter:
+        with conn:
+            min_id = conn.execute(MINUTES_SQL, minutes_row(minutes)).lastrowid
+        for row in page_rows(min_id, minutes):
+            with conn:
+                conn.execute(PAGES_SQL, row)
+    return conn
+
+
+def load_batched(db_path, minutes_iter, batch_size):
+    """Inserts the rows with load_minutes() on a connection with PRAGMAS"""
+    conn = connect(db_path)
+    create_schema(conn)
+    load_minutes(conn, minutes_iter, batch_size)
+    return conn
+
+
+def time_lookups(conn, count):
+    """Times looking up meetings by date"""
+    start = date(2009, 1, 7)
+    started = time.perf_counter()
+    for i in range(0, count, max(1, count // 100)):
+        day = (start + timedelta(weeks=i)).isoformat()
+        conn.execute("SELECT min_id FROM minutes WHERE min_date = ?", (day,)).fetchall()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 1000])
+    parser.add_argument("--text-size", type=int, default=50_000, help="chars")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    print(
+        f"{'meetings':>8} {'row by row (s)':>15} {'batched (s)':>12} {'speedup':>8} "
+        f"{'lookups (ms)':>13}"
+    )
+    for count in args.sizes:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            start = time.perf_counter()
+            conn = load_row_by_row(
+                Path(temp_dir) / "rows.db", synthetic_minutes(count, args.text_size)
+            )
+            row_seconds = time.perf_counter() - start
+            conn.close()
+
+            start = time.perf_counter()
+            conn = load_batched(
+                Path(temp_dir) / "batched.db",
+                synthetic_minutes(count, args.text_size),
+                args.batch_size,
+            )
+            batch_seconds = time.perf_counter() - start
+            lookup_seconds = time_lookups(conn, count)
+            conn.close()
+
+        print(
+            f"{count:>8} {row_seconds:>15.3f} {batch_seconds:>12.3f} "
+            f"{row_seconds / batch_seconds:>7.1f}x {lookup_seconds * 1e3:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
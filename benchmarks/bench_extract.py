@@ -0,0 +1,101 @@
+"""Compares the pdf text-extraction backends in common/extract_utils.py on
+the sample pdfs in tests/parse/. Each backend runs in a fresh process and
+reports the pages extracted per second, how much the peak resident memory
+of the process grew while extracting, and two measures of the quality of
+its cleaned text: the share of words that match the text of a reference
+backend and the number of characters left that are signs of a misread
+encoding, from REPLACEMENT_PROFILES, or that couldn't be decoded at all
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_extract --reference pymupdf
+"""
+
+import argparse
+import difflib
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from common.extract_utils import available_backends, open_pdf
+from common.parse_utils import clean_raw_text, join_pages, text_profiles
+from common.utils import REPLACEMENT_PROFILES
+
+PDF_DIR = Path("tests/parse")
+
+# characters that mean the text was decoded with the wrong encoding
+SUSPECT_CHARS = {"�"}
+for profile in REPLACEMENT_PROFILES.values():
+    SUSPECT_CHARS.update(profile["signature"])
+
+
+def extract(backend, pdf_paths):
+    """Extracts and cleans the text of each pdf, in a worker process
+
+    Returns:
+        pages (int): The number of pages extracted
+        seconds (float): The time spent opening and extracting the pdfs
+        peak_rss (float): The peak resident memory of the process, in MB
+        rss_growth (float): How much the peak grew while extracting, in MB
+        texts (dict): The cleaned text of each pdf
+    """
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    pages = 0
+    texts = {}
+    start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        document = open_pdf(pdf_path, backend)
+        raw_text, _ = join_pages(
+            document.extract_page(i) for i in range(document.page_count)
+        )
+        pages += document.page_count
+        profiles = text_profiles(raw_text, document.producer, backend)
+        texts[pdf_path.name] = clean_raw_text(raw_text, profiles=profiles)
+        document.close()
+    seconds = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return pages, seconds, peak_rss, peak_rss - start_rss, texts
+
+
+def similarity(text, reference):
+    """Returns the share of words in the two texts that line up"""
+    matcher = difflib.SequenceMatcher(None, reference.split(), text.split())
+    return matcher.ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=available_backends())
+    parser.add_argument("--reference", default=None, help="defaults to pymupdf")
+    args = parser.parse_args()
+    reference = args.reference
+    if reference is None:
+        reference = "pymupdf" if "pymupdf" in args.backends else args.backends[0]
+
+    pdf_paths = sorted(PDF_DIR.glob("*.pdf"))
+    context = multiprocessing.get_context("spawn")  # a fresh process per run
+    results = {}
+    for backend in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[backend] = executor.submit(extract, backend, pdf_paths).result()
+
+    print(f"{len(pdf_paths)} pdfs, quality compared to {reference}")
+    print(
+        f"{'backend':>9} {'pages':>6} {'pages/s':>8} {'peak RSS (MB)':>14} "
+        f"{'growth (MB)':>12} {'match':>6} {'suspect chars':>14}"
+    )
+    for backend, (pages, seconds, peak_rss, growth, texts) in results.items():
+        scores = [
+            similarity(text, results[reference][-1][name])
+            for name, text in texts.items()
+        ]
+        suspect = sum(char in SUSPECT_CHARS for text in texts.values() for char in text)
+        print(
+            f"{backend:>9} {pages:>6} {pages / seconds:>8.1f} {peak_rss:>14.1f} "
+            f"{growth:>12.1f} {sum(scores) / len(scores):>6.3f} {suspect:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
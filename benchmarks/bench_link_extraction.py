@@ -0,0 +1,42 @@
+"""Compares the cost of parsing a page of BOE minutes links with a full
+BeautifulSoup tree against parsing only its anchor tags with LINK_STRAINER,
+using the saved html in tests/scrape/sample_boe_page.html
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_link_extraction
+"""
+
+import timeit
+
+from bs4 import BeautifulSoup
+
+from tests.scrape.scrape_data import HTML_TEXT
+from common.scrape_utils import LINK_STRAINER, get_meeting_links, get_year_links
+
+URL = "https://comptroller.baltimorecity.gov/boe/meetings/minutes"
+
+
+def full_parse():
+    soup = BeautifulSoup(HTML_TEXT, "html.parser")
+    return get_year_links(soup), get_meeting_links(soup, URL)
+
+
+def strained_parse():
+    soup = BeautifulSoup(HTML_TEXT, "html.parser", parse_only=LINK_STRAINER)
+    return get_year_links(soup), get_meeting_links(soup, URL)
+
+
+def main(number=50, repeat=5):
+    assert full_parse() == strained_parse()
+    results = {}
+    for name, func in [("full parse", full_parse), ("anchors only", strained_parse)]:
+        best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+        results[name] = best
+        print(f"{name:>14}: {best * 1000:.2f} ms per page")
+    speedup = results["full parse"] / results["anchors only"]
+    print(f"{'speedup':>14}: {speedup:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    main()
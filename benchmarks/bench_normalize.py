@@ -0,0 +1,79 @@
+"""Measures the throughput of cleaning the text extracted from a pdf with
+the compiled TextNormalizer against the chain it replaced, which collapsed
+the whitespace and then made one str.replace() pass per entry in
+REPLACEMENTS. The replacements are also timed on their own, since
+collapsing the whitespace costs the same either way. The text of the
+sample minutes in tests/parse/ is repeated to the size of a large set of
+minutes and the outputs are checked to match
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_normalize
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from common.parse_utils import Minutes
+from common.utils import NORMALIZER, REPLACEMENTS
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+def chained_replace(text):
+    """Replaces the characters the way replace_chars() used to"""
+    for current, new in REPLACEMENTS:
+        text = text.replace(current, new)
+    return text
+
+
+def chained_clean(raw_text):
+    """Cleans the text the way clean_raw_text() used to"""
+    return chained_replace(" ".join(raw_text.split()))
+
+
+def best_time(func, text, repeat):
+    """Returns the output and the fastest of several runs of func(text)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(text)
+        times.append(time.perf_counter() - start)
+    return output, min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    minutes = Minutes(PDF_PATH)
+    minutes.parse_and_clean_pages()
+    sample = minutes.raw_text
+
+    print(f"{'':>6} {'clean (MB/s)':^27} {'replace only (MB/s)':^27}")
+    print(f"{'MB':>6} {'chain':>8} {'compiled':>9} {'speedup':>8}", end="")
+    print(f" {'chain':>8} {'compiled':>9} {'speedup':>8}")
+    stages = [
+        (chained_clean, NORMALIZER.normalize),
+        (chained_replace, NORMALIZER.replace),
+    ]
+    for size in args.sizes:
+        text = sample * max(1, int(size * 1e6 / len(sample)))
+        megabytes = len(text.encode("utf-8")) / 1e6
+        line = f"{megabytes:>6.1f}"
+        for chained, compiled in stages:
+            expected, chain_seconds = best_time(chained, text, args.repeat)
+            output, compiled_seconds = best_time(compiled, text, args.repeat)
+            assert output == expected
+            line += (
+                f" {megabytes / chain_seconds:>8.1f}"
+                f" {megabytes / compiled_seconds:>9.1f}"
+                f" {chain_seconds / compiled_seconds:>7.1f}x"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compares loading a fiscal year of minutes from the Parquet dataset, with
+and without the text of the pages, against parsing the year's pdfs again
+the way the notebook builds text_df. The dataset is made of the pages of
+the sample pdfs in tests/parse/, shuffled and renumbered into a meeting
+every week, and the time to parse a year of pdfs is estimated from the
+time to parse the sample pdf
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_parquet
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from benchmarks.bench_compress import sample_pages
+from common.parquet_utils import export_pages, read_pages, read_text_df
+from common.parse_utils import parse_pdf_row
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+def synthetic_meetings(pages, years, pages_per_meeting, seed=0):
+    """Yields a meeting every week from July 2009, made of sample pages with
+    their numbers changed"""
+    rand = random.Random(seed)
+    meeting_date = date(2009, 7, 1)
+    while meeting_date < date(2009 + years, 7, 1):
+        meeting_pages = [
+            re.sub(r"\d", lambda _: str(rand.randrange(10)), page)
+            for page in rand.sample(pages, min(pages_per_meeting, len(pages)))
+        ]
+        filename = meeting_date.strftime("%Y_%m_%d") + ".pdf"
+        yield filename, meeting_date, 1, meeting_pages, meeting_pages
+        meeting_date += timedelta(weeks=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=100, help="per meeting")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    parse_pdf_row(PDF_PATH)
+    parse_seconds = (time.perf_counter() - start) * 52  # a meeting every week
+
+    pages = sample_pages()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        dataset_dir = Path(temp_dir)
+        start = time.perf_counter()
+        export_pages(synthetic_meetings(pages, args.years, args.pages), dataset_dir)
+        export_seconds = time.perf_counter() - start
+        size = sum(path.stat().st_size for path in dataset_dir.rglob("*.parquet"))
+        print(f"exported in {export_seconds:.1f}s, {size / 1e6:.1f}MB on disk")
+
+        since, until = date(2014, 7, 1), date(2015, 6, 30)  # fiscal year 2015
+        loads = {
+            "parse pdfs (est.)": None,
+            "text_df": lambda: read_text_df(dataset_dir, since, until),
+            "pages": lambda: read_pages(dataset_dir, since=since, until=until),
+            "pages, no text": lambda: read_pages(
+                dataset_dir,
+                ["date", "min_filename", "page_number"],
+                since,
+                until,
+            ),
+        }
+        print(f"{'load a fiscal year':>18} {'time (ms)':>10} {'memory (MB)':>12}")
+        for name, load in loads.items():
+            if load is None:
+                print(f"{name:>18} {parse_seconds * 1e3:>10.0f} {'':>12}")
+                continue
+            start = time.perf_counter()
+            loaded = load()
+            seconds = time.perf_counter() - start
+            memory = loaded.memory_usage(deep=True).sum()
+            print(f"{name:>18} {seconds * 1e3:>10.1f} {memory / 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
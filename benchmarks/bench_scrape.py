@@ -0,0 +1,82 @@
+"""Runs get_boe_pdfs() end to end against a local MockComptrollerSite and
+reports the pages, pdfs and bytes fetched per second for each worker count,
+so changes to the scraper's concurrency and caching can be measured offline
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_scrape --latency 0.05 --workers 1 4 8
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from tests.scrape.mock_site import MockComptrollerSite
+from common.cache_utils import PageCache
+from common.manifest_utils import CrawlManifest
+from common.scrape_utils import get_boe_pdfs, ScraperSession, RateLimiter
+
+
+def run(site, workers, rate, incremental=False):
+    """Crawls the site into a fresh directory and returns the throughput"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_dir = Path(temp_dir)
+        session = ScraperSession(limiter=RateLimiter(rate=rate, max_in_flight=workers))
+        kwargs = {"workers": workers, "session": session, "dir": pdf_dir}
+        if incremental:
+            kwargs["cache"] = PageCache(pdf_dir / "cache")
+            kwargs["manifest"] = CrawlManifest(pdf_dir / "manifest.jsonl")
+            get_boe_pdfs(site.minutes_url, site.base_url, **kwargs)
+
+        site.reset_stats()
+        start = time.perf_counter()
+        get_boe_pdfs(site.minutes_url, site.base_url, **kwargs)
+        elapsed = time.perf_counter() - start
+    stats = dict(site.stats)
+    return {
+        "seconds": elapsed,
+        "requests": stats["requests"],
+        "pages/s": stats["pages"] / elapsed,
+        "pdfs/s": stats["pdfs"] / elapsed,
+        "MB/s": stats["bytes"] / elapsed / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--years", type=int, default=12)
+    parser.add_argument("--meetings", type=int, default=45, help="per year")
+    parser.add_argument("--pdf-kb", type=int, default=512)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rate", type=float, default=None, help="site limit")
+    parser.add_argument("--rate", type=float, default=1000, help="client limit")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    site = MockComptrollerSite(
+        years=range(2021 - args.years, 2021),
+        meetings_per_year=args.meetings,
+        pdf_size=args.pdf_kb * 1024,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        max_rate=args.max_rate,
+    )
+    with site:
+        print(
+            f"{'run':>18} {'seconds':>8} {'requests':>8} {'pages/s':>8} "
+            f"{'pdfs/s':>8} {'MB/s':>8}"
+        )
+        runs = [(f"cold, {n} workers", n, False) for n in args.workers]
+        runs.append(("incremental", max(args.workers), True))
+        for name, workers, incremental in runs:
+            result = run(site, workers, args.rate, incremental)
+            print(
+                f"{name:>18} {result['seconds']:>8.2f} {result['requests']:>8} "
+                f"{result['pages/s']:>8.1f} {result['pdfs/s']:>8.1f} "
+                f"{result['MB/s']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Compares searching the text of the minutes by scanning text_df with
+str.contains(), which reads every meeting for every query, against the
+FTS5 index of the pages built by load_minutes(), on a synthetic corpus of
+meetings made of random words. Reports the time per query of a word, a
+phrase and a prefix for each
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_search
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from common.db_utils import connect, create_schema, load_minutes, search
+from tests.db.db_data import fake_minutes
+
+# each query as an FTS5 query and the equivalent regex
+QUERIES = {
+    "word": ("parking", r"\bparking\b"),
+    "phrase": ('"lease of parking"', r"\blease of parking\b"),
+    "prefix": ("contract*", r"\bcontract\w*"),
+}
+
+
+def synthetic_minutes(count, pages, page_size, seed=0):
+    """Yields stand-ins for parsed Minutes objects with pages of random
+    words, a few of which are the words in QUERIES"""
+    rand = random.Random(seed)
+    vocabulary = ["".join(rand.choices("abcdefghijklmnop", k=7)) for _ in range(5000)]
+    vocabulary += ["the", "of", "board", "estimates", "contract", "contractor"]
+    start = date(2009, 1, 7)
+    for i in range(count):
+        page_texts = []
+        for _ in range(pages):
+            words = rand.choices(vocabulary, k=page_size // 8)
+            if rand.random() < 0.01:
+                words.insert(rand.randrange(len(words)), "lease of parking")
+            page_texts.append(" ".join(words))
+        meeting_date = start + timedelta(weeks=i)
+        yield fake_minutes(
+            meeting_date.strftime("%Y_%m_%d") + ".pdf",
+            page_texts,
+            clean_text=" ".join(page_texts),
+            sha256=f"{i:064x}",
+        )
+
+
+def time_query(func, repeat):
+    """Returns the fastest time of several calls to func, and its result"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--page-size", type=int, default=3000, help="chars")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    minutes = list(synthetic_minutes(args.meetings, args.pages, args.page_size))
+    text_df = pd.DataFrame(
+        {
+            "date": [m.meeting_date for m in minutes],
+            "minutes": [m.clean_text for m in minutes],
+        }
+    )
+    size = text_df["minutes"].str.len().sum() / 1e6
+    print(
+        f"{args.meetings} meetings, {args.meetings * args.pages} pages, {size:.0f}M chars"
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        conn = connect(Path(temp_dir) / "minutes.db")
+        create_schema(conn)
+        start = time.perf_counter()
+        load_minutes(conn, minutes)
+        print(f"loaded and indexed in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'query':>8} {'scan (ms)':>10} {'meetings':>9} {'fts (ms)':>9}")
+        for name, (query, pattern) in QUERIES.items():
+            regex = re.compile(pattern, re.IGNORECASE)
+            scan_seconds, matched = time_query(
+                lambda: text_df[text_df["minutes"].str.contains(regex)], args.repeat
+            )
+            fts_seconds, _ = time_query(
+                lambda: search(conn, query, limit=20), args.repeat
+            )
+            print(
+                f"{name:>8} {scan_seconds * 1e3:>10.1f} {len(matched):>9} "
+                f"{fts_seconds * 1e3:>9.1f}"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
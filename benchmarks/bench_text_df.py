@@ -0,0 +1,73 @@
+"""Compares building the table of minutes one row at a time, the way
+store_pdf_text_to_df() used to with DataFrame.append, against gathering
+the rows into columns with build_text_df() on a synthetic corpus of up to
+5,000 meetings. The time per meeting stays flat for build_text_df() while
+it grows with the size of the table for the row by row approach
+
+Run from the root of the repo:
+    $ python -m benchmarks.bench_text_df
+"""
+
+import argparse
+import time
+import warnings
+from datetime import date, timedelta
+
+import pandas as pd
+
+from common.parse_utils import build_text_df, TEXT_DF_COLUMNS
+
+
+def synthetic_rows(count, text_size):
+    """Yields rows shaped like the output of parse_pdf_row()"""
+    text = ("BOARD OF ESTIMATES MINUTES " * (text_size // 27 + 1))[:text_size]
+    start = date(2009, 1, 7)
+    for i in range(count):
+        yield {
+            "date": start + timedelta(weeks=i),
+            "page_number": str(i * 150),
+            "minutes": text,
+        }
+
+
+def append_rows(rows):
+    """Builds the table the way store_pdf_text_to_df() used to"""
+    text_df = pd.DataFrame(columns=TEXT_DF_COLUMNS)
+    for row in rows:
+        if hasattr(text_df, "append"):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)
+                text_df = text_df.append(row, ignore_index=True)
+        else:  # DataFrame.append was removed in pandas 2.0
+            text_df = pd.concat([text_df, pd.DataFrame([row])], ignore_index=True)
+    return text_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[625, 1250, 2500, 5000])
+    parser.add_argument("--text-size", type=int, default=200_000, help="chars")
+    args = parser.parse_args()
+
+    print(
+        f"{'meetings':>8} {'append (s)':>11} {'us/row':>8} {'columnar (s)':>13} {'us/row':>8}"
+    )
+    for count in args.sizes:
+        rows = list(synthetic_rows(count, args.text_size))
+        start = time.perf_counter()
+        appended = append_rows(rows)
+        append_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        built = build_text_df(rows)
+        build_seconds = time.perf_counter() - start
+
+        assert built.equals(appended)
+        print(
+            f"{count:>8} {append_seconds:>11.3f} {append_seconds / count * 1e6:>8.1f} "
+            f"{build_seconds:>13.4f} {build_seconds / count * 1e6:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,60 @@ CREATE TABLE IF NOT EXISTS minutes(
     min_id INTEGER CONSTRAINT min_id_pk PRIMARY KEY AUTOINCREMENT,  -- id number for minutes since there have been multiple meetings on the same day
     min_filename TEXT NOT NULL,  -- the filename on disk of the minutes pdf
     min_date TEXT NOT NULL,  -- the meeting date
-    min_text TEXT NOT NULL  -- the raw text of the minutes (with encoding corrections)
+    min_text TEXT NOT NULL,  -- the raw text of the minutes (with encoding corrections), or a BLOB of it compressed with a codec in text_codecs
+    min_sha256 TEXT NOT NULL  -- the sha256 of the pdf's contents, to tell when the pdf has changed and needs to be loaded again
 );
 
+CREATE INDEX IF NOT EXISTS min_date_idx ON minutes (min_date);
+CREATE UNIQUE INDEX IF NOT EXISTS min_filename_uq ON minutes (min_filename);  -- a pdf is loaded once, and updated in place when it changes
+
+CREATE TABLE IF NOT EXISTS minutes_pages(
+    page_id INTEGER CONSTRAINT page_id_pk PRIMARY KEY,  -- id number for the page, also the rowid of its entry in minutes_fts
+    page_min_id INTEGER NOT NULL,  -- the id of the minutes the page is from
+    page_number INTEGER NOT NULL,  -- the number of the page within the pdf, starting at 1
+    page_text TEXT NOT NULL,  -- the cleaned text of the page, or a BLOB of it compressed with a codec in text_codecs
+    CONSTRAINT page_min_id_fk FOREIGN KEY (page_min_id) REFERENCES minutes (min_id) ON DELETE CASCADE,
+    CONSTRAINT page_min_id_number_uq UNIQUE (page_min_id, page_number)
+);
+
+-- the codecs that compress the text of the minutes and their pages
+-- compressed text starts with the codec_key of its codec, see common/compress_utils.py
+CREATE TABLE IF NOT EXISTS text_codecs(
+    codec_key INTEGER CONSTRAINT codec_key_pk PRIMARY KEY,  -- the crc32 of the method and dictionary
+    codec_method TEXT NOT NULL,  -- zlib or zstd
+    codec_dictionary BLOB NOT NULL,  -- the dictionary shared by all the text compressed with the codec
+    codec_added TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP  -- when the codec was added, the latest codec is used for new text
+);
+
+-- full-text index of minutes_pages, which stores only the index so that the text of the pages can be compressed
+-- the pages are joined on rowid = page_id to read them, since a contentless index can't return its text
+-- prefix='2 3' indexes the first 2 and 3 characters of each word so that prefix queries like contract* are fast
+CREATE VIRTUAL TABLE IF NOT EXISTS minutes_fts USING fts5(
+    page_text,
+    content='',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- keep minutes_fts in sync with the plain text pages of minutes_pages, including the pages removed when their minutes are deleted
+-- compressed pages (BLOBs) are indexed and removed from the index by load_minutes() in common/db_utils.py, which can decompress them
+CREATE TRIGGER IF NOT EXISTS minutes_pages_ai AFTER INSERT ON minutes_pages
+WHEN TYPEOF(new.page_text) = 'text' BEGIN
+    INSERT INTO minutes_fts (rowid, page_text) VALUES (new.page_id, new.page_text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS minutes_pages_ad AFTER DELETE ON minutes_pages
+WHEN TYPEOF(old.page_text) = 'text' BEGIN
+    INSERT INTO minutes_fts (minutes_fts, rowid, page_text) VALUES ('delete', old.page_id, old.page_text);
+END;
+
+-- compressing a page leaves its text, and so the index, unchanged
+CREATE TRIGGER IF NOT EXISTS minutes_pages_au AFTER UPDATE OF page_text ON minutes_pages
+WHEN TYPEOF(old.page_text) = 'text' AND TYPEOF(new.page_text) = 'text' AND old.page_text IS NOT new.page_text BEGIN
+    INSERT INTO minutes_fts (minutes_fts, rowid, page_text) VALUES ('delete', old.page_id, old.page_text);
+    INSERT INTO minutes_fts (rowid, page_text) VALUES (new.page_id, new.page_text);
+END;
+
 CREATE TABLE IF NOT EXISTS contractors(
     con_id INTEGER CONSTRAINT con_id_pk PRIMARY KEY AUTOINCREMENT,  -- id number for the contractor
     con_name TEXT NOT NULL,  -- the name of the contractor (used for human-readable outputs)
@@ -54,18 +105,20 @@ CREATE TABLE IF NOT EXISTS permits(
     perm_desc TEXT NOT NULL,  -- the text of the permit
     perm_notes TEXT,  -- any additional notes for this permit
     perm_objections TEXT,  -- any objections to the denial/issuance of the permit
-    CONSTRAINT perm_appl_id_fk FOREIGN KEY (appl_id) REFERENCES applicants (appl_id)
+    CONSTRAINT perm_appl_id_fk FOREIGN KEY (perm_appl_id) REFERENCES applicants (appl_id)
 );
 
 CREATE TABLE IF NOT EXISTS prequal(
     prq_id INTEGER CONSTRAINT prq_id_pk PRIMARY KEY AUTOINCREMENT,  -- id number for a specific prequalification
     min_date TEXT NOT NULL,  -- the date the prequal was issued (also the date of the meeting when they were prequalified)
+    min_id INTEGER,  -- the id of the meeting when they were prequalified (min_date isn't unique, so it can't be the foreign key)
     prq_amount INTEGER,  -- the amount of money the prequal was for
     con_id INTEGER NOT NULL,  -- the id of the contractor being prequalified
+    con_type_id INTEGER,  -- the type of work the contractor is prequalified for
     prq_objections TEXT,  -- any objections to the denial/approval of the prequalification
     CONSTRAINT prq_con_type_id_fk FOREIGN KEY (con_type_id) REFERENCES contractor_types (con_type_id),
     CONSTRAINT prq_con_id_fk FOREIGN KEY (con_id) REFERENCES contractors (con_id),
-    CONSTRAINT prq_min_date FOREIGN KEY (min_date) REFERENCES minutes (min_date)
+    CONSTRAINT prq_min_id_fk FOREIGN KEY (min_id) REFERENCES minutes (min_id) ON DELETE CASCADE
 );
 
 CREATE TABLE IF NOT EXISTS payments(
@@ -75,11 +128,18 @@ CREATE TABLE IF NOT EXISTS payments(
     pay_amount INTEGER NOT NULL,  -- how much money moved
     pay_date TEXT NOT NULL,  -- date of the transaction
     pay_chargeback INTEGER,  -- if the payment was reversed (optionally, how much was refunded)
-    CONSTRAINT pay_from_acc_id_fk FOREIGN KEY (from_acc_id) REFERENCES accounts (acc_id),
-    CONSTRAINT pay_to_acc_id_fk FOREIGN KEY (to_acc_id) REFERENCES accounts (acc_id)
+    CONSTRAINT pay_from_acc_id_fk FOREIGN KEY (pay_from_acc_id) REFERENCES accounts (acc_id),
+    CONSTRAINT pay_to_acc_id_fk FOREIGN KEY (pay_to_acc_id) REFERENCES accounts (acc_id)
 );
 
 CREATE TABLE IF NOT EXISTS accounts(
-    acc_id TEXT CONSTRAINT acc_id PRIMARY KEY AUTOINCREMENT,  -- id number of the account
+    acc_id TEXT CONSTRAINT acc_id_pk PRIMARY KEY,  -- id number of the account (AUTOINCREMENT only works on INTEGER keys)
     acc_name TEXT NOT NULL  -- the name of the account (for human-readable outputs)
-);
\ No newline at end of file
+);
+
+-- when the pdf of a set of minutes changes, remove the rows that were derived from the previous version
+CREATE TRIGGER IF NOT EXISTS minutes_au AFTER UPDATE OF min_sha256 ON minutes
+WHEN old.min_sha256 IS NOT new.min_sha256 BEGIN
+    DELETE FROM minutes_pages WHERE page_min_id = old.min_id;
+    DELETE FROM prequal WHERE min_id = old.min_id;
+END;
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import time
+import zlib
+from pathlib import Path
+
+from common.utils import hash_file
+
+# cached pages older than this many seconds are requested again in full
+PAGE_TTL = 7 * 24 * 60 * 60
+
+# the most pages kept in the cache before the oldest are evicted
+MAX_PAGES = 500
+
+# the most bytes of compressed text kept before the least recently used
+# entries are evicted
+MAX_TEXT_BYTES = 512 * 1024 * 1024
+
+
+class PageCache:
+    """Creates an on-disk cache of the links parsed from the index pages of
+    the Comptroller's website. Each entry stores the ETag and Last-Modified
+    headers of the response it was parsed from so that the page can be
+    requested conditionally, and a 304 response can reuse the cached links
+    without downloading or parsing the page again"""
+
+    def __init__(self, cache_dir=None, ttl=PAGE_TTL, max_entries=MAX_PAGES):
+
+        if not cache_dir:
+            cache_dir = Path.cwd() / ".page_cache"
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, url):
+        """Returns the path of the file that stores the entry for a url
+
+        Args:
+            url (str): The url of the cached page
+        Returns:
+            path (pathlib.Path): Path to the json file for the entry
+        """
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / (key + ".json")
+
+    def get(self, url):
+        """Looks up the cached entry for a url, evicting it if it has expired
+
+        Args:
+            url (str): The url of the cached page
+        Returns:
+            entry (dict): The cached etag, last_modified, fetched_at and links
+            for the url, or None if the url isn't cached
+        """
+        path = self.entry_path(url)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if time.time() - entry["fetched_at"] > self.ttl:
+            path.unlink()
+            return None
+        return entry
+
+    def conditional_headers(self, url):
+        """Builds the headers for a conditional request of a cached url
+
+        Args:
+            url (str): The url of the page to request
+        Returns:
+            headers (dict): If-None-Match and If-Modified-Since headers, or an
+            empty dict if the url isn't cached
+        """
+        return validator_headers(self.get(url))
+
+    def put(self, url, headers, links):
+        """Stores the links parsed from a page along with its validators
+
+        Args:
+            url (str): The url of the page
+            headers (dict): The headers of the response for the page
+            links (dict): The links parsed from the page
+        Returns:
+            N/A: Void function
+        """
+        entry = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched_at": time.time(),
+            "links": links,
+        }
+        with open(self.entry_path(url), "w") as f:
+            json.dump(entry, f)
+        self.evict()
+
+    def touch(self, url, entry=None):
+        """Resets the age of a cached entry after the server confirms that the
+        page hasn't changed
+
+        Args:
+            url (str): The url of the cached page
+            entry (dict): The entry the request's validators came from, which
+            is stored again even if it has since expired or been evicted,
+            defaults to the entry in the cache
+        Returns:
+            links (dict): The cached links for the url, or None if no entry
+            was given and the url isn't cached
+        """
+        if entry is None:
+            entry = self.get(url)
+        if entry is None:
+            return None
+        entry["fetched_at"] = time.time()
+        with open(self.entry_path(url), "w") as f:
+            json.dump(entry, f)
+        return entry["links"]
+
+    def evict(self):
+        """Removes the least recently fetched entries once the cache holds more
+        than max_entries pages
+
+        Returns:
+            N/A: Void function
+        """
+        paths = sorted(
+            self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime_ns
+        )
+        for path in paths[: max(0, len(paths) - self.max_entries)]:
+            path.unlink()
+
+    def clear(self):
+        """Removes every entry from the cache
+
+        Returns:
+            N/A: Void function
+        """
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink()
+
+
+def validator_headers(entry):
+    """Builds the headers for a conditional request from a cached entry
+
+    Args:
+        entry (dict): The entry of a PageCache, or None
+    Returns:
+        headers (dict): If-None-Match and If-Modified-Since headers, or an
+        empty dict if there is no entry
+    """
+    headers = {}
+    if entry is None:
+        return headers
+    if entry["etag"]:
+        headers["If-None-Match"] = entry["etag"]
+    if entry["last_modified"]:
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class TextCache:
+    """Creates an on-disk cache of the raw and clean text extracted from each
+    pdf, compressed with zlib or with the codec it's given. Entries are keyed
+    by the sha256 of the pdf's contents plus the version of the extraction
+    and cleaning code that the parser passes with each lookup, so an
+    unchanged pdf is never parsed twice and a renamed pdf is still found,
+    while a revised pdf, another backend or a change to the parsing code
+    misses the cache. The cache's own version is added to every key"""
+
+    def __init__(
+        self, cache_dir=None, version="", max_bytes=MAX_TEXT_BYTES, codec=None
+    ):
+
+        if not cache_dir:
+            cache_dir = Path.cwd() / ".text_cache"
+        self.cache_dir = cache_dir
+        if codec:  # entries compressed with another codec can't be read
+            version += f"/codec-{codec.key}"
+        self.version = version
+        self.max_bytes = max_bytes
+        self.codec = codec
+        self._hashes = {}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def content_hash(self, pdf_path):
+        """Hashes a pdf, reusing the hash while its size and mtime match
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+        Returns:
+            digest (str): The sha256 hex digest of the pdf's contents
+        """
+        stat = pdf_path.stat()
+        key = (str(pdf_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = hash_file(pdf_path)
+        return self._hashes[key]
+
+    def entry_path(self, pdf_path, version=""):
+        """Returns the path of the file that stores the text of a pdf
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+            version (str): The version of the code that extracted the text
+        Returns:
+            path (pathlib.Path): Path to the compressed entry for the pdf
+        """
+        key = f"{self.version}|{version}".encode("utf-8")
+        digest = hashlib.sha1(key).hexdigest()[:12]
+        return self.cache_dir / f"{self.content_hash(pdf_path)}-{digest}.z"
+
+    def get(self, pdf_path, version=""):
+        """Looks up the cached text of a pdf
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+            version (str): The version of the code that extracts the text,
+            such as text_version(backend) from common/parse_utils.py
+        Returns:
+            entry (dict): The raw_text, clean_text and page_offsets of the
+            pdf, or None if the pdf isn't cached
+        """
+        path = self.entry_path(pdf_path, version)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if self.codec:
+                entry = json.loads(self.codec.decompress(data))
+            else:
+                entry = json.loads(zlib.decompress(data))
+        except (FileNotFoundError, zlib.error, ValueError):
+            return None
+        os.utime(path)  # marks the entry as recently used
+        return entry
+
+    def put(self, pdf_path, raw_text, clean_text, page_offsets=None, version=""):
+        """Stores the text extracted from a pdf
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+            raw_text (str): The text extracted from the pdf
+            clean_text (str): The cleaned text of the pdf
+            page_offsets (list): The index in raw_text where each page starts
+            version (str): The version of the code that extracted the text
+        Returns:
+            N/A: Void function
+        """
+        entry = {"raw_text": raw_text, "clean_text": clean_text}
+        if page_offsets is not None:
+            entry["page_offsets"] = page_offsets
+        if self.codec:
+            data = self.codec.compress(json.dumps(entry))
+        else:
+            data = zlib.compress(json.dumps(entry).encode("utf-8"))
+        path = self.entry_path(pdf_path, version)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def invalidate(self, pdf_path):
+        """Removes the cached text of a pdf for every version of the parser
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+        Returns:
+            N/A: Void function
+        """
+        for path in self.cache_dir.glob(f"{self.content_hash(pdf_path)}-*.z"):
+            path.unlink()
+
+    def evict(self):
+        """Removes the least recently used entries once the cache holds more
+        than max_bytes of compressed text
+
+        Returns:
+            N/A: Void function
+        """
+        entries = []
+        for path in self.cache_dir.glob("*.z"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Removes every entry from the cache
+
+        Returns:
+            N/A: Void function
+        """
+        for path in self.cache_dir.glob("*.z"):
+            path.unlink()
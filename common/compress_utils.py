@@ -0,0 +1,219 @@
+import struct
+import zlib
+from collections import Counter
+
+# zstandard is optional, it compresses faster and smaller than zlib and can
+# train its dictionaries on samples of text
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# zlib can only refer back 32 KiB, so a larger dictionary wouldn't be used
+DICTIONARY_SIZE = 32 * 1024
+
+# the number of words in each phrase counted when training a zlib dictionary
+PHRASE_WORDS = 6
+
+# the text compressed by each codec, by its key
+CODECS = {}
+
+# the key of a codec is stored in the first bytes of the text it compresses
+KEY_FORMAT = struct.Struct(">I")
+
+
+def train_dictionary(samples, size=DICTIONARY_SIZE, method="zlib"):
+    """Builds a dictionary of the phrases that recur across samples of text,
+    such as the headings and boilerplate of the minutes, which lets short
+    texts like single pages refer back to them instead of spelling them out
+
+    Args:
+        samples (list): The texts to train on, e.g. a few hundred pages
+        size (int): The most bytes in the dictionary
+        method (str): The compression method the dictionary is for, zstd
+        trains its own dictionaries while zlib uses a preset of phrases
+    Returns:
+        dictionary (bytes): The trained dictionary
+    """
+    if method == "zstd":
+        data = [sample.encode("utf-8") for sample in samples]
+        return zstandard.train_dictionary(size, data).as_bytes()
+
+    # count each phrase once per sample, so that boilerplate shared by many
+    # pages outranks a phrase repeated within a single page. The phrases are
+    # counted in the order they appear, so that phrases with the same count
+    # are added in order and extend the same run
+    counts = Counter()
+    for sample in samples:
+        words = sample.split()
+        phrases = (
+            " ".join(words[i : i + PHRASE_WORDS])
+            for i in range(len(words) - PHRASE_WORDS + 1)
+        )
+        counts.update(list(dict.fromkeys(phrases)))
+    runs = []
+    length = 0
+    for phrase, count in counts.most_common():
+        if count < 2 or length >= size:
+            break
+        length += extend_runs(runs, phrase.split())
+
+    # zlib encodes nearer matches in fewer bits, so the most common phrases
+    # go at the end of the dictionary
+    dictionary = " ".join(" ".join(run) for run in reversed(runs)).encode("utf-8")
+    return dictionary[-size:]
+
+
+def extend_runs(runs, words):
+    """Adds a phrase to the runs of words chosen for a dictionary, extending
+    a run that it overlaps by all but one word rather than repeating it
+
+    Args:
+        runs (list): The runs of words chosen so far, updated in place
+        words (list): The words of the phrase to add
+    Returns:
+        added (int): The number of bytes the phrase added to the runs
+    """
+    overlap = len(words) - 1
+    for run in runs:
+        if run[-overlap:] == words[:overlap]:
+            run.append(words[-1])
+            return len(words[-1].encode("utf-8")) + 1
+        if run[:overlap] == words[1:]:
+            run.insert(0, words[0])
+            return len(words[0].encode("utf-8")) + 1
+        if " ".join(words) in " ".join(run):
+            return 0
+    runs.append(words)
+    return len(" ".join(words).encode("utf-8")) + 1
+
+
+class TextCodec:
+    """Creates a codec that compresses text with zlib or zstd and a shared
+    dictionary. The compressed text starts with a key identifying the
+    method and dictionary, so that decompress_text() can find the codec for
+    any text it's given once the codec has been registered
+
+    Usage:
+        codec = TextCodec.train(pages)
+        data = codec.compress(text)
+        text = decompress_text(data)
+    """
+
+    methods = ["zlib", "zstd"]
+
+    def __init__(self, method="zlib", dictionary=b"", level=None):
+
+        if method not in self.methods:
+            raise ValueError(f"Unknown compression method '{method}'")
+        if method == "zstd" and zstandard is None:
+            raise ValueError("zstandard isn't installed, use method='zlib'")
+        self.method = method
+        self.dictionary = dictionary
+        self.key = zlib.crc32(dictionary, zlib.crc32(method.encode("utf-8")))
+        self.header = KEY_FORMAT.pack(self.key)
+        if method == "zstd":
+            self.level = level or 3
+            dict_data = zstandard.ZstdCompressionDict(dictionary)
+            self.compressor = zstandard.ZstdCompressor(
+                level=self.level, dict_data=dict_data
+            )
+            self.decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+        else:
+            self.level = level or 6
+        register_codec(self)
+
+    def __getstate__(self):
+        """Pickles the settings of the codec rather than its compressors,
+        which zstd can't pickle, so it can be sent to a process pool"""
+        return {
+            "method": self.method,
+            "dictionary": self.dictionary,
+            "level": self.level,
+        }
+
+    def __setstate__(self, state):
+        """Creates the codec again from its settings, and registers it in the
+        process it's unpickled in"""
+        self.__init__(state["method"], state["dictionary"], state["level"])
+
+    @classmethod
+    def train(cls, samples, method="zlib", size=DICTIONARY_SIZE, level=None):
+        """Creates a codec with a dictionary trained on samples of text
+
+        Args:
+            samples (list): The texts to train on
+            method (str): The compression method, zlib or zstd
+            size (int): The most bytes in the dictionary
+            level (int): The compression level
+        Returns:
+            codec (TextCodec): The trained codec
+        """
+        return cls(method, train_dictionary(samples, size, method), level)
+
+    def compress(self, text):
+        """Compresses text
+
+        Args:
+            text (str): The text to compress
+        Returns:
+            data (bytes): The key of the codec followed by the compressed text
+        """
+        data = text.encode("utf-8")
+        if self.method == "zstd":
+            return self.header + self.compressor.compress(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(self.level, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(self.level)
+        return self.header + compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data):
+        """Decompresses text compressed by this codec
+
+        Args:
+            data (bytes): The output of compress()
+        Returns:
+            text (str): The original text
+        """
+        if data[: KEY_FORMAT.size] != self.header:
+            raise ValueError("The text wasn't compressed with this codec")
+        data = data[KEY_FORMAT.size :]
+        if self.method == "zstd":
+            try:
+                return self.decompressor.decompress(data).decode("utf-8")
+            except zstandard.ZstdError as e:
+                raise ValueError(f"Couldn't decompress the text: {e}")
+        if self.dictionary:
+            decompressor = zlib.decompressobj(zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+def register_codec(codec):
+    """Registers a codec so that decompress_text() can find it by its key
+
+    Args:
+        codec (TextCodec): The codec to register
+    Returns:
+        N/A: Void function
+    """
+    CODECS[codec.key] = codec
+
+
+def decompress_text(value):
+    """Decompresses text with the registered codec it was compressed with,
+    passing text that isn't compressed through unchanged
+
+    Args:
+        value (bytes or str): Compressed text, or text
+    Returns:
+        text (str): The text
+    """
+    if not isinstance(value, bytes):
+        return value
+    (key,) = KEY_FORMAT.unpack_from(value)
+    if key not in CODECS:
+        raise ValueError(f"No codec is registered with the key {key}")
+    return CODECS[key].decompress(value)
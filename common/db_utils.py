@@ -0,0 +1,565 @@
+import random
+import sqlite3
+from itertools import islice
+from pathlib import Path
+
+from common.compress_utils import decompress_text, TextCodec
+from common.parse_utils import clean_raw_text, find_pdfs, iter_minutes, parse_pdfs
+from common.utils import hash_file
+
+# the schema of the database of minutes
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / "boe_min.sql"
+
+# the rows inserted per transaction when loading the minutes
+BATCH_SIZE = 50
+
+# the rows of the minutes and minutes_pages tables, a pdf that's already
+# loaded is updated in place if its contents have changed and left alone if
+# they haven't
+MINUTES_SQL = """
+    INSERT INTO minutes (min_filename, min_date, min_text, min_sha256)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (min_filename) DO UPDATE SET
+        min_date = excluded.min_date,
+        min_text = excluded.min_text,
+        min_sha256 = excluded.min_sha256
+    WHERE min_sha256 IS NOT excluded.min_sha256
+"""
+PAGES_SQL = (
+    "INSERT INTO minutes_pages (page_min_id, page_number, page_text) VALUES (?, ?, ?)"
+)
+
+# adds a compressed page to the full-text index, or removes it given its text,
+# which the triggers in boe_min.sql can't do since they can't decompress it
+INDEX_SQL = "INSERT INTO minutes_fts (rowid, page_text) VALUES (?, ?)"
+UNINDEX_SQL = (
+    "INSERT INTO minutes_fts (minutes_fts, rowid, page_text) VALUES ('delete', ?, ?)"
+)
+
+# ranks the pages that match a full-text query, most relevant first
+SEARCH_SQL = """
+    SELECT m.min_filename, m.min_date, p.page_number, p.page_id,
+        p.page_text AS text, bm25(minutes_fts) AS rank
+    FROM minutes_fts
+    JOIN minutes_pages AS p ON p.page_id = minutes_fts.rowid
+    JOIN minutes AS m ON m.min_id = p.page_min_id
+    WHERE minutes_fts MATCH ? AND m.min_date BETWEEN ? AND ?
+    ORDER BY rank
+    LIMIT ?
+"""
+
+# minutes_fts is contentless, so the snippets of the pages found are made by
+# indexing them again in memory with the same tokenizer
+SNIPPETS_SCHEMA = (
+    "CREATE VIRTUAL TABLE pages USING fts5(page_text, "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+SNIPPETS_SQL = (
+    "SELECT rowid, {text}(pages, 0, ?, ?{snippet}) FROM pages WHERE pages MATCH ?"
+)
+
+# the number of pages sampled to train the dictionary of a codec
+TRAINING_PAGES = 1000
+
+# applied to every connection: the write-ahead log lets the database be read
+# while it's loaded and only needs to sync at checkpoints, which is safe with
+# synchronous=NORMAL, and the larger page cache and memory map speed up reads
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": -64 * 1024,  # in KiB when negative
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+
+def connect(db_path=None):
+    """Opens the database of minutes, applies PRAGMAS to the connection and
+    registers the codecs of the database, which are needed to read and index
+    compressed text, and the decompress_text() function to read it in SQL
+
+    Args:
+        db_path (pathlib.Path): Path to the database file, defaults to
+        boe_minutes.db in the current directory
+    Returns:
+        conn (sqlite3.Connection): The connection to the database
+    """
+    if not db_path:
+        db_path = Path.cwd() / "boe_minutes.db"
+    conn = sqlite3.connect(str(db_path))
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    conn.create_function("decompress_text", 1, decompress_text)
+    load_codecs(conn)
+    return conn
+
+
+def create_schema(conn, schema_path=SCHEMA_PATH):
+    """Creates the tables and indexes in boe_min.sql if they don't exist
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        schema_path (pathlib.Path): Path to the sql script with the schema
+    Returns:
+        N/A: Void function
+    """
+    with open(schema_path, "r") as f:
+        conn.executescript(f.read())
+
+
+def load_codecs(conn):
+    """Registers the codecs stored in the database, so that the text they
+    compressed can be decompressed
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+    Returns:
+        codec (TextCodec): The codec added most recently, which compresses
+        new text, or None if the database doesn't compress its text
+    """
+    try:
+        rows = conn.execute(
+            "SELECT codec_method, codec_dictionary FROM text_codecs "
+            "ORDER BY codec_added, rowid"
+        ).fetchall()
+    except sqlite3.OperationalError:  # the schema hasn't been created yet
+        return None
+    codecs = [TextCodec(method, dictionary) for method, dictionary in rows]
+    return codecs[-1] if codecs else None
+
+
+def add_codec(conn, codec):
+    """Stores a codec in the database so that it can decompress the text it
+    compresses on later connections
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        codec (TextCodec): The codec to store
+    Returns:
+        N/A: Void function
+    """
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO text_codecs "
+            "(codec_key, codec_method, codec_dictionary) VALUES (?, ?, ?)",
+            (codec.key, codec.method, codec.dictionary),
+        )
+
+
+def train_codec(conn, method="zlib", pages=TRAINING_PAGES):
+    """Trains a codec on a random sample of the pages in the database and
+    stores it, so that it's used for the text loaded from then on
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        method (str): The compression method, zlib or zstd
+        pages (int): The number of pages to train on
+    Returns:
+        codec (TextCodec): The trained codec
+    """
+    (count,) = conn.execute("SELECT MAX(page_id) FROM minutes_pages").fetchone()
+    if not count:
+        raise ValueError("The database doesn't have any pages to train on")
+    page_ids = random.sample(range(1, count + 1), min(pages, count))
+    samples = []
+    for start in range(0, len(page_ids), 500):  # stays under the variable limit
+        chunk = page_ids[start : start + 500]
+        samples += [
+            decompress_text(text)
+            for (text,) in conn.execute(
+                "SELECT page_text FROM minutes_pages WHERE page_id IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+        ]
+    codec = TextCodec.train(samples, method)
+    add_codec(conn, codec)
+    return codec
+
+
+def compress_text(conn, codec, batch_size=BATCH_SIZE):
+    """Compresses the text stored in the database with a codec, replacing
+    text that is uncompressed or was compressed with another codec, then
+    vacuums the database to return the space freed to the file system
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        codec (TextCodec): The codec to compress the text with
+        batch_size (int): The number of meetings compressed per transaction
+    Returns:
+        N/A: Void function
+    """
+    add_codec(conn, codec)
+    min_ids = [row[0] for row in conn.execute("SELECT min_id FROM minutes")]
+    for start in range(0, len(min_ids), batch_size):
+        with conn:
+            for min_id in min_ids[start : start + batch_size]:
+                (text,) = conn.execute(
+                    "SELECT min_text FROM minutes WHERE min_id = ?", (min_id,)
+                ).fetchone()
+                conn.execute(
+                    "UPDATE minutes SET min_text = ? WHERE min_id = ?",
+                    (codec.compress(decompress_text(text)), min_id),
+                )
+                pages = conn.execute(
+                    "SELECT page_id, page_text FROM minutes_pages "
+                    "WHERE page_min_id = ?",
+                    (min_id,),
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE minutes_pages SET page_text = ? WHERE page_id = ?",
+                    [
+                        (codec.compress(decompress_text(text)), page_id)
+                        for page_id, text in pages
+                    ],
+                )
+    conn.execute("VACUUM")
+
+
+def minutes_text(conn, min_filename):
+    """Reads the text of a meeting, decompressing it if it's compressed
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        min_filename (str): The filename of the pdf of the minutes
+    Returns:
+        text (str): The cleaned text of the minutes, or None if they aren't
+        in the database
+    """
+    row = conn.execute(
+        "SELECT min_text FROM minutes WHERE min_filename = ?", (min_filename,)
+    ).fetchone()
+    return decompress_text(row[0]) if row else None
+
+
+def page_text(conn, min_filename, page_number):
+    """Reads the text of a page of a meeting, decompressing it if it's
+    compressed
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        min_filename (str): The filename of the pdf of the minutes
+        page_number (int): The number of the page, starting at 1
+    Returns:
+        text (str): The cleaned text of the page, or None if it isn't in the
+        database
+    """
+    row = conn.execute(
+        "SELECT p.page_text FROM minutes_pages AS p "
+        "JOIN minutes AS m ON m.min_id = p.page_min_id "
+        "WHERE m.min_filename = ? AND p.page_number = ?",
+        (min_filename, page_number),
+    ).fetchone()
+    return decompress_text(row[0]) if row else None
+
+
+def stored_text(text, codec=None):
+    """Compresses text to be stored if there is a codec to compress it with
+
+    Args:
+        text (str): The text to store
+        codec (TextCodec): The codec to compress the text with, if any
+    Returns:
+        value (str or bytes): The value to store in the database
+    """
+    return codec.compress(text) if codec else text
+
+
+def minutes_row(minutes, codec=None):
+    """Converts parsed minutes into a row of the minutes table
+
+    Args:
+        minutes (Minutes): The parsed minutes of a meeting
+        codec (TextCodec): The codec to compress the text with, if any
+    Returns:
+        row (tuple): The min_filename, min_date, min_text and min_sha256 of
+        the meeting
+    """
+    return (
+        minutes.pdf_path.name,
+        minutes.meeting_date,
+        stored_text(minutes.clean_text, codec),
+        minutes.sha256,
+    )
+
+
+def page_rows(min_id, minutes, codec=None):
+    """Converts the pages of parsed minutes into rows of the minutes_pages
+    table, cleaned with the same replacement profiles as the whole text
+
+    Args:
+        min_id (int): The id of the minutes in the minutes table
+        minutes (Minutes): The parsed minutes of a meeting
+        codec (TextCodec): The codec to compress the text with, if any
+    Returns:
+        rows (list): The page_min_id, page_number and page_text of each page
+    """
+    rows = []
+    for number, text in enumerate(minutes.pages, start=1):
+        text = clean_raw_text(text, profiles=minutes.profiles)
+        rows.append((min_id, number, stored_text(text, codec)))
+    return rows
+
+
+def index_pages(conn, min_id):
+    """Adds the compressed pages of a meeting to the full-text index, the
+    triggers in boe_min.sql only index the pages stored as plain text
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        min_id (int): The id of the minutes in the minutes table
+    Returns:
+        N/A: Void function
+    """
+    pages = conn.execute(
+        "SELECT page_id, page_text FROM minutes_pages "
+        "WHERE page_min_id = ? AND TYPEOF(page_text) = 'blob'",
+        (min_id,),
+    ).fetchall()
+    conn.executemany(INDEX_SQL, [(id, decompress_text(text)) for id, text in pages])
+
+
+def unindex_pages(conn, min_filename):
+    """Removes the compressed pages of a meeting from the full-text index,
+    before the pages are deleted or replaced. The index is contentless, so
+    removing a page needs the text it was indexed with
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        min_filename (str): The filename of the pdf of the minutes
+    Returns:
+        N/A: Void function
+    """
+    pages = conn.execute(
+        "SELECT p.page_id, p.page_text FROM minutes_pages AS p "
+        "JOIN minutes AS m ON m.min_id = p.page_min_id "
+        "WHERE m.min_filename = ? AND TYPEOF(p.page_text) = 'blob'",
+        (min_filename,),
+    ).fetchall()
+    conn.executemany(UNINDEX_SQL, [(id, decompress_text(text)) for id, text in pages])
+
+
+def load_minutes(conn, minutes_iter, batch_size=BATCH_SIZE, codec=None):
+    """Upserts parsed minutes into the minutes table and their pages into the
+    minutes_pages table, batch_size meetings at a time in a single
+    transaction per batch, so that only one batch of text is held in memory
+    and the database is only synced once per batch rather than once per
+    meeting. A pdf that's already loaded with the same contents is skipped,
+    and one whose contents have changed replaces its previous text, pages
+    and derived rows. The full-text index of the pages is kept in sync by
+    the triggers in boe_min.sql, and by index_pages() and unindex_pages()
+    for compressed pages
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        minutes_iter (iterable): The parsed minutes to load, such as the
+        output of iter_minutes()
+        batch_size (int): The number of meetings loaded per transaction
+        codec (TextCodec): The codec to compress the text with, defaults to
+        the codec added to the database most recently, if any
+    Returns:
+        count (int): The number of meetings inserted or updated
+    """
+    if codec:
+        add_codec(conn, codec)
+    else:
+        codec = load_codecs(conn)
+    minutes_iter = iter(minutes_iter)
+    count = 0
+    while True:
+        batch = list(islice(minutes_iter, batch_size))
+        if not batch:
+            break
+        with conn:  # commits the batch, or rolls it back on an error
+            for minutes in batch:
+                row = minutes_row(minutes, codec)
+                loaded = conn.execute(
+                    "SELECT min_sha256 FROM minutes WHERE min_filename = ?", (row[0],)
+                ).fetchone()
+                if loaded and loaded[0] == row[3]:
+                    continue  # already loaded with the same contents
+                if loaded:  # the minutes_au trigger replaces the old pages
+                    unindex_pages(conn, row[0])
+                conn.execute(MINUTES_SQL, row)
+                (min_id,) = conn.execute(
+                    "SELECT min_id FROM minutes WHERE min_filename = ?", (row[0],)
+                ).fetchone()
+                conn.executemany(PAGES_SQL, page_rows(min_id, minutes, codec))
+                index_pages(conn, min_id)
+                count += 1
+    return count
+
+
+def phrase(text):
+    """Quotes text as an FTS5 phrase, so that it's matched as a sequence of
+    words and any quotes or operators in it are matched literally
+
+    Args:
+        text (str): The words to search for
+    Returns:
+        query (str): The phrase query for the text
+    """
+    return '"' + text.replace('"', '""') + '"'
+
+
+def search(
+    conn, query, since=None, until=None, limit=20, highlight=False, markers=("[", "]")
+):
+    """Searches the pages of the minutes with the full-text index, ranked by
+    BM25. The query uses the FTS5 syntax, e.g. board AND estimates,
+    "board of estimates" for a phrase, contract* for a prefix or
+    NEAR(lease parking, 5)
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+        query (str): The FTS5 query to match, see phrase() to search for text
+        as it's written
+        since (datetime.date): The earliest meeting date to search, inclusive
+        until (datetime.date): The latest meeting date to search, inclusive
+        limit (int): The most pages to return
+        highlight (bool): Whether to return the whole text of each page
+        instead of a snippet around the matches
+        markers (tuple): The strings inserted before and after each match
+    Returns:
+        results (list): A dict for each page with the min_filename, min_date,
+        page_number, text and rank, the best match first
+    """
+    since = since.isoformat() if since else "0000-00-00"
+    until = until.isoformat() if until else "9999-99-99"
+    try:
+        cursor = conn.execute(SEARCH_SQL, (query, since, until, limit))
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"Invalid search query '{query}': {e}")
+    columns = [column[0] for column in cursor.description]
+    results = [dict(zip(columns, row)) for row in cursor]
+    texts = {result["page_id"]: decompress_text(result["text"]) for result in results}
+    texts.update(snippets(texts, query, highlight, markers))
+    for result in results:
+        result["text"] = texts[result.pop("page_id")]
+    return results
+
+
+def snippets(texts, query, highlight=False, markers=("[", "]")):
+    """Marks the matches of a full-text query in the pages it found, by
+    indexing them in an in-memory database since minutes_fts doesn't store
+    their text
+
+    Args:
+        texts (dict): The text of each page, by its page_id
+        query (str): The FTS5 query that matched the pages
+        highlight (bool): Whether to return the whole text of each page
+        instead of a snippet around the matches
+        markers (tuple): The strings inserted before and after each match
+    Returns:
+        snippets (dict): The snippet of each page, by its page_id
+    """
+    if highlight:
+        sql = SNIPPETS_SQL.format(text="highlight", snippet="")
+    else:
+        sql = SNIPPETS_SQL.format(text="snippet", snippet=", '...', 32")
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute(SNIPPETS_SCHEMA)
+        conn.executemany(
+            "INSERT INTO pages (rowid, page_text) VALUES (?, ?)", texts.items()
+        )
+        return dict(conn.execute(sql, (*markers, query)))
+    finally:
+        conn.close()
+
+
+def rebuild_search_index(conn):
+    """Rebuilds the full-text index from the minutes_pages table and merges
+    it into as few segments as possible, which speeds up queries after many
+    meetings have been added one batch at a time, and drops the entries of
+    compressed pages deleted without unindex_pages(), e.g. from the sqlite3
+    shell
+
+    Args:
+        conn (sqlite3.Connection): The connection to the database
+    Returns:
+        N/A: Void function
+    """
+    with conn:
+        conn.execute("INSERT INTO minutes_fts (minutes_fts) VALUES ('delete-all')")
+        pages = conn.execute("SELECT page_id, page_text FROM minutes_pages")
+        conn.executemany(INDEX_SQL, [(id, decompress_text(t)) for id, t in pages])
+        conn.execute("INSERT INTO minutes_fts (minutes_fts) VALUES ('optimize')")
+
+
+def load_pdf_dir(pdf_dir, db_path=None, batch_size=BATCH_SIZE, codec=None, **kwargs):
+    """Parses every pdf in a directory into the minutes table of a database
+
+    Args:
+        pdf_dir (pathlib.Path): The directory to search for pdf files
+        db_path (pathlib.Path): Path to the database file
+        batch_size (int): The number of rows inserted per transaction
+        codec (TextCodec): The codec to compress the text with, defaults to
+        the codec added to the database most recently, if any
+        kwargs: Passed on to iter_minutes(), e.g. since, until or cache
+    Returns:
+        count (int): The number of meetings loaded
+    """
+    conn = connect(db_path)
+    try:
+        create_schema(conn)
+        minutes_iter = iter_minutes(pdf_dir, **kwargs)
+        count = load_minutes(conn, minutes_iter, batch_size, codec)
+    finally:
+        conn.close()
+    print(f"Loaded {count} meetings into the minutes table.")
+    return count
+
+
+def ingest_pdf_dir(
+    pdf_dir, db_path=None, batch_size=BATCH_SIZE, prune=False, codec=None, **kwargs
+):
+    """Brings the database up to date with the pdfs in a directory. Each pdf
+    is hashed and only the ones that are new or whose contents have changed
+    since they were loaded are parsed, so a run over an archive that has
+    hardly changed only parses the few new meetings
+
+    Args:
+        pdf_dir (pathlib.Path): The directory to search for pdf files
+        db_path (pathlib.Path): Path to the database file
+        batch_size (int): The number of meetings loaded per transaction
+        prune (bool): Whether to delete the meetings whose pdfs are no longer
+        in pdf_dir, along with the rows derived from them
+        codec (TextCodec): The codec to compress the text with, defaults to
+        the codec added to the database most recently, if any
+        kwargs: Passed on to parse_pdfs(), e.g. cache or backend
+    Returns:
+        counts (dict): The number of pdfs that were added, updated, unchanged
+        or failed to parse, and of meetings removed
+    """
+    conn = connect(db_path)
+    try:
+        create_schema(conn)
+        sql = "SELECT min_filename, min_sha256 FROM minutes"
+        before = dict(conn.execute(sql))
+        pdf_paths = find_pdfs(pdf_dir)
+        changed = [p for p in pdf_paths if before.get(p.name) != hash_file(p)]
+        load_minutes(conn, parse_pdfs(changed, **kwargs), batch_size, codec)
+
+        names = {p.name for p in pdf_paths}
+        stale = [(name,) for name in before if name not in names]
+        if prune:
+            with conn:
+                for name in stale:
+                    unindex_pages(conn, name[0])
+                conn.executemany("DELETE FROM minutes WHERE min_filename = ?", stale)
+        after = dict(conn.execute(sql))
+    finally:
+        conn.close()
+
+    loaded = [p.name for p in changed if p.name in after]
+    counts = {
+        "added": sum(name not in before for name in loaded),
+        "updated": sum(before.get(name) not in (None, after[name]) for name in loaded),
+        "unchanged": len(pdf_paths) - len(changed),
+        "failed": sum(before.get(p.name) == after.get(p.name) for p in changed),
+        "removed": len(stale) if prune else 0,
+    }
+    print(", ".join(f"{value} {name}" for name, value in counts.items()))
+    return counts
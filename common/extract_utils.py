@@ -0,0 +1,273 @@
+import io
+import mmap
+import PyPDF2
+
+# PyMuPDF and pdfminer.six are optional, faster or more accurate extractors
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf  # the module's name before PyMuPDF 1.24
+    except ImportError:
+        pymupdf = None
+
+try:
+    import pdfminer
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.psparser import PSException
+except ImportError:
+    pdfminer = None
+
+DEFAULT_BACKEND = "pypdf2"
+
+
+class PdfBackend:
+    """Creates a reader for the text of a pdf, one page at a time. Each
+    subclass wraps a pdf library and is registered in BACKENDS by name
+
+    Usage:
+        with open_pdf(pdf_path, backend="pymupdf") as document:
+            text = document.extract_page(0)
+    """
+
+    name = None
+    version = None
+    # whether the library decodes some fonts with the wrong encoding, so
+    # that the producer of the pdf hints at the characters it misreads
+    misreads_encodings = False
+
+    def __init__(self, pdf_path, use_mmap=False):
+
+        self.pdf_path = pdf_path
+        self.use_mmap = use_mmap
+        self.page_count = 0
+        self.producer = None
+        self.file = None
+        self.map = None
+
+    @classmethod
+    def is_available(cls):
+        """Checks whether the library for the backend is installed
+
+        Returns:
+            available (bool): True if the backend can be used
+        """
+        return cls.version is not None
+
+    def open_stream(self):
+        """Opens the pdf for a library that reads from a file object. With
+        use_mmap the file is memory-mapped instead, so the pages of a large
+        pdf are loaded by the OS as they're read rather than copied through
+        the buffers of a file object
+
+        Returns:
+            stream (file object or mmap.mmap): The stream to read the pdf from
+        """
+        self.file = open(self.pdf_path, "rb")
+        if not self.use_mmap:
+            return self.file
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # an empty file can't be mapped
+            self.file.close()
+            raise ValueError(f"Couldn't map {self.pdf_path}: {e}")
+        return self.map
+
+    def extract_page(self, index):
+        """Extracts the text of a single page
+
+        Args:
+            index (int): The index of the page, starting at 0
+        Returns:
+            text (str): The text of the page without surrounding whitespace
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the file and any memory held by the library. Closing a
+        document more than once has no effect
+
+        Returns:
+            N/A: Void function
+        """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    @property
+    def closed(self):
+        return self.file is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PyPDF2Backend(PdfBackend):
+    """Creates a reader that extracts text with PyPDF2, the original and
+    default backend. It is the slowest of the backends and reads the quotes
+    and dashes of many of the minutes as other characters, which are fixed
+    by the REPLACEMENT_PROFILES when the text is cleaned"""
+
+    name = "pypdf2"
+    version = PyPDF2.__version__
+    misreads_encodings = True
+
+    def __init__(self, pdf_path, use_mmap=False):
+
+        super().__init__(pdf_path, use_mmap)
+        stream = self.open_stream()
+        try:
+            self.reader = PyPDF2.PdfFileReader(stream, strict=False)
+            self.page_count = self.reader.getNumPages()
+        except (ValueError, PyPDF2.utils.PdfReadError) as e:
+            self.close()
+            raise ValueError(f"PyPDF2 couldn't read {pdf_path}: {e}")
+        self.producer = self.read_producer()
+
+    def read_producer(self):
+        """Reads the name of the software that produced the pdf
+
+        Returns:
+            producer (str): The /Producer entry of the pdf's metadata, or
+            None if the pdf doesn't have one or it can't be read
+        """
+        try:
+            info = self.reader.getDocumentInfo()
+        except (PyPDF2.utils.PdfReadError, KeyError, TypeError, ValueError):
+            return None
+        if not info or not info.get("/Producer"):
+            return None
+        return str(info["/Producer"])
+
+    def extract_page(self, index):
+        return self.reader.getPage(index).extractText().strip()
+
+
+class PyMuPDFBackend(PdfBackend):
+    """Creates a reader that extracts text with PyMuPDF, which wraps the
+    MuPDF C library. It is several times faster than PyPDF2 and decodes the
+    fonts in the minutes correctly. MuPDF reads the file itself, outside of
+    Python, so use_mmap has no effect"""
+
+    name = "pymupdf"
+    version = pymupdf.version[0] if pymupdf else None
+
+    def __init__(self, pdf_path, use_mmap=False):
+
+        super().__init__(pdf_path, use_mmap)
+        open(pdf_path, "rb").close()  # raises the usual FileNotFoundError
+        try:
+            self.document = pymupdf.open(pdf_path)
+        except RuntimeError as e:
+            raise ValueError(f"PyMuPDF couldn't read {pdf_path}: {e}")
+        self.page_count = self.document.page_count
+        self.producer = self.document.metadata.get("producer") or None
+
+    def extract_page(self, index):
+        return self.document[index].get_text().strip()
+
+    def close(self):
+        if self.document is not None:
+            self.document.close()
+            self.document = None
+
+    @property
+    def closed(self):
+        return self.document is None
+
+
+class PdfMinerBackend(PdfBackend):
+    """Creates a reader that extracts text with pdfminer.six, a pure Python
+    library that analyses the layout of each page. It is slower than PyMuPDF
+    but doesn't need a compiled extension"""
+
+    name = "pdfminer"
+    version = pdfminer.__version__ if pdfminer else None
+
+    def __init__(self, pdf_path, use_mmap=False):
+
+        super().__init__(pdf_path, use_mmap)
+        stream = self.open_stream()
+        try:
+            document = PDFDocument(PDFParser(stream))
+            self.pages = list(PDFPage.create_pages(document))
+        except PSException as e:
+            self.close()
+            raise ValueError(f"pdfminer couldn't read {pdf_path}: {e}")
+        self.page_count = len(self.pages)
+        self.resources = PDFResourceManager(caching=True)
+        producer = document.info[0].get("Producer") if document.info else None
+        if isinstance(producer, bytes):
+            producer = producer.decode("latin-1")
+        self.producer = producer or None
+
+    def extract_page(self, index):
+        output = io.StringIO()
+        device = TextConverter(self.resources, output, laparams=LAParams())
+        try:
+            PDFPageInterpreter(self.resources, device).process_page(self.pages[index])
+        finally:
+            device.close()
+        return output.getvalue().strip()
+
+    def close(self):
+        self.pages = []
+        super().close()
+
+
+# the extraction backends by the name they are selected with
+BACKENDS = {
+    backend.name: backend
+    for backend in [PyPDF2Backend, PyMuPDFBackend, PdfMinerBackend]
+}
+
+
+def get_backend(name=DEFAULT_BACKEND):
+    """Looks up an extraction backend by name
+
+    Args:
+        name (str): The name of the backend in BACKENDS
+    Returns:
+        backend (type): The PdfBackend subclass for the name
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown pdf backend '{name}', use one of {list(BACKENDS)}")
+    backend = BACKENDS[name]
+    if not backend.is_available():
+        raise ValueError(f"The library for the pdf backend '{name}' isn't installed")
+    return backend
+
+
+def available_backends():
+    """Lists the backends whose libraries are installed
+
+    Returns:
+        names (list): The names of the backends that can be used
+    """
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+
+def open_pdf(pdf_path, backend=DEFAULT_BACKEND, use_mmap=False):
+    """Opens a pdf with an extraction backend
+
+    Args:
+        pdf_path (pathlib.Path): The path to the pdf to read
+        backend (str): The name of the backend in BACKENDS
+        use_mmap (bool): Whether to memory-map the pdf instead of reading it
+        through a file object
+    Returns:
+        document (PdfBackend): The reader for the pdf's text, which should be
+        closed or used as a context manager
+    """
+    return get_backend(backend)(pdf_path, use_mmap=use_mmap)
@@ -0,0 +1,216 @@
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from common.utils import hash_file
+
+
+class CrawlManifest:
+    """Creates a record of every meeting the scraper has downloaded and every
+    year page it has crawled, persisted as a JSON lines file next to the pdfs.
+    Each line is appended as the scraper works and later lines replace earlier
+    ones for the same meeting or year, so the manifest can be diffed against
+    the meeting links in memory instead of checking the pdf directory"""
+
+    def __init__(self, path=None):
+
+        if not path:
+            path = Path.cwd() / "pdf_files" / "manifest.jsonl"
+        self.path = path
+        self.meetings = {}
+        self.years = {}
+        self.revisions = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Reads the records stored in the manifest file, if it exists
+
+        Returns:
+            N/A: Void function
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["type"] == "meeting":
+                    self.meetings[record["date"]] = record
+                elif record["type"] == "year":
+                    self.years[record["year"]] = record
+                elif record["type"] == "revision":
+                    self.revisions[record["date"]] = record
+                elif record["type"] == "revision_cleared":
+                    self.revisions.pop(record["date"], None)
+
+    def append(self, record):
+        """Appends a record to the manifest file
+
+        Args:
+            record (dict): The record to store, with a "type" of "meeting",
+            "year", "revision" or "revision_cleared"
+        Returns:
+            N/A: Void function
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def record_year(self, year, links):
+        """Records the meeting links found when crawling the page for a year
+
+        Args:
+            year (str): The year of the page that was crawled
+            links (dict): The dates and links of the meetings on the page
+        Returns:
+            N/A: Void function
+        """
+        record = {
+            "type": "year",
+            "year": year,
+            "crawled_at": datetime.now().isoformat(timespec="seconds"),
+            "links": links,
+        }
+        with self._lock:
+            self.years[year] = record
+            self.append(record)
+
+    def record_download(self, year, date, url, pdf_file, headers=None):
+        """Records the size and content hash of a downloaded pdf
+
+        Args:
+            year (str): Year in which the BOE meeting occurred
+            date (str): Date key of the meeting, with format YYYY_MM_DD
+            url (str): Link the pdf was downloaded from
+            pdf_file (pathlib.Path): Path to the downloaded pdf
+            headers (dict): Headers of the response the pdf was downloaded
+            from, used to store its ETag and Last-Modified validators
+        Returns:
+            record (dict): The record stored for the meeting
+        """
+        headers = headers or {}
+        record = {
+            "type": "meeting",
+            "date": date,
+            "year": year,
+            "url": url,
+            "size": pdf_file.stat().st_size,
+            "sha256": hash_file(pdf_file),
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+        }
+        with self._lock:
+            self.meetings[date] = record
+            self.append(record)
+        return record
+
+    def flag_revision(self, date, previous):
+        """Flags a meeting whose pdf was republished with different contents,
+        so that text and indexes built from the previous pdf can be rebuilt
+
+        Args:
+            date (str): Date key of the revised meeting
+            previous (dict): The meeting record from before the revision
+        Returns:
+            record (dict): The revision record stored for the meeting
+        """
+        record = {
+            "type": "revision",
+            "date": date,
+            "previous_sha256": previous["sha256"],
+            "sha256": self.meetings[date]["sha256"],
+            "detected_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self.revisions[date] = record
+            self.append(record)
+        return record
+
+    def clear_revision(self, date):
+        """Clears the revision flag once a meeting has been reprocessed
+
+        Args:
+            date (str): Date key of the revised meeting
+        Returns:
+            N/A: Void function
+        """
+        with self._lock:
+            if self.revisions.pop(date, None):
+                self.append({"type": "revision_cleared", "date": date})
+
+    def sync(self, meeting_links, dir=None):
+        """Records any pdfs that were downloaded before the manifest existed,
+        so that an existing archive doesn't have to be downloaded again
+
+        Args:
+            meeting_links (dict): Nested dict of year and the links to pdfs of
+            the BOE meetings in that year
+            dir (pathlib.Path): Path to directory that contains the pdf_files,
+            defaults to the directory of the manifest file
+        Returns:
+            N/A: Void function
+        """
+        if not dir:
+            dir = self.path.parent
+        for year, meetings in meeting_links.items():
+            for date, link in meetings.items():
+                pdf_file = dir / year / (date + ".pdf")
+                if date not in self.meetings and pdf_file.exists():
+                    self.record_download(year, date, link, pdf_file)
+
+    def is_settled(self, year):
+        """Checks whether the page for a year can still change. A past year is
+        settled once its page has been crawled after the year ended and every
+        meeting listed on it has been downloaded
+
+        Args:
+            year (str): The year of the page to check
+        Returns:
+            settled (bool): True if the year page doesn't need to be crawled
+        """
+        record = self.years.get(year)
+        if record is None or int(year) >= datetime.now().year:
+            return False
+        if record["crawled_at"] < f"{int(year) + 1}-01-01":
+            return False
+        return all(date in self.meetings for date in record["links"])
+
+    def missing(self, meeting_links):
+        """Diffs the meeting links against the downloads in the manifest
+
+        Args:
+            meeting_links (dict): Nested dict of year and the links to pdfs of
+            the BOE meetings in that year
+        Returns:
+            missing_links: Nested dict of pdfs that still need to be downloaded
+            extra_pdfs: Set of downloaded pdfs not listed in the meeting links
+        """
+        missing_links = defaultdict(dict)
+        expected = set()
+        for year, meetings in meeting_links.items():
+            for date, link in meetings.items():
+                expected.add(date)
+                if date not in self.meetings:
+                    missing_links[year][date] = link
+        extra_pdfs = {date + ".pdf" for date in self.meetings.keys() - expected}
+        return missing_links, extra_pdfs
+
+    def compact(self):
+        """Rewrites the manifest file with only the latest record for each
+        meeting, year and outstanding revision
+
+        Returns:
+            N/A: Void function
+        """
+        with self._lock:
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w") as f:
+                for records in [self.years, self.meetings, self.revisions]:
+                    for record in records.values():
+                        f.write(json.dumps(record) + "\n")
+            temp_path.replace(self.path)
@@ -0,0 +1,256 @@
+import re
+from itertools import groupby
+from pathlib import Path
+
+import pandas as pd
+
+from common.compress_utils import decompress_text
+from common.parse_utils import clean_raw_text, parse_pdf_date, TEXT_DF_COLUMNS
+
+# pyarrow is optional, it's only needed to export and load the corpus
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# the fiscal year of the City of Baltimore starts in July, and is named
+# after the calendar year it ends in
+FISCAL_YEAR_START_MONTH = 7
+
+# the pages in each row group, the smallest unit that can be skipped when
+# loading a range of dates
+ROW_GROUP_SIZE = 1000
+
+# the columns of each page, the fiscal_year is the name of the directory of
+# each partition instead. text is the cleaned text of the page and raw_text
+# the text as it was extracted, which the database doesn't keep
+PAGE_COLUMNS = ["date", "meeting", "min_filename", "page_number", "text", "raw_text"]
+
+# the columns stored with a dictionary of their distinct values, which are
+# repeated on every page of a meeting
+DICTIONARY_COLUMNS = ["date", "meeting", "min_filename", "page_number"]
+
+
+def fiscal_year(date):
+    """Finds the fiscal year of a date
+
+    Args:
+        date (datetime.date): The date of a meeting
+    Returns:
+        year (int): The fiscal year, e.g. 2011 for July 2010 to June 2011
+    """
+    if date.month >= FISCAL_YEAR_START_MONTH:
+        return date.year + 1
+    return date.year
+
+
+def check_pyarrow():
+    """Raises an error if pyarrow isn't installed
+
+    Returns:
+        N/A: Void function
+    """
+    if pa is None:
+        raise ValueError(
+            "pyarrow is needed for Parquet, pip install -r requirements-parquet.txt"
+        )
+
+
+def pages_schema():
+    """Returns the Arrow schema of the pages in the dataset"""
+    return pa.schema(
+        [
+            ("date", pa.date32()),
+            ("meeting", pa.int8()),
+            ("min_filename", pa.string()),
+            ("page_number", pa.int16()),
+            ("text", pa.string()),
+            ("raw_text", pa.string()),
+        ]
+    )
+
+
+def minutes_pages(minutes_iter):
+    """Converts parsed minutes into the meetings to export
+
+    Args:
+        minutes_iter (iterable): The parsed minutes, such as the output of
+        iter_minutes()
+    Yields:
+        meeting (tuple): The min_filename, date and meeting number of each
+        meeting, and the cleaned and raw text of each of its pages
+    """
+    for minutes in minutes_iter:
+        date, meeting = parse_pdf_date(minutes.pdf_path)
+        raw_pages = list(minutes.pages)
+        pages = [clean_raw_text(page, profiles=minutes.profiles) for page in raw_pages]
+        yield minutes.pdf_path.name, date.date(), meeting, pages, raw_pages
+
+
+def database_pages(conn):
+    """Reads the meetings to export from the database of minutes
+
+    Args:
+        conn (sqlite3.Connection): A connection opened with connect() from
+        common/db_utils.py, so that compressed text can be read
+    Yields:
+        meeting (tuple): The min_filename, date and meeting number of each
+        meeting, and the cleaned text of each of its pages, with None for
+        their raw text which isn't stored in the database
+    """
+    rows = conn.execute(
+        "SELECT m.min_id, m.min_filename, p.page_text FROM minutes AS m "
+        "JOIN minutes_pages AS p ON p.page_min_id = m.min_id "
+        "ORDER BY m.min_date, m.min_filename, p.page_number"
+    )
+    for (_, filename), pages in groupby(rows, key=lambda row: row[:2]):
+        date, meeting = parse_pdf_date(Path(filename))
+        pages = [decompress_text(page[2]) for page in pages]
+        yield filename, date.date(), meeting, pages, None
+
+
+def pages_table(meetings):
+    """Builds an Arrow table with a row for each page of the meetings
+
+    Args:
+        meetings (iterable): The meetings yielded by minutes_pages() or
+        database_pages()
+    Returns:
+        table (pyarrow.Table): The pages, sorted by date, meeting and page
+    """
+    columns = {name: [] for name in PAGE_COLUMNS}
+    for filename, date, meeting, pages, raw_pages in meetings:
+        raw_pages = raw_pages or [None] * len(pages)
+        for number, (text, raw_text) in enumerate(zip(pages, raw_pages), start=1):
+            columns["date"].append(date)
+            columns["meeting"].append(meeting)
+            columns["min_filename"].append(filename)
+            columns["page_number"].append(number)
+            columns["text"].append(text)
+            columns["raw_text"].append(raw_text)
+    table = pa.table(columns, schema=pages_schema())
+    return table.sort_by([(name, "ascending") for name in PAGE_COLUMNS[:4]])
+
+
+def write_partition(table, dataset_dir, year, part=0):
+    """Writes the pages of a fiscal year to the dataset
+
+    Args:
+        table (pyarrow.Table): The pages of the fiscal year
+        dataset_dir (pathlib.Path): The directory of the dataset
+        year (int): The fiscal year
+        part (int): The number of the file within the partition, the files of
+        the partition are replaced when it's 0
+    Returns:
+        path (pathlib.Path): The path to the file written
+    """
+    partition_dir = dataset_dir / f"fiscal_year={year}"
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    if part == 0:
+        for path in partition_dir.glob("*.parquet"):
+            path.unlink()
+    path = partition_dir / f"part-{part}.parquet"
+    pq.write_table(
+        table,
+        path,
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=DICTIONARY_COLUMNS,
+        compression="zstd",
+    )
+    return path
+
+
+def export_pages(meetings, dataset_dir):
+    """Exports the pages of the meetings as a Parquet dataset with a
+    partition for each fiscal year, in the directories
+    dataset_dir/fiscal_year=YYYY. The meetings are written a fiscal year at
+    a time, so only one year of text is held in memory when they're in date
+    order, and a fiscal year that's exported again replaces the old one
+
+    Args:
+        meetings (iterable): The meetings yielded by minutes_pages() or
+        database_pages()
+        dataset_dir (pathlib.Path): The directory of the dataset
+    Returns:
+        years (list): The fiscal years that were written
+    """
+    check_pyarrow()
+    parts = {}
+    for year, year_meetings in groupby(meetings, key=lambda m: fiscal_year(m[1])):
+        part = parts.get(year, -1) + 1  # the meetings weren't in date order
+        write_partition(pages_table(year_meetings), dataset_dir, year, part)
+        parts[year] = part
+    print(f"Exported {len(parts)} fiscal years to {dataset_dir}")
+    return list(parts)
+
+
+def read_pages(dataset_dir, columns=None, since=None, until=None):
+    """Loads pages from the Parquet dataset. Only the columns asked for are
+    read, and only the partitions and row groups that may hold pages between
+    since and until, so the metadata of the pages can be loaded without
+    reading any of their text
+
+    Args:
+        dataset_dir (pathlib.Path): The directory of the dataset
+        columns (list): The columns to load, from fiscal_year and
+        PAGE_COLUMNS, defaults to every column
+        since (datetime.date): The earliest meeting date to load, inclusive
+        until (datetime.date): The latest meeting date to load, inclusive
+    Returns:
+        pages_df (pandas.DataFrame): A row for each page, with the date as a
+        datetime64 column and min_filename as a category
+    """
+    check_pyarrow()
+    filters = []
+    if since:
+        filters += [("fiscal_year", ">=", fiscal_year(since)), ("date", ">=", since)]
+    if until:
+        filters += [("fiscal_year", "<=", fiscal_year(until)), ("date", "<=", until)]
+    table = pq.read_table(
+        dataset_dir,
+        columns=columns,
+        filters=filters or None,
+        partitioning="hive",
+        read_dictionary=["min_filename"],
+    )
+    pages_df = table.to_pandas(date_as_object=False)
+    if "fiscal_year" in pages_df:
+        pages_df["fiscal_year"] = pages_df["fiscal_year"].astype(int)
+    return pages_df
+
+
+def read_text_df(dataset_dir, since=None, until=None, clean=False):
+    """Loads the table of minutes from the Parquet dataset instead of parsing
+    the pdfs, with a row for each meeting. By default the minutes are the raw
+    text, the same as store_pdf_text_to_df() returns, so they still need to
+    be cleaned. With clean=True they're the cleaned text, which is also
+    available from datasets exported from the database, and mustn't be
+    cleaned again
+
+    Args:
+        dataset_dir (pathlib.Path): The directory of the dataset
+        since (datetime.date): The earliest meeting date to load, inclusive
+        until (datetime.date): The latest meeting date to load, inclusive
+        clean (bool): Whether to load the cleaned text instead of the raw text
+    Returns:
+        text_df (pandas.DataFrame): A dataframe with the date, page_number and
+        minutes of each meeting, in order of date
+    """
+    text = "text" if clean else "raw_text"
+    columns = ["date", "meeting", "min_filename", text]
+    pages_df = read_pages(dataset_dir, columns, since, until)
+    if pages_df[text].isna().any():
+        raise ValueError(
+            "The dataset doesn't have the raw text of every page, it's only "
+            "exported from parsed pdfs, use clean=True for the cleaned text"
+        )
+    rows = {name: [] for name in TEXT_DF_COLUMNS}
+    groups = pages_df.groupby(["date", "meeting", "min_filename"], observed=True)
+    for (date, _, _), group in groups:
+        minutes = "".join(group[text])
+        match = re.match(r"[0-9]+", minutes)
+        rows["date"].append(date.date())
+        rows["page_number"].append(match.group(0) if match else "")
+        rows["minutes"].append(minutes.strip())
+    return pd.DataFrame(rows, columns=TEXT_DF_COLUMNS, dtype=object)
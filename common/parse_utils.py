@@ -1,97 +1,449 @@
-import PyPDF2
 import datetime as dt
 import pandas as pd
 import re
-from datetime import datetime
+import hashlib
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-from common.utils import replace_chars
+from common.extract_utils import get_backend, open_pdf, DEFAULT_BACKEND
+from common.utils import detect_profiles, get_normalizer, hash_file
+from common.utils import REPLACEMENTS, REPLACEMENT_PROFILES
 
+# identifies the code that produced a cached text so that changing the pdf
+# library, the cleaning steps or the replacement table invalidates the cache
+CLEANING_VERSION = (
+    "2-"
+    + hashlib.sha1(repr([REPLACEMENTS, REPLACEMENT_PROFILES]).encode()).hexdigest()[:8]
+)
 
-def parse_pdf(pdf_path):
-    """Parses the pdf of the minutes from a BOE meeting and cleans the text
+
+def text_version(backend=DEFAULT_BACKEND):
+    """Identifies the text extracted and cleaned with a backend, which is
+    part of the key of every entry the parser looks up in a TextCache
+
+    Args:
+        backend (str): The name of the extraction backend
+    Returns:
+        version (str): The backend, its library version and CLEANING_VERSION
+    """
+    backend = get_backend(backend)
+    return f"{backend.name}-{backend.version}/clean-{CLEANING_VERSION}"
+
+
+TEXT_VERSION = text_version()
+
+# columns of the table of minutes built by store_pdf_text_to_df()
+TEXT_DF_COLUMNS = ["date", "page_number", "minutes"]
+
+# pdfs are named after the meeting date, with "_meeting2" etc appended when
+# the BOE met more than once on the same day
+PDF_NAME_PATTERN = re.compile(r"(\d{4}_\d{2}_\d{2})(?:_meeting(\d+))?")
+
+# the most pages of text a Minutes object keeps when pages are extracted one
+# at a time instead of all at once by parse_and_clean_pages()
+PAGE_CACHE_SIZE = 16
+
+
+def parse_pdf(pdf_path, cache=None, backend=DEFAULT_BACKEND, use_mmap=False):
+    """Parses the pdf of the minutes from a BOE meeting and cleans the text.
+    The pdf is closed once its text has been extracted
 
     Args:
         pdf_path (pathlib.Path): The path to the pdf to parse
+        cache (TextCache): Cache of previously extracted text
+        backend (str): The name of the extraction backend in BACKENDS
+        use_mmap (bool): Whether to memory-map the pdf while it's parsed
     Returns:
         minutes (Minutes): An instance of the Minutes class
     """
     try:
-        minutes = Minutes(pdf_path)
-        minutes.parse_and_clean_pages()
+        with Minutes(pdf_path, backend=backend, use_mmap=use_mmap) as minutes:
+            minutes.parse_and_clean_pages(cache=cache)
     except (ValueError, FileNotFoundError) as e:
         print(f"The following error occurred parsing file '{pdf_path}': {e}")
         raise e
     return minutes
 
 
-def store_pdf_text_to_df(path):
+def parse_pdf_date(pdf_path):
+    """Parses the meeting date from the name of a pdf of minutes
+
+    Args:
+        pdf_path (pathlib.Path): Path to pdf ending in */YYYY_MM_DD.pdf or
+        */YYYY_MM_DD_meetingN.pdf
+    Returns:
+        date (datetime.datetime): The date of the meeting
+        meeting (int): The number of the meeting on that date, starting at 1
+    """
+    match = PDF_NAME_PATTERN.fullmatch(pdf_path.stem)
+    if not match:
+        raise ValueError(f"No date found in the name of {pdf_path}")
+    date = dt.datetime.strptime(match.group(1), "%Y_%m_%d")
+    return date, int(match.group(2) or 1)
+
+
+def find_pdfs(pdf_dir, since=None, until=None):
+    """Finds the pdfs in a directory that are named after a meeting date
+
+    Args:
+        pdf_dir (pathlib.Path): The directory to search for pdf files
+        since (datetime.date): The earliest meeting date to include, inclusive
+        until (datetime.date): The latest meeting date to include, inclusive
+    Returns:
+        pdf_paths (list): The paths to the pdfs in order of meeting date, and
+        of meeting number for pdfs of the same date
+    """
+    dated_paths = []
+    for pdf_path in pdf_dir.rglob("*.pdf"):
+        try:
+            date, meeting = parse_pdf_date(pdf_path)
+        except ValueError:
+            print(f"No date found for file {pdf_path}")
+            continue
+        if since and date.date() < since:
+            continue
+        if until and date.date() > until:
+            continue
+        dated_paths.append((date, meeting, pdf_path))
+    return [pdf_path for _, _, pdf_path in sorted(dated_paths)]
+
+
+def parse_pdfs(pdf_paths, cache=None, backend=DEFAULT_BACKEND, use_mmap=False):
+    """Parses pdfs one at a time, skipping the ones that can't be read
+
+    Args:
+        pdf_paths (iterable): The paths to the pdfs to parse
+        cache (TextCache): Cache of previously extracted text
+        backend (str): The name of the extraction backend in BACKENDS
+        use_mmap (bool): Whether to memory-map each pdf while it's parsed
+    Yields:
+        minutes (Minutes): The parsed minutes of each pdf
+    """
+    for pdf_path in pdf_paths:
+        try:
+            yield parse_pdf(pdf_path, cache=cache, backend=backend, use_mmap=use_mmap)
+        except ValueError:
+            continue  # parse_pdf() has already reported the error
+
+
+def iter_minutes(
+    pdf_dir,
+    since=None,
+    until=None,
+    cache=None,
+    backend=DEFAULT_BACKEND,
+    use_mmap=False,
+):
+    """Parses the pdfs in a directory one at a time in order of meeting date,
+    so the archive can be processed without holding the text of every meeting
+    in memory at once. Only the paths of the pdfs are gathered up front
+
+    Args:
+        pdf_dir (pathlib.Path): The directory to search for pdf files
+        since (datetime.date): The earliest meeting date to parse, inclusive
+        until (datetime.date): The latest meeting date to parse, inclusive
+        cache (TextCache): Cache of previously extracted text
+        backend (str): The name of the extraction backend in BACKENDS
+        use_mmap (bool): Whether to memory-map each pdf while it's parsed
+    Yields:
+        minutes (Minutes): The parsed minutes of each meeting, skipping pdfs
+        that aren't named after a date or can't be read
+    """
+    pdf_paths = find_pdfs(pdf_dir, since, until)
+    yield from parse_pdfs(pdf_paths, cache=cache, backend=backend, use_mmap=use_mmap)
+
+
+def store_pdf_text_to_df(
+    path,
+    workers=1,
+    chunksize=4,
+    cache=None,
+    backend=DEFAULT_BACKEND,
+    use_mmap=False,
+    supervisor=None,
+):
     """Finds .pdf files stored at the given url and stores them within the
     repository for later analysis.
 
     Args:
-        base_url (str): The main url for the Comptroller of Baltimore's webiste
-        minutes_url (str): The url where the function can find links to pages of
-        pdf files organized by year
+        path (pathlib.Path): The directory to search for pdf files
+        workers (int): The number of processes used to parse the pdfs,
+        defaults to parsing them one at a time in this process
+        chunksize (int): The number of pdfs sent to a process at a time
+        cache (TextCache): Cache of previously extracted text, so that
+        unchanged pdfs aren't parsed again
+        backend (str): The name of the extraction backend in BACKENDS
+        use_mmap (bool): Whether to memory-map each pdf while it's parsed
+        supervisor (ParseSupervisor): Parses each pdf in its own process with
+        a time and memory limit, quarantining the pdfs that fail
     Returns:
-        None: This is a void function.
+        text_df (pandas.DataFrame): A dataframe with the date, page_number and
+        minutes of each pdf, in the order the pdfs were found
     """
     pdf_paths = list(path.rglob("*.pdf"))
-    text_df = pd.DataFrame(columns=["date", "page_number", "minutes"])
-    for pdf_path in pdf_paths:
+    parse_row = partial(parse_pdf_row, cache=cache, backend=backend, use_mmap=use_mmap)
+    if supervisor:
+        # a pdf that can't be read raises its error so that it's quarantined
+        parse_row = partial(parse_row, raise_errors=True)
+        rows = supervisor.map(parse_row, pdf_paths, workers=workers)
+    elif workers > 1:
+        # executor.map() returns the rows in the same order as pdf_paths
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(parse_row, pdf_paths, chunksize=chunksize))
+    else:
+        rows = map(parse_row, pdf_paths)
+
+    text_df = build_text_df(rows)
+    print(f"Wrote {len(text_df)} rows to the table of minutes.")
+    return text_df
+
+
+def build_text_df(rows):
+    """Builds the table of minutes from the rows parsed from each pdf. The
+    rows are gathered into one list per column and the dataframe is created
+    once at the end, so the cost grows linearly with the number of meetings
+    instead of copying the whole table for every row
+
+    Args:
+        rows (iterable): Dicts with the date, page_number and minutes of each
+        pdf, rows that are None are skipped
+    Returns:
+        text_df (pandas.DataFrame): A dataframe with one row per pdf
+    """
+    columns = {name: [] for name in TEXT_DF_COLUMNS}
+    for row in rows:
+        if row is None:
+            continue
+        for name, values in columns.items():
+            values.append(row[name])
+    return pd.DataFrame(columns, columns=TEXT_DF_COLUMNS, dtype=object)
+
+
+def parse_pdf_row(
+    pdf_path, cache=None, backend=DEFAULT_BACKEND, use_mmap=False, raise_errors=False
+):
+    """Extracts the text of a pdf into a row for the table of minutes. This
+    is a module level function so that it can be sent to worker processes
+
+    Args:
+        pdf_path (pathlib.Path): The path to the pdf to parse
+        cache (TextCache): Cache of previously extracted text
+        backend (str): The name of the extraction backend in BACKENDS
+        use_mmap (bool): Whether to memory-map the pdf while it's parsed
+        raise_errors (bool): Whether to raise the error when the pdf can't be
+        read, e.g. so that a ParseSupervisor quarantines it, rather than
+        printing it and returning None
+    Returns:
+        row (dict): The date, page_number and minutes of the pdf, or None if
+        the pdf couldn't be read
+    """
+    try:
+        date = parse_pdf_date(pdf_path)[0].date()
+    except ValueError:
+        print(f"No date found for file {pdf_path}")
+        return None
+
+    version = text_version(backend) if cache else None
+    entry = cache.get(pdf_path, version) if cache else None
+    if entry:
+        minutes = entry["raw_text"]
+    else:
         # print(f"Parsing file: {pdf_path.name}")
-        minutes = ""
-        pdfFileObj = open(pdf_path, "rb")
         try:
-            pdfReader = PyPDF2.PdfFileReader(pdfFileObj, strict=False)
+            document = open_pdf(pdf_path, backend, use_mmap=use_mmap)
         except ValueError:
+            if raise_errors:
+                raise
             print(f"An error occurred reading file {pdf_path}")
-        for page in pdfReader.pages:
-            minutes += page.extractText().strip()
-
-        date_string = pdf_path.stem
-        date = datetime.strptime(date_string, "%Y_%m_%d").date()
-        page_number = re.findall(r"(^[0-9]+)", minutes)
-        if page_number:
-            page_number = page_number[0]
-        else:
-            page_number = ""
-        try:
-            row = {"date": date, "page_number": page_number, "minutes": minutes.strip()}
-            text_df = text_df.append(row, ignore_index=True)
-        except ValueError:
-            print(f"No date found for file {pdf_path}")
-    print(f"Wrote {len(text_df)} rows to the table of minutes.")
-    return text_df
+            return None
+        with document:
+            minutes, page_offsets = join_pages(
+                document.extract_page(i) for i in range(document.page_count)
+            )
+        if cache:
+            profiles = text_profiles(minutes, document.producer, backend)
+            clean_text = clean_raw_text(minutes, profiles=profiles)
+            cache.put(pdf_path, minutes, clean_text, page_offsets, version)
+
+    page_number = re.findall(r"(^[0-9]+)", minutes)
+    if page_number:
+        page_number = page_number[0]
+    else:
+        page_number = ""
+    return {"date": date, "page_number": page_number, "minutes": minutes.strip()}
+
+
+def join_pages(page_texts):
+    """Joins the text of each page into the raw text of a pdf and records
+    where each page starts within it
+
+    Args:
+        page_texts (iterable): The text of each page, in order
+    Returns:
+        raw_text (str): The text of every page joined together
+        page_offsets (list): The index in raw_text where each page starts
+    """
+    page_texts = list(page_texts)
+    page_offsets = []
+    offset = 0
+    for text in page_texts:
+        page_offsets.append(offset)
+        offset += len(text)
+    return "".join(page_texts), page_offsets
+
+
+def text_profiles(raw_text, producer=None, backend=DEFAULT_BACKEND):
+    """Picks the REPLACEMENT_PROFILES for the text extracted from a pdf. The
+    profiles only apply to backends that misread the encodings of the pdfs,
+    the text of the other backends is only collapsed
+
+    Args:
+        raw_text (str): The text extracted from a pdf
+        producer (str): The /Producer entry of the pdf's metadata, if any
+        backend (str): The name of the backend that extracted the text
+    Returns:
+        profiles (tuple): The names of the profiles to apply
+    """
+    if not get_backend(backend).misreads_encodings:
+        return ()
+    return detect_profiles(raw_text, producer)
+
+
+def clean_raw_text(raw_text, producer=None, profiles=None):
+    """Collapses the whitespace in the text extracted from a pdf and replaces
+    the characters that the pdf library misreads in that document
+
+    Args:
+        raw_text (str): The text extracted from a pdf
+        producer (str): The /Producer entry of the pdf's metadata, if any
+        profiles (tuple): The names of the REPLACEMENT_PROFILES to apply,
+        detected from the text and producer if they aren't given
+    Returns:
+        clean_text (str): The cleaned text
+    """
+    if profiles is None:
+        profiles = detect_profiles(raw_text, producer)
+    return get_normalizer(profiles).normalize(raw_text)
+
+
+class MinutesPages(Sequence):
+    """Creates a read-only sequence of the text on each page of a set of
+    minutes. Once the whole pdf has been parsed each page is sliced out of
+    the raw text, otherwise pages are extracted from the pdf the first time
+    they are accessed and the most recently used ones are kept in memory"""
+
+    def __init__(self, minutes, maxsize=PAGE_CACHE_SIZE):
+
+        self.minutes = minutes
+        self.maxsize = maxsize
+        self._pages = OrderedDict()
+
+    def __len__(self):
+        return self.minutes.page_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+
+        minutes = self.minutes
+        if minutes.page_offsets is not None:
+            start, end = minutes.page_span(index)
+            return minutes.raw_text[start:end]
+        if index in self._pages:
+            self._pages.move_to_end(index)
+            return self._pages[index]
+        if minutes.reader is None or minutes.reader.closed:
+            raise ValueError("The pdf of the minutes has been closed")
+
+        text = minutes.reader.extract_page(index)
+        self._pages[index] = text
+        if len(self._pages) > self.maxsize:
+            self._pages.popitem(last=False)  # drops the least recently used
+        return text
+
+    def clear(self):
+        """Drops the pages kept in memory
+
+        Returns:
+            N/A: Void function
+        """
+        self._pages.clear()
 
 
 class Minutes:
     """Creates an object that represents the minutes for an individual BOE
     meeting. This object contains the methods used to parse the pdf and
-    stores the outputs of that parsing as a set of attributes"""
+    stores the outputs of that parsing as a set of attributes. The pdf stays
+    open until close() is called, or until the end of a with block:
 
-    def __init__(self, pdf_path):
+    Usage:
+        with Minutes(pdf_path) as minutes:
+            minutes.parse_and_clean_pages()
+    """
+
+    def __init__(self, pdf_path, backend=DEFAULT_BACKEND, use_mmap=False):
 
         self.pdf_path = pdf_path
+        self.backend = backend
+        self.use_mmap = use_mmap
         self.reader = self.read_pdf(pdf_path)
-        self.page_count = self.reader.getNumPages()
+        self.page_count = self.reader.page_count
+        self.producer = self.reader.producer
+        self.profiles = None
         self.raw_text = None
         self.clean_text = None
-        self.date = self.parse_date(pdf_path)
+        self.page_offsets = None
+        self.pages = MinutesPages(self)
+        self._sha256 = None
+        try:
+            self.date = self.parse_date(pdf_path)
+        except ValueError:
+            self.close()
+            raise
         self.meeting_date = self.date.strftime("%Y-%m-%d")
 
     def read_pdf(self, pdf_path):
-        """Initializes a PdfFileReader instance from the PyPDF2 library that
+        """Opens the pdf with the extraction backend in self.backend, which
         will be called in subsequent methods and attributes
 
         Args:
             pdf_path (pathlib.Path): The path to the pdf file to read
         Returns:
-            reader (PyPDF2.PdfFileReader): Returns an instance of PdfFileReader
-            that will be stored in self.reader
+            reader (PdfBackend): Returns an instance of the backend that
+            will be stored in self.reader
+        """
+        return open_pdf(pdf_path, self.backend, use_mmap=self.use_mmap)
+
+    def close(self):
+        """Closes the pdf. The text that has already been parsed, including
+        every page once parse_and_clean_pages() has run, is still available
+
+        Returns:
+            N/A: Void function
         """
-        file = open(pdf_path, "rb")
-        reader = PyPDF2.PdfFileReader(file, strict=False)
-        return reader
+        if self.reader is not None:
+            self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def sha256(self):
+        """The sha256 hex digest of the pdf's contents, hashed the first time
+        it's used"""
+        if self._sha256 is None:
+            self._sha256 = hash_file(self.pdf_path)
+        return self._sha256
 
     def parse_date(self, pdf_path):
         """Parses a datetime object from the path to the pdf file for use
@@ -99,31 +451,83 @@ class Minutes:
 
         Args:
             pdf_path (pathlib.Path): Path to pdf ending in */YYYY_MM_DD.pdf
+            or */YYYY_MM_DD_meetingN.pdf
         Returns:
             date (datetime.datetime): Returns a datetime object of the
             date parsed from the pdf_path that will be stored in self.date
         """
-        date_str = pdf_path.stem
-        date = dt.datetime.strptime(date_str, "%Y_%m_%d")
+        date, _ = parse_pdf_date(pdf_path)
         return date
 
-    def parse_and_clean_pages(self):
+    def page_span(self, index):
+        """Finds where a page starts and ends within self.raw_text
+
+        Args:
+            index (int): The index of the page, starting at 0
+        Returns:
+            start (int): The index in self.raw_text where the page starts
+            end (int): The index in self.raw_text where the page ends
+        """
+        if self.page_offsets is None:
+            raise ValueError("The pages of the minutes haven't been parsed yet")
+        start = self.page_offsets[index]
+        if index + 1 < len(self.page_offsets):
+            end = self.page_offsets[index + 1]
+        else:
+            end = len(self.raw_text)
+        return start, end
+
+    def page_of(self, offset):
+        """Finds the page that contains a position in self.raw_text, such as
+        the start of a regex match, so that it can be cited by page
+
+        Args:
+            offset (int): The index of a character in self.raw_text
+        Returns:
+            index (int): The index of the page, starting at 0
+        """
+        if self.page_offsets is None:
+            raise ValueError("The pages of the minutes haven't been parsed yet")
+        if not 0 <= offset < len(self.raw_text):
+            raise IndexError("offset out of range")
+        return bisect_right(self.page_offsets, offset) - 1
+
+    def parse_and_clean_pages(self, cache=None):
         """Extracts text from pdf pages and stores it in self.raw_text then
-        cleans the parsed text and stores the result in self.clean_text
+        cleans the parsed text and stores the result in self.clean_text. The
+        index where each page starts in self.raw_text is stored in
+        self.page_offsets and the replacement profiles used to clean the text
+        in self.profiles
 
         Args:
             self: Uses the self.reader object created by self.read_pdf()
+            cache (TextCache): Cache of previously extracted text, which is
+            used instead of parsing the pdf when it has an entry for the pdf
         Returns:
             N/A: Void function
         """
+        version = text_version(self.backend)
+        entry = cache.get(self.pdf_path, version) if cache else None
+        if entry and "page_offsets" in entry:
+            self.raw_text = entry["raw_text"]
+            self.clean_text = entry["clean_text"]
+            self.page_offsets = entry["page_offsets"]
+            self.profiles = text_profiles(self.raw_text, self.producer, self.backend)
+            return
 
-        # extract the raw text
-        text_raw = ""
-        for page in self.reader.pages:
-            text_raw += page.extractText().strip()
-        self.raw_text = text_raw
+        # extract the raw text, reusing any pages that were already extracted
+        page_texts = (self.pages[i] for i in range(self.page_count))
+        self.raw_text, self.page_offsets = join_pages(page_texts)
+        self.pages.clear()
 
-        # clean the raw text
-        clean_text = " ".join(self.raw_text.split())  # remove double spaces
-        clean_text = replace_chars(clean_text)
-        self.clean_text = clean_text
+        # clean the raw text with the replacements this document needs
+        self.profiles = text_profiles(self.raw_text, self.producer, self.backend)
+        self.clean_text = clean_raw_text(self.raw_text, profiles=self.profiles)
+        if cache:
+            cache.put(
+                self.pdf_path,
+                self.raw_text,
+                self.clean_text,
+                self.page_offsets,
+                version,
+            )
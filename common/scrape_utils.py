@@ -1,10 +1,21 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 from pathlib import Path
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+import json
+import os
 import re
-from datetime import datetime
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
+from common.cache_utils import validator_headers
 from common.utils import levenshtein_match
 
 # months is here because it is used in multiple places
@@ -25,39 +36,321 @@ MONTHS = (
 
 BASE_URL = "https://comptroller.baltimorecity.gov"
 
+# (connect, read) timeouts in seconds applied to every request
+TIMEOUT = (10, 60)
+
+# server errors worth retrying because they are usually transient
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# responses asking the scraper to slow down, which pause every request to the
+# host rather than only the one that got them
+PAUSE_STATUSES = (429, 503)
+
+# the most requests per second, and the most requests at once, that the
+# scraper sends to a single host unless it is configured otherwise
+RATE_LIMIT = 5.0
+MAX_IN_FLIGHT = 4
+
+# only the anchor tags are needed to find the year and meeting links
+LINK_STRAINER = SoupStrainer("a", href=True)
+
+# pdfs are streamed to disk in chunks of this many bytes
+CHUNK_SIZE = 64 * 1024
+
+# every pdf file starts with these bytes
+PDF_MAGIC = b"%PDF"
+
+# shared session used whenever a function isn't passed one explicitly
+_session = None
+
+
+class RateLimiter:
+    """Creates a scheduler that keeps the scraper polite to each host it
+    requests from. Requests to a host draw from a token bucket that refills at
+    `rate` tokens per second up to `burst` tokens, no more than `max_in_flight`
+    requests to the host are sent at once, and a Retry-After header from the
+    host pauses every request to it until the time it asked for"""
+
+    def __init__(self, rate=RATE_LIMIT, burst=None, max_in_flight=MAX_IN_FLIGHT):
+
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.max_in_flight = max_in_flight
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def _host_state(self, url):
+        """Returns the bucket for the host of a url, creating it if needed"""
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "tokens": self.burst,
+                "updated": time.monotonic(),
+                "in_flight": 0,
+                "paused_until": 0.0,
+            }
+        return self._hosts[host]
+
+    def acquire(self, url):
+        """Blocks until a request to the host of the url is allowed
+
+        Args:
+            url (str): The url about to be requested
+        Returns:
+            N/A: Void function
+        """
+        with self._condition:
+            state = self._host_state(url)
+            while True:
+                now = time.monotonic()
+                elapsed = now - state["updated"]
+                state["tokens"] = min(self.burst, state["tokens"] + elapsed * self.rate)
+                state["updated"] = now
+
+                wait = state["paused_until"] - now
+                if wait <= 0 and state["in_flight"] >= self.max_in_flight:
+                    wait = None  # waits until another request is released
+                elif wait <= 0 and state["tokens"] < 1:
+                    wait = (1 - state["tokens"]) / self.rate
+                elif wait <= 0:
+                    state["tokens"] -= 1
+                    state["in_flight"] += 1
+                    return
+                self._condition.wait(wait)
+
+    def release(self, url):
+        """Marks a request to the host of the url as finished
+
+        Args:
+            url (str): The url that was requested
+        Returns:
+            N/A: Void function
+        """
+        with self._condition:
+            self._host_state(url)["in_flight"] -= 1
+            self._condition.notify_all()
+
+    def pause(self, url, seconds):
+        """Holds back every request to the host of the url for a number of
+        seconds, for example when the host responds with Retry-After
+
+        Args:
+            url (str): A url on the host to pause
+            seconds (float): How long to wait before the next request
+        Returns:
+            N/A: Void function
+        """
+        with self._condition:
+            state = self._host_state(url)
+            until = time.monotonic() + seconds
+            state["paused_until"] = max(state["paused_until"], until)
+            state["tokens"] = 0.0
+            self._condition.notify_all()
+
+
+def parse_retry_after(value):
+    """Converts the value of a Retry-After header into a number of seconds
 
-def get_boe_pdfs(minutes_url, base_url=BASE_URL):
+    Args:
+        value (str): Either a number of seconds or an http date
+    Returns:
+        seconds (float): Seconds to wait, or None if the value can't be parsed
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class StreamedResponse(requests.Response):
+    """Creates a requests.Response that releases its request from the
+    session's RateLimiter when it is closed. The release is a weakref.finalize
+    that doesn't reference the response, so it also runs as soon as an
+    unclosed response is dropped rather than waiting for the cyclic gc"""
+
+    _release = None
+
+    def close(self):
+        """Closes the response and releases its request from the RateLimiter
+
+        Returns:
+            N/A: Void function
+        """
+        try:
+            super().close()
+        finally:
+            if self._release is not None:
+                self._release()
+
+
+class ScraperSession(requests.Session):
+    """Creates a requests.Session that keeps connections to the Comptroller's
+    website alive between requests, retries connection errors and transient
+    server errors with exponential backoff, and applies a default timeout to
+    every request it sends. Every request is scheduled through a RateLimiter
+    so that concurrent downloads stay within a safe rate for each host. The
+    responses in PAUSE_STATUSES are retried by the session rather than the
+    adapter, after pausing every request to the host"""
+
+    def __init__(
+        self,
+        retries=3,
+        backoff_factor=0.5,
+        timeout=TIMEOUT,
+        pool_size=10,
+        limiter=None,
+    ):
+        super().__init__()
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter()
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[s for s in RETRY_STATUSES if s not in PAUSE_STATUSES],
+            respect_retry_after_header=False,  # request() pauses the host instead
+            raise_on_status=False,  # return the last response once retries run out
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """Sends the request through the rate limiter with the session's
+        timeout unless one is given. A response in PAUSE_STATUSES pauses the
+        whole host for its Retry-After, or an exponential backoff, before the
+        request is retried. The request counts against the host's
+        max_in_flight until a streamed response is closed"""
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire(url)
+            try:
+                response = super().request(method, url, **kwargs)
+            except BaseException:
+                self.limiter.release(url)
+                raise
+            if response.status_code not in PAUSE_STATUSES:
+                break
+            self.limiter.pause(url, self.retry_delay(response, attempt))
+            if attempt == self.retries:
+                break
+            response.close()
+            self.limiter.release(url)
+
+        if not kwargs.get("stream"):
+            self.limiter.release(url)
+            return response
+
+        # the body of a streamed response is still being transferred, so the
+        # request is released when the response is closed or garbage collected
+        response.__class__ = StreamedResponse
+        response._release = weakref.finalize(response, self.limiter.release, url)
+        return response
+
+    def retry_delay(self, response, attempt):
+        """Returns how long to pause a host that responded with one of the
+        PAUSE_STATUSES, its Retry-After if it sent one or else the backoff
+
+        Args:
+            response (requests.Response): The response asking to slow down
+            attempt (int): The number of times the request was retried
+        Returns:
+            seconds (float): The seconds to pause the host for
+        """
+        seconds = parse_retry_after(response.headers.get("retry-after", ""))
+        if seconds is None:
+            seconds = self.backoff_factor * 2**attempt
+        return seconds
+
+
+def get_session(session=None):
+    """Returns the session passed in or the shared session used by the
+    scraper, creating the shared session the first time it is needed
+
+    Args:
+        session (requests.Session): Optional session to use instead
+    Returns:
+        session (requests.Session): The session to send requests with
+    """
+    global _session
+    if session is not None:
+        return session
+    if _session is None:
+        _session = ScraperSession()
+    return _session
+
+
+def get_boe_pdfs(
+    minutes_url,
+    base_url=BASE_URL,
+    workers=1,
+    session=None,
+    cache=None,
+    manifest=None,
+    dir=None,
+):
     """Finds .pdf files stored at the given url and stores them within the
     repository for later analysis.
     Args:
         base_url (str): The main url for the Comptroller of Baltimore's webiste
         minutes_url (str): The url where the function can find links to
             pages of pdf files organized by year
+        workers (int): The number of pdfs to download at the same time,
+            defaults to downloading them one at a time
+        session (requests.Session): The session used to send every request,
+            defaults to the scraper's shared ScraperSession
+        cache (PageCache): Cache of the links parsed from the landing page and
+            year pages, so that pages which haven't changed aren't parsed again
+        manifest (CrawlManifest): Record of the meetings already downloaded,
+            used to skip year pages that can no longer change and to find the
+            missing pdfs without checking the pdf directory
+        dir (pathlib.Path): Path to directory that contains the pdf_files,
+            defaults to current working directory
     Returns:
         missing_pdsf: The dictionary of pdfs that were downloaded
     """
 
+    session = get_session(session)
+    base_url = base_url.rstrip("/")
+
     # get the links to each year of BOE meetings
-    passed, error, boe_page = check_and_parse_page(minutes_url)
+    passed, error, year_links = get_page_links(
+        minutes_url, lambda page: get_year_links(page, base_url), session, cache
+    )
     if not passed:
         print(error)
         return
-    year_links = get_year_links(boe_page)
     if not year_links:
         print(f"No year links found at {minutes_url}")
 
     # get the links to the minutes for each meeting
     meeting_links = {}
     for year, link in year_links.items():
-        passed, error, page = check_and_parse_page(link)
+        if manifest and manifest.is_settled(year):
+            meeting_links[year] = manifest.years[year]["links"]
+            continue
+        passed, error, meetings = get_page_links(
+            link, lambda page: get_meeting_links(page, link, base_url), session, cache
+        )
         if not passed:
             print(error)
             continue
-        meetings = get_meeting_links(page, link)
         meeting_links[year] = meetings
+        if manifest:
+            manifest.record_year(year, meetings)
 
     # check which meetings still need to be downloaded
-    missing_pdfs, extra_pdfs = check_missing_pdfs(meeting_links)
+    if manifest and not manifest.meetings:
+        manifest.sync(meeting_links, dir=dir)
+    missing_pdfs, extra_pdfs = check_missing_pdfs(meeting_links, dir, manifest)
     if extra_pdfs:
         print(f"These extra pdfs were found in the directory {extra_pdfs}")
     if not missing_pdfs:
@@ -65,50 +358,251 @@ def get_boe_pdfs(minutes_url, base_url=BASE_URL):
         return None
 
     # download missing pdfs
+    downloaded_pdfs = download_pdfs(
+        missing_pdfs, dir=dir, workers=workers, session=session, manifest=manifest
+    )
+    return downloaded_pdfs
+
+
+def download_pdfs(missing_pdfs, dir=None, workers=1, session=None, manifest=None):
+    """Downloads each of the missing pdfs, using a pool of threads to run
+    several downloads at once when more than one worker is requested
+
+    Args:
+        missing_pdfs: Nested dict of year and the links to pdfs of the BOE
+        meetings in that year, as returned by check_missing_pdfs()
+        dir: Path to directory that contains the pdf_files, defaults to current
+        working directory
+        workers: The maximum number of downloads to run at the same time
+        session: The session used to request the pdfs, defaults to the
+        scraper's shared ScraperSession
+        manifest: CrawlManifest in which to record each downloaded pdf
+
+    Returns:
+        downloaded_pdfs: Dict of year and the names of the pdfs downloaded
+        for that year, in the same order as missing_pdfs
+    """
+    session = get_session(session)
+    downloads = [
+        (year, date, link)
+        for year, meetings in missing_pdfs.items()
+        for date, link in meetings.items()
+    ]
+
+    def download(args):
+        year, date, link = args
+        return download_pdf(
+            year, date, link, dir=dir, session=session, manifest=manifest
+        )
+
+    # executor.map() returns results in the order of the downloads list
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(download, downloads))
+    else:
+        results = map(download, downloads)
+
     counter = 0
     downloaded_pdfs = defaultdict(list)
-    for year, meetings in missing_pdfs.items():
-        for date, link in meetings.items():
-            passed, error, file = download_pdf(year, date, link)
-            if not passed:
-                print(error)
-                continue
-            else:
-                downloaded_pdfs[year].append(file.name)
-                counter += 1
+    for (year, date, link), (passed, error, file) in zip(downloads, results):
+        if not passed:
+            print(error)
+            continue
+        downloaded_pdfs[year].append(file.name)
+        counter += 1
     print(f"Wrote {counter} pdf files to local repo.")
     return downloaded_pdfs
 
 
-def check_and_parse_page(url):
+def revalidate_pdfs(manifest, dir=None, workers=1, session=None):
+    """Checks every pdf recorded in the manifest against the Comptroller's
+    website with a HEAD request and downloads again only the pdfs whose
+    ETag, Last-Modified or Content-Length has changed. Meetings whose new
+    pdf has different contents are flagged as revisions in the manifest
+
+    Args:
+        manifest: CrawlManifest of the downloaded pdfs
+        dir: Path to directory that contains the pdf_files, defaults to current
+        working directory
+        workers: The maximum number of pdfs to check at the same time
+        session: The session used to send the requests, defaults to the
+        scraper's shared ScraperSession
+
+    Returns:
+        revised_pdfs: Dict of year and the dates of the meetings whose pdf
+        was revised
+    """
+    session = get_session(session)
+    records = list(manifest.meetings.values())
+
+    def revalidate(record):
+        passed, error, changed = check_pdf_changed(record, session=session)
+        if not passed or not changed:
+            return passed, error, False
+        year, date, url = record["year"], record["date"], record["url"]
+        passed, error, file = download_pdf(
+            year, date, url, dir=dir, session=session, manifest=manifest
+        )
+        if not passed:
+            return False, error, False
+        revised = manifest.meetings[date]["sha256"] != record["sha256"]
+        if revised:
+            manifest.flag_revision(date, record)
+        return True, None, revised
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(revalidate, records))
+    else:
+        results = map(revalidate, records)
+
+    revised_pdfs = defaultdict(list)
+    for record, (passed, error, revised) in zip(records, results):
+        if not passed:
+            print(error)
+        elif revised:
+            revised_pdfs[record["year"]].append(record["date"])
+    print(f"Found {sum(map(len, revised_pdfs.values()))} revised pdf files.")
+    return revised_pdfs
+
+
+def check_pdf_changed(record, session=None):
+    """Sends a HEAD request for a downloaded pdf and compares the validators
+    in the response to the ones stored when it was downloaded
+
+    Args:
+        record: The manifest record of the downloaded pdf
+        session: The session used to send the request, defaults to the
+        scraper's shared ScraperSession
+
+    Returns:
+        passed: Boolean indicating whether the pdf could be checked
+        message: Message describing the error, otherwise None
+        changed: Boolean indicating whether the pdf appears to have changed
+    """
+    url = record["url"]
+    try:
+        response = get_session(session).head(url, allow_redirects=True)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        error = f"An error occurred requesting {url}: {e}"
+        return False, error, False
+
+    # an etag identifies the exact contents, so it settles the question alone
+    etag = response.headers.get("etag")
+    if etag and record.get("etag"):
+        return True, None, etag != record["etag"]
+
+    last_modified = response.headers.get("last-modified")
+    if last_modified and record.get("last_modified"):
+        if last_modified != record["last_modified"]:
+            return True, None, True
+
+    size = response.headers.get("content-length")
+    if size and not response.headers.get("content-encoding"):
+        if int(size) != record["size"]:
+            return True, None, True
+    return True, None, False
+
+
+def check_and_parse_page(url, session=None):
     """Tries to requests and parses a url into a BeautifulSoup object
 
     Args:
         url: Link to the page to request and parse
+        session: The session used to request the page, defaults to the
+        scraper's shared ScraperSession
     Returns:
         passed: Boolean indicating whether or not the checks passed
         message: Message indicating either the success or error
         soup: BeautifulSoup object of the parsed page
     """
     # checks if request went through successfully
-    response = requests.get(url)
+    try:
+        response = get_session(session).get(url)
+    except requests.exceptions.RequestException as e:
+        error = f"Encountered an issue accessing '{url}': {e}"
+        return False, error, None
+    return parse_response(url, response)
+
+
+def parse_response(url, response, parse_only=None):
+    """Checks that a page was requested successfully and parses its html into
+    a BeautifulSoup object
+
+    Args:
+        url: Link to the page that was requested
+        response: The response returned for the url
+        parse_only: SoupStrainer restricting which tags are parsed, defaults
+        to parsing the whole page
+    Returns:
+        passed: Boolean indicating whether or not the checks passed
+        message: Message indicating either the success or error
+        soup: BeautifulSoup object of the parsed page
+    """
     if not response.status_code == 200:
         error = f"Encountered an issue accessing '{url}': {response.reason}"
         return False, error, None
 
     # parses HTML from response text
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = BeautifulSoup(response.text, "html.parser", parse_only=parse_only)
 
     message = f"'{url}' was successfully requested and parsed"
     return True, message, soup
 
 
-def get_year_links(start_soup):
+def get_page_links(url, get_links, session=None, cache=None):
+    """Requests a page and parses its links with get_links. When a cache is
+    given the page is requested conditionally, and if the server responds
+    that the page hasn't changed the cached links are returned without
+    downloading or parsing the page again
+
+    Args:
+        url: Link to the page to request and parse
+        get_links: Function that takes the BeautifulSoup object of the page,
+        which only contains its anchor tags, and returns a dict of the links
+        found on it
+        session: The session used to request the page, defaults to the
+        scraper's shared ScraperSession
+        cache (PageCache): Cache of the links parsed from previous requests
+
+    Returns:
+        passed: Boolean indicating whether or not the checks passed
+        message: Message indicating either the success or error
+        links: Dict of links returned by get_links
+    """
+    # keeps the entry the validators came from, which may expire or be
+    # evicted before the response arrives
+    entry = cache.get(url) if cache else None
+    headers = validator_headers(entry)
+    try:
+        response = get_session(session).get(url, headers=headers)
+    except requests.exceptions.RequestException as e:
+        error = f"Encountered an issue accessing '{url}': {e}"
+        return False, error, None
+
+    # reuses the cached links if the page hasn't changed
+    if response.status_code == 304 and headers:
+        message = f"'{url}' has not changed since it was cached"
+        return True, message, cache.touch(url, entry)
+
+    passed, message, soup = parse_response(url, response, LINK_STRAINER)
+    if not passed:
+        return False, message, None
+    links = get_links(soup)
+    if cache:
+        cache.put(url, response.headers, links)
+    return True, message, links
+
+
+def get_year_links(start_soup, base_url=BASE_URL):
     """Grabs the link to each page of BOE meetings
 
     Args:
         start_soup (BeautifulSoup object): the beautifulsoup object that
         parses the "landing page" for the minutes links
+        base_url (str): The main url of the website, used to convert
+        relative links to absolute links
 
     Returns:
         year_links (dict): dictionary with the years (2009, 2010, ...,
@@ -123,8 +617,8 @@ def get_year_links(start_soup):
     for tag in year_tags:
         year = tag.string
         link = tag.get("href")
-        if not link.startswith(BASE_URL):
-            link = BASE_URL + link  # converts relative links to absolute
+        if not link.startswith(base_url):
+            link = base_url + link  # converts relative links to absolute
         year_links[year] = link
     return year_links
 
@@ -154,7 +648,8 @@ def parse_meeting_date(date_string):
 
     # grabs the month.lower() from the regex match of the date_string
     month_str = date_re.group(1).lower()
-    month_str, score = levenshtein_match(month_str, MONTHS)
+    if month_str not in MONTHS:  # only spell check months that are misspelled
+        month_str, score = levenshtein_match(month_str, MONTHS)
     month = str(MONTHS.index(month_str) + 1).zfill(2)
 
     # grabs year and day from the regex
@@ -172,7 +667,7 @@ def parse_meeting_date(date_string):
     return True, date, message
 
 
-def check_missing_pdfs(meeting_links, dir=None):
+def check_missing_pdfs(meeting_links, dir=None, manifest=None):
     """Checks the downloaded pdfs against a list of parsed meeting links and
     returns any pdfs which are missing
 
@@ -181,11 +676,16 @@ def check_missing_pdfs(meeting_links, dir=None):
         meetings in that year
         dir: Path to directory that contains the pdf_files, defaults to current
         working directory
+        manifest: CrawlManifest of the downloaded pdfs, which is diffed in
+        memory instead of checking the directory
 
     Returns:
         missing_links: Nested dict of pdfs that still need to be downloaded
         extra_pdfs: List of downloaded pdfs not listed in the meeting links
     """
+    if manifest:
+        return manifest.missing(meeting_links)
+
     missing_links = defaultdict(dict)
     expected_pdfs = set()
     downloaded_pdfs = set()
@@ -209,67 +709,250 @@ def check_missing_pdfs(meeting_links, dir=None):
     # checks for any extra pdfs
     for sub in dir.iterdir():
         if sub.is_dir():
-            for pdf in sub.iterdir():
+            for pdf in sub.glob("*.pdf"):
                 downloaded_pdfs.add(pdf.name)
     extra_pdfs = downloaded_pdfs - expected_pdfs
 
     return missing_links, extra_pdfs
 
 
-def download_pdf(year, date, url, dir=None):
+def download_pdf(year, date, url, dir=None, session=None, manifest=None):
     """Downloads a pdf from the given url and stores it in the sub-directory
-    for the year in which the meeting occurred
+    for the year in which the meeting occurred. If an earlier download of the
+    pdf was interrupted, the download resumes from the end of the partial file
+    when the server supports range requests
 
     Args:
         year: Year in which the BOE meeting occurred
         date: Date on which BOE meeting occurred, with format YYYY-MM-DD
         url: Link to download the pdf of the minutes
+        dir: Path to directory that contains the pdf_files, defaults to current
+        working directory
+        session: The session used to request the pdf, defaults to the
+        scraper's shared ScraperSession
+        manifest: CrawlManifest in which to record the downloaded pdf
 
     Returns:
         passed: Boolean value indicating if the download was successful
         message: Message describing the error or success of the download
         pdf_file: Path to downloaded file
     """
+    # creates path to file
+    if not dir:
+        dir = Path.cwd() / "pdf_files"
+    year_dir = dir / year
+    pdf_name = date + ".pdf"
+    pdf_file = year_dir / pdf_name
+
     # checks that url is valid
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = request_pdf(url, pdf_file, session=session)
     except requests.exceptions.RequestException as e:
         error = f"An error occurred requesting {url}: {e}"
         return False, error, None
 
     # checks that the response is a pdf
-    content_type = response.headers["content-type"]
+    content_type = response.headers.get("content-type", "")
     if "pdf" not in content_type:
+        response.close()
         error = f"The content stored at {url} is not a pdf"
         return False, error, None
 
-    # creates path to file
-    if not dir:
-        dir = Path.cwd() / "pdf_files"
-    year_dir = dir / year
-    pdf_name = date + ".pdf"
-    pdf_file = year_dir / pdf_name
-
     # creates the year directory and writes the file to it
     try:
         year_dir.mkdir(parents=True, exist_ok=True)
-        with open(pdf_file, "wb") as f:
-            f.write(response.content)
-    except TypeError as e:
+        passed, error = save_pdf_response(response, pdf_file, url=url)
+    except (TypeError, OSError) as e:
         error = f"An error occurred with url {url}: {e}"
         return False, error, None
+    finally:
+        response.close()
+    if not passed:
+        return False, f"An error occurred with url {url}: {error}", None
+    if manifest:
+        manifest.record_download(year, date, url, pdf_file, response.headers)
 
     message = f"Successfully saved pdf from {url}"
     return True, message, pdf_file
 
 
-def get_meeting_links(soup, url):
+def request_pdf(url, pdf_file, session=None):
+    """Requests a pdf as a stream, resuming a partial download of it when one
+    exists. A response with an error status is closed before its HTTPError is
+    raised so that its connection goes back to the pool
+
+    Args:
+        url: Link to download the pdf of the minutes
+        pdf_file (pathlib.Path): Final path of the downloaded pdf
+        session: The session used to request the pdf, defaults to the
+        scraper's shared ScraperSession
+    Returns:
+        response (requests.Response): Streamed response with the pdf content
+    """
+    headers = resume_headers(pdf_file, url)
+    response = get_session(session).get(url, headers=headers, stream=True)
+    if response.status_code == 416:  # the partial file can't be resumed
+        response.close()
+        discard_part(pdf_file)
+        response = get_session(session).get(url, stream=True)
+    try:
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        response.close()
+        raise
+    return response
+
+
+def part_paths(pdf_file):
+    """Returns the paths used while a pdf is downloading: the partial file
+    itself and a json file with the validators needed to resume it
+
+    Args:
+        pdf_file (pathlib.Path): Final path of the downloaded pdf
+    Returns:
+        part_file (pathlib.Path): Path of the partially downloaded pdf
+        meta_file (pathlib.Path): Path of the validators for the partial pdf
+    """
+    part_file = pdf_file.with_name(pdf_file.name + ".part")
+    meta_file = pdf_file.with_name(pdf_file.name + ".part.json")
+    return part_file, meta_file
+
+
+def discard_part(pdf_file):
+    """Deletes a partial download of a pdf so that it is downloaded again
+    from the start
+
+    Args:
+        pdf_file (pathlib.Path): Final path of the downloaded pdf
+    Returns:
+        N/A: Void function
+    """
+    for path in part_paths(pdf_file):
+        if path.exists():
+            path.unlink()
+
+
+def resume_headers(pdf_file, url):
+    """Builds the headers to resume a partial download of a pdf. A download
+    is only resumed if the partial file came from the same url and the
+    server gave a strong ETag or Last-Modified date to send with If-Range,
+    so the server sends the whole pdf again if it has changed since
+
+    Args:
+        pdf_file (pathlib.Path): Final path of the downloaded pdf
+        url (str): Link to download the pdf of the minutes
+    Returns:
+        headers (dict): Range and If-Range headers, or an empty dict if the
+        download should start from the beginning
+    """
+    part_file, meta_file = part_paths(pdf_file)
+    if not part_file.exists():
+        return {}
+    try:
+        with open(meta_file, "r") as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        meta = {}
+
+    etag = meta.get("etag")
+    if etag and etag.startswith("W/"):
+        etag = None  # weak etags can't be used with If-Range
+    validator = etag or meta.get("last_modified")
+    size = part_file.stat().st_size
+    if meta.get("url") != url or not validator or not size:
+        discard_part(pdf_file)
+        return {}
+    return {"Range": f"bytes={size}-", "If-Range": validator}
+
+
+def parse_content_range(value):
+    """Parses the start and total length from a Content-Range header like
+    'bytes 1000-1999/2000'
+
+    Args:
+        value (str): The value of the Content-Range header
+    Returns:
+        start (int): The offset of the first byte in the response
+        total (int): The length of the whole file, or None if it is unknown
+    """
+    match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", value or "")
+    if not match:
+        return None, None
+    total = match.group(2)
+    return int(match.group(1)), None if total == "*" else int(total)
+
+
+def save_pdf_response(response, pdf_file, url=None, chunk_size=CHUNK_SIZE):
+    """Streams the body of a pdf response to a .part file in the same
+    directory as pdf_file, appending to it if the response resumes an earlier
+    download. Once the download is complete and has been checked to be a pdf
+    it is renamed to pdf_file, so an interrupted download never leaves a
+    truncated pdf behind, only a .part file that the next download resumes
+
+    Args:
+        response (requests.Response): Response requested with stream=True
+        pdf_file (pathlib.Path): Final path of the downloaded pdf
+        url (str): Link the pdf is downloaded from, stored so that a partial
+        download is only resumed from the same url
+        chunk_size (int): Number of bytes written to disk at a time
+    Returns:
+        passed: Boolean indicating whether the pdf was saved
+        error: Message describing why the pdf wasn't saved, otherwise None
+    """
+    part_file, meta_file = part_paths(pdf_file)
+    headers = response.headers
+
+    # a 206 continues the partial file, anything else replaces it
+    if response.status_code == 206:
+        start, total = parse_content_range(headers.get("content-range"))
+        if not part_file.exists() or start != part_file.stat().st_size:
+            discard_part(pdf_file)
+            return False, "The server resumed the download from the wrong offset"
+        mode = "ab"
+    else:
+        # content-length counts the encoded bytes, so it is only the length
+        # of the pdf when the body wasn't compressed in transit
+        total = headers.get("content-length")
+        total = int(total) if total and not headers.get("content-encoding") else None
+        mode = "wb"
+        with open(meta_file, "w") as f:
+            meta = {"etag": headers.get("etag"), "url": url}
+            meta["last_modified"] = headers.get("last-modified")
+            json.dump(meta, f)
+
+    try:
+        with open(part_file, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+    except (requests.exceptions.RequestException, OSError) as e:
+        return False, f"The download was interrupted: {e}"
+
+    # checks the completed file before it replaces the pdf
+    size = part_file.stat().st_size
+    if total is not None and size != total:
+        if size > total:
+            discard_part(pdf_file)
+        return False, f"Expected {total} bytes but received {size}"
+    with open(part_file, "rb") as f:
+        head = f.read(len(PDF_MAGIC))
+    if head != PDF_MAGIC:
+        discard_part(pdf_file)
+        return False, "The downloaded file is not a pdf"
+
+    os.replace(part_file, pdf_file)
+    discard_part(pdf_file)
+    return True, None
+
+
+def get_meeting_links(soup, url, base_url=BASE_URL):
     """Grabs the links to the minutes for each BOE meeting on a given page
 
     Args:
         soup (BeautifulSoup object): the beautifulsoup object that
         parses the "landing page" for each year of BOE meetings
+        url (str): The url of the page, used in error messages
+        base_url (str): The main url of the website, used to convert
+        relative links to absolute links
 
     Returns:
         meeting_links (dict): dictionary with the dates of each BOE meeting
@@ -277,6 +960,7 @@ def get_meeting_links(soup, url):
     """
 
     meeting_links = {}
+    date_counts = defaultdict(int)
     meeting_tags = soup.find_all(name="a", href=re.compile("files"))
 
     for tag in meeting_tags:
@@ -290,14 +974,14 @@ def get_meeting_links(soup, url):
 
         # extract link
         link = tag.get("href")
-        if not link.startswith(BASE_URL):
-            link = BASE_URL + link  # converts relative links to absolute
+        if not link.startswith(base_url):
+            link = base_url + link  # converts relative links to absolute
 
         # checks for duplicate dates
         # if they exist appends "meeting2" etc to date
-        duplicates = [d for d in meeting_links.keys() if d.startswith(date)]
-        if duplicates:
-            date = date + f"_meeting{len(duplicates)+1}"
+        date_counts[date] += 1
+        if date_counts[date] > 1:
+            date = date + f"_meeting{date_counts[date]}"
         meeting_links[date] = link
 
     return meeting_links
@@ -0,0 +1,288 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+
+from common.utils import hash_file
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# the longest a single pdf may take to parse before its worker is killed
+PARSE_TIMEOUT = 5 * 60
+
+# the most memory a worker may allocate on top of what it starts with
+MAX_PARSE_MEMORY = 2 * 1024**3
+
+
+class Quarantine:
+    """Creates a record of the pdfs that couldn't be parsed and why, stored
+    as a JSON lines file next to the pdfs so that later runs skip them. Each
+    record keeps the sha256 of the pdf, so a pdf that is downloaded again
+    with different contents is parsed again"""
+
+    def __init__(self, path=None):
+
+        if not path:
+            path = Path.cwd() / "pdf_files" / "quarantine.jsonl"
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """Reads the records stored in the quarantine file, if it exists
+
+        Returns:
+            N/A: Void function
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["type"] == "quarantined":
+                    self.records[record["pdf"]] = record
+                elif record["type"] == "released":
+                    self.records.pop(record["pdf"], None)
+
+    def append(self, record):
+        """Appends a record to the quarantine file
+
+        Args:
+            record (dict): The record to store, with a "type" of "quarantined"
+            or "released"
+        Returns:
+            N/A: Void function
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def add(self, pdf_path, reason):
+        """Quarantines a pdf that couldn't be parsed
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+            reason (str): Why the pdf couldn't be parsed
+        Returns:
+            record (dict): The record stored for the pdf
+        """
+        try:
+            sha256 = hash_file(pdf_path)
+        except FileNotFoundError:
+            sha256 = None
+        record = {
+            "type": "quarantined",
+            "pdf": str(pdf_path),
+            "sha256": sha256,
+            "reason": reason,
+            "quarantined_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self.records[record["pdf"]] = record
+            self.append(record)
+        return record
+
+    def release(self, pdf_path):
+        """Removes a pdf from the quarantine so that it is parsed again
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+        Returns:
+            N/A: Void function
+        """
+        with self._lock:
+            if self.records.pop(str(pdf_path), None):
+                self.append({"type": "released", "pdf": str(pdf_path)})
+
+    def is_quarantined(self, pdf_path):
+        """Checks whether a pdf is quarantined with its current contents
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+        Returns:
+            quarantined (bool): True if the pdf should be skipped
+        """
+        record = self.records.get(str(pdf_path))
+        if record is None:
+            return False
+        try:
+            return record["sha256"] == hash_file(pdf_path)
+        except FileNotFoundError:
+            return False
+
+
+def address_space():
+    """Returns the size of this process's address space in bytes, or None if
+    it can't be read on this platform"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[0])
+    except (OSError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_worker(conn, func, pdf_path, max_memory):
+    """Runs func(pdf_path) in a worker process and sends back the result
+
+    Args:
+        conn (multiprocessing.connection.Connection): The pipe to the parent
+        func (callable): The function that parses a pdf
+        pdf_path (pathlib.Path): The path to the pdf
+        max_memory (int): The most bytes the worker may allocate
+    Returns:
+        N/A: Void function
+    """
+    size = address_space()
+    if max_memory and resource and size is not None:
+        limit = size + max_memory
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    try:
+        message = (True, func(pdf_path))
+    except MemoryError:
+        message = (False, f"ran out of memory, limit {max_memory} bytes")
+    except Exception as e:
+        message = (False, f"{type(e).__name__}: {e}")
+    conn.send(message)
+    conn.close()
+
+
+class ParseSupervisor:
+    """Creates a supervisor that parses each pdf in its own worker process,
+    with a limit on the time and memory it may use. A pdf whose worker times
+    out, runs out of memory, raises an error or crashes is added to the
+    quarantine with the reason, and the rest of the pdfs carry on, so a
+    single bad pdf can't stall or take down a run over the whole archive
+
+    Usage:
+        supervisor = ParseSupervisor(timeout=60, quarantine=Quarantine())
+        text_df = store_pdf_text_to_df(pdf_dir, workers=4, supervisor=supervisor)
+    """
+
+    def __init__(
+        self, timeout=PARSE_TIMEOUT, max_memory=MAX_PARSE_MEMORY, quarantine=None
+    ):
+
+        self.timeout = timeout
+        self.max_memory = max_memory
+        self.quarantine = quarantine
+        self.failures = {}
+        self.context = multiprocessing.get_context()
+
+    def fail(self, pdf_path, reason):
+        """Records a pdf that couldn't be parsed
+
+        Args:
+            pdf_path (pathlib.Path): The path to the pdf
+            reason (str): Why the pdf couldn't be parsed
+        Returns:
+            N/A: Void function
+        """
+        print(f"Quarantined file {pdf_path}: {reason}")
+        self.failures[pdf_path] = reason
+        if self.quarantine is not None:
+            self.quarantine.add(pdf_path, reason)
+
+    def start(self, func, pdf_path):
+        """Starts a worker process that parses a single pdf
+
+        Returns:
+            conn (multiprocessing.connection.Connection): The pipe to read the
+            result from
+            process (multiprocessing.Process): The worker process
+        """
+        conn, child_conn = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=run_worker,
+            args=(child_conn, func, pdf_path, self.max_memory),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()  # the pipe reads as closed if the worker dies
+        return conn, process
+
+    def map(self, func, pdf_paths, workers=1):
+        """Parses each pdf with func in a supervised worker process
+
+        Args:
+            func (callable): A module level function that parses a pdf, such
+            as parse_pdf_row
+            pdf_paths (list): The paths to the pdfs to parse
+            workers (int): The number of pdfs parsed at the same time
+        Returns:
+            results (list): What func returned for each pdf, in the same
+            order as pdf_paths, with None for the pdfs that failed or are
+            quarantined
+        """
+        results = [None] * len(pdf_paths)
+        pending = deque()
+        for index, pdf_path in enumerate(pdf_paths):
+            if self.quarantine and self.quarantine.is_quarantined(pdf_path):
+                print(f"Skipping quarantined file {pdf_path}")
+            else:
+                pending.append((index, pdf_path))
+
+        running = {}
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                index, pdf_path = pending.popleft()
+                conn, process = self.start(func, pdf_path)
+                deadline = time.monotonic() + self.timeout
+                running[conn] = (index, pdf_path, process, deadline)
+
+            next_deadline = min(job[3] for job in running.values())
+            for conn in wait(list(running), max(0, next_deadline - time.monotonic())):
+                index, pdf_path, process, _ = running.pop(conn)
+                passed, value = self.collect(conn, process)
+                if passed:
+                    results[index] = value
+                else:
+                    self.fail(pdf_path, value)
+            self.kill_expired(running)
+        return results
+
+    def collect(self, conn, process):
+        """Reads the result of a worker that has finished or died
+
+        Returns:
+            passed (bool): True if the worker returned a result
+            value: The result, or the reason the worker failed
+        """
+        try:
+            passed, value = conn.recv()
+        except EOFError:
+            process.join()
+            passed, value = False, f"worker exited with code {process.exitcode}"
+        conn.close()
+        process.join()
+        return passed, value
+
+    def kill_expired(self, running):
+        """Kills the workers that have run past the timeout
+
+        Args:
+            running (dict): The pipe of each running worker mapped to its
+            index, pdf_path, process and deadline, the killed workers are
+            removed from it
+        Returns:
+            N/A: Void function
+        """
+        now = time.monotonic()
+        for conn, (_, pdf_path, process, deadline) in list(running.items()):
+            if now >= deadline:
+                process.kill()
+                process.join()
+                conn.close()
+                del running[conn]
+                self.fail(pdf_path, f"timed out after {self.timeout} seconds")
@@ -1,6 +1,12 @@
 from pathlib import Path
+from functools import lru_cache
+import hashlib
+import re
 import numpy as np
 
+# files are hashed in chunks of this many bytes
+HASH_CHUNK_SIZE = 1024 * 1024
+
 REPLACEMENTS = [
     ("Œ", "-"),
     ("ﬁ", '"'),
@@ -28,6 +34,33 @@ REPLACEMENTS = [
     ("Õ", "'"),
 ]
 
+# the entries of REPLACEMENTS grouped by the way the pdf library misreads a
+# document, so that only the groups a document needs are applied to it. A
+# group is used when the document contains one of its signature characters,
+# which are almost never found in the minutes on their own, or when its
+# producer matches, and characters such as ™ and – are only replaced in
+# the documents where they are known to be misread
+REPLACEMENT_PROFILES = {
+    # WinAnsi characters read as PDFDocEncoding, e.g. 0x92 ’ read as ™
+    "pdfdoc": {
+        "sources": "Œﬁﬂ™ŁŠ€¬–‚Žš",
+        "signature": "ŒﬁﬂŁŠŽ",
+        "producers": r"Acrobat Distiller|PDFMaker",
+    },
+    # ligatures and other glyphs of embedded fonts read as the wrong character
+    "ligatures": {
+        "sources": "˚˜˛˝üîèë",
+        "signature": "˚˜˛˝",
+        "producers": None,
+    },
+    # MacRoman characters read as Latin-1, e.g. 0xD5 ’ read as Õ
+    "macroman": {
+        "sources": "ÐÒÓÕ",
+        "signature": "ÐÒÓÕ",
+        "producers": r"Mac OS X|Quartz",
+    },
+}
+
 
 def del_dir_contents(root):
     """Convenience function so we don't have to empy out pdf_dir by hand
@@ -50,6 +83,21 @@ def is_empty(_dir: Path) -> bool:
     return not bool([_ for _ in _dir.iterdir()])
 
 
+def hash_file(path):
+    """Computes the sha256 hash of a file without reading it into memory
+
+    Args:
+        path (pathlib.Path): Path to the file to hash
+    Returns:
+        digest (str): The hex digest of the file's contents
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
 def levenshtein(token1, token2):
     distances = np.zeros((len(token1) + 1, len(token2) + 1))
 
@@ -115,6 +163,152 @@ def replace_chars(text, replacement_list=REPLACEMENTS):
     Returns:
         text (str): The text with the characters replaced
     """
-    for current, new in replacement_list:
-        text = text.replace(current, new)
-    return text
+    if replacement_list is REPLACEMENTS:
+        return NORMALIZER.replace(text)
+    return TextNormalizer(replacement_list).replace(text)
+
+
+class TextNormalizer:
+    """Creates a compiled version of a list of replacements that gives the
+    same result as applying each replacement to the text in order. Entries
+    whose replacement is replaced again by a later entry are composed so that
+    each character is replaced once, straight to its final text, and the text
+    is only copied for the characters it actually contains"""
+
+    def __init__(self, replacement_list=REPLACEMENTS):
+
+        self.replacement_list = list(replacement_list)
+        self.steps = self.compile(self.replacement_list)
+
+    @staticmethod
+    def compose(replacement_list):
+        """Maps each character to the text it ends up as after every
+        replacement in the list has been applied in order
+
+        Args:
+            replacement_list (list): List of (character, replacement) tuples
+        Returns:
+            final_text (dict): Map of each character to its final replacement
+        """
+
+        def final(char, start):
+            # applies the first matching replacement after position start,
+            # then the rest of the list to each character it produced
+            for i in range(start, len(replacement_list)):
+                old, new = replacement_list[i]
+                if old == char:
+                    return "".join(final(c, i + 1) for c in new)
+            return char
+
+        final_text = {}
+        for old, _ in replacement_list:
+            final_text.setdefault(old, final(old, 0))
+        return final_text
+
+    @classmethod
+    def compile(cls, replacement_list):
+        """Orders the composed replacements so that a character is replaced
+        before any replacement that produces it, which keeps the characters
+        produced by a replacement from being replaced a second time
+
+        Args:
+            replacement_list (list): List of (character, replacement) tuples
+        Returns:
+            steps (list): The (character, replacement) tuples to apply in
+            order, or the original list if it can't be composed
+        """
+        if any(len(old) != 1 for old, _ in replacement_list):
+            return replacement_list  # longer sources can overlap each other
+        final_text = cls.compose(replacement_list)
+        final_text = {old: new for old, new in final_text.items() if old != new}
+
+        steps = []
+        placed = set()
+        visiting = set()
+
+        def place(char):
+            if char in placed:
+                return True
+            if char in visiting:
+                return False  # two replacements produce each other's source
+            visiting.add(char)
+            for produced in set(final_text[char]) & final_text.keys() - {char}:
+                if not place(produced):
+                    return False
+            visiting.discard(char)
+            placed.add(char)
+            steps.append((char, final_text[char]))
+            return True
+
+        for char in final_text:
+            if not place(char):
+                return replacement_list
+        return steps
+
+    def replace(self, text):
+        """Applies the replacements to a text
+
+        Args:
+            text (str): The raw text whose characters will be replaced
+        Returns:
+            text (str): The text with the characters replaced
+        """
+        for current, new in self.steps:
+            if current in text:  # much faster than replace() when absent
+                text = text.replace(current, new)
+        return text
+
+    def normalize(self, text):
+        """Collapses the whitespace in a text then applies the replacements.
+        The whitespace is collapsed first because some replacements produce
+        spaces that the cleaned text has always kept
+
+        Args:
+            text (str): The text extracted from a pdf
+        Returns:
+            text (str): The cleaned text
+        """
+        return self.replace(" ".join(text.split()))
+
+
+def detect_profiles(text, producer=None):
+    """Picks the groups of REPLACEMENT_PROFILES that apply to a document from
+    a count of their signature characters in its text and from the name of
+    the software that produced the pdf
+
+    Args:
+        text (str): The text extracted from the pdf
+        producer (str): The /Producer entry of the pdf's metadata, if any
+    Returns:
+        profiles (tuple): The names of the profiles to apply, in the order of
+        REPLACEMENT_PROFILES
+    """
+    profiles = []
+    for name, profile in REPLACEMENT_PROFILES.items():
+        signature_count = sum(map(text.count, profile["signature"]))
+        by_producer = bool(
+            producer
+            and profile["producers"]
+            and re.search(profile["producers"], producer)
+        )
+        if by_producer or signature_count:
+            profiles.append(name)
+    return tuple(profiles)
+
+
+@lru_cache(maxsize=None)
+def get_normalizer(profiles):
+    """Compiles the entries of REPLACEMENTS that belong to a set of profiles,
+    keeping their original order
+
+    Args:
+        profiles (tuple): Names of profiles in REPLACEMENT_PROFILES
+    Returns:
+        normalizer (TextNormalizer): The compiled replacements
+    """
+    sources = "".join(REPLACEMENT_PROFILES[name]["sources"] for name in profiles)
+    return TextNormalizer([entry for entry in REPLACEMENTS if entry[0] in sources])
+
+
+# the compiled version of every entry in REPLACEMENTS
+NORMALIZER = TextNormalizer(REPLACEMENTS)
@@ -2,6 +2,8 @@ import pytest
 import os
 from pathlib import Path
 
+from tests.scrape.mock_site import MockComptrollerSite
+
 collect_ignore = ["scrape/test_get_boe_pdfs.py"]
 
 
@@ -13,3 +15,11 @@ def pdf_dir(tmp_path_factory):
     dir = tmp_path_factory.mktemp("pdf_files", numbered=False)
     print(dir)
     return dir
+
+
+@pytest.fixture
+def mock_site():
+    """Serves a small local copy of the Comptroller's website, see
+    tests/scrape/mock_site.py"""
+    with MockComptrollerSite(years=range(2018, 2021), pdf_size=4096) as site:
+        yield site
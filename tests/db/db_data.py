@@ -0,0 +1,31 @@
+import hashlib
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def fake_minutes(pdf_name, pages, meeting_date=None, clean_text=None, sha256=None):
+    """Creates a stand-in for a parsed Minutes object, with the attributes
+    that the loaders in common/db_utils.py and common/parquet_utils.py read
+
+    Args:
+        pdf_name (str): The name of the pdf, e.g. 2010_03_17.pdf
+        pages (list): The raw text of each page
+        meeting_date (str): The meeting date, defaults to the date in pdf_name
+        clean_text (str): The cleaned text, defaults to the pages joined
+        sha256 (str): The hash of the pdf, defaults to the hash of the pages
+    Returns:
+        minutes (types.SimpleNamespace): The stand-in for the minutes
+    """
+    pdf_path = Path(pdf_name)
+    if clean_text is None:
+        clean_text = "".join(pages)
+    if sha256 is None:
+        sha256 = hashlib.sha256("\f".join(pages).encode("utf-8")).hexdigest()
+    return SimpleNamespace(
+        pdf_path=pdf_path,
+        meeting_date=meeting_date or pdf_path.name[:10].replace("_", "-"),
+        clean_text=clean_text,
+        pages=pages,
+        profiles=(),
+        sha256=sha256,
+    )
@@ -0,0 +1,157 @@
+import sqlite3
+
+from common.compress_utils import CODECS, TextCodec
+from common.db_utils import (
+    compress_text,
+    connect,
+    create_schema,
+    load_minutes,
+    minutes_text,
+    page_text,
+    rebuild_search_index,
+    search,
+    train_codec,
+)
+from tests.db.db_data import fake_minutes
+
+# input
+BOILERPLATE = (
+    "BOARD OF ESTIMATES MINUTES UPON MOTION duly made and seconded, the Board "
+    "approved and authorized execution of the agreement with the Department of "
+    "Transportation. The period of the agreement is effective upon approval. "
+)
+
+
+def sample_minutes(count):
+    """Yields stand-ins for parsed Minutes objects with repetitive pages"""
+    for i in range(count):
+        yield fake_minutes(
+            f"2010_03_{i + 1:02d}.pdf",
+            [f"{BOILERPLATE}Item {i} page {n} contract {i * 10 + n}" for n in range(4)],
+        )
+
+
+class TestCompressText:
+    """Tests storing the text of the minutes compressed in the database"""
+
+    def test_compress_in_place(self, tmp_path):
+        """Tests that text loaded uncompressed can be compressed with a codec
+        trained on it, and that it's read and searched as before, including
+        on a new connection"""
+        # setup
+        db_path = tmp_path / "minutes.db"
+        conn = connect(db_path)
+        create_schema(conn)
+        load_minutes(conn, sample_minutes(20))
+        size = conn.execute("SELECT SUM(LENGTH(page_text)) FROM minutes_pages")
+        size = size.fetchone()[0]
+
+        # execution
+        codec = train_codec(conn, pages=40)
+        compress_text(conn, codec)
+        conn.close()
+        CODECS.clear()  # a new process only knows the codecs in the database
+        conn = connect(db_path)
+
+        # validation
+        types = conn.execute("SELECT DISTINCT TYPEOF(page_text) FROM minutes_pages")
+        assert types.fetchall() == [("blob",)]
+        compressed = conn.execute("SELECT SUM(LENGTH(page_text)) FROM minutes_pages")
+        assert compressed.fetchone()[0] < size / 3
+        assert minutes_text(conn, "2010_03_02.pdf").startswith(BOILERPLATE)
+        assert page_text(conn, "2010_03_02.pdf", 2).endswith(
+            "Item 1 page 1 contract 11"
+        )
+        results = search(conn, '"contract 11"')
+        assert [r["min_filename"] for r in results] == ["2010_03_02.pdf"]
+        assert "[contract 11]" in results[0]["text"]
+        conn.close()
+
+    def test_load_compressed(self, tmp_path):
+        """Tests that once a database has a codec new text is compressed with
+        it, and that updates and deletes keep the index in sync"""
+        # setup
+        conn = connect(tmp_path / "minutes.db")
+        create_schema(conn)
+        minutes = list(sample_minutes(3))
+        load_minutes(conn, minutes[:1])
+        train_codec(conn)
+
+        # execution
+        load_minutes(conn, minutes[1:])
+        minutes[2].sha256 = "f" * 64
+        minutes[2].pages = ["revised towing fees"]
+        load_minutes(conn, minutes[2:])
+
+        # validation
+        types = conn.execute(
+            "SELECT page_min_id, TYPEOF(page_text) FROM minutes_pages "
+            "GROUP BY page_min_id"
+        )
+        assert types.fetchall() == [(1, "text"), (2, "blob"), (3, "blob")]
+        assert [r["page_number"] for r in search(conn, "towing")] == [1]
+        assert search(conn, '"contract 21"') == []
+        assert conn.execute(
+            "INSERT INTO minutes_fts (minutes_fts) VALUES ('integrity-check')"
+        )
+        conn.close()
+
+    def test_plain_sqlite(self, tmp_path):
+        """Tests that uncompressed text can still be read, edited and searched
+        without the decompress_text() function, e.g. from the sqlite3 shell"""
+        # setup
+        db_path = tmp_path / "minutes.db"
+        conn = connect(db_path)
+        create_schema(conn)
+        load_minutes(conn, sample_minutes(2))
+        conn.close()
+
+        # execution
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA foreign_keys = ON")
+        text = conn.execute("SELECT min_text FROM minutes").fetchone()[0]
+        with conn:
+            conn.execute(
+                "INSERT INTO minutes_pages (page_min_id, page_number, page_text) "
+                "VALUES (1, 5, 'revised towing fees')"
+            )
+            conn.execute("DELETE FROM minutes WHERE min_filename = '2010_03_02.pdf'")
+        rowids = conn.execute(
+            "SELECT rowid FROM minutes_fts WHERE minutes_fts MATCH 'towing OR item'"
+        ).fetchall()
+        conn.close()
+
+        # validation
+        assert text.startswith(BOILERPLATE)
+        assert sorted(rowid for (rowid,) in rowids) == [1, 2, 3, 4, 9]
+        conn = connect(db_path)
+        assert [r["page_number"] for r in search(conn, "towing")] == [5]
+        assert search(conn, '"contract 11"') == []
+        conn.close()
+
+    def test_rebuild_search_index(self, tmp_path):
+        """Tests that the index is rebuilt from compressed pages, dropping the
+        pages deleted without the codecs"""
+        # setup
+        db_path = tmp_path / "minutes.db"
+        conn = connect(db_path)
+        create_schema(conn)
+        load_minutes(conn, sample_minutes(2), codec=TextCodec())
+        conn.close()
+        conn = sqlite3.connect(str(db_path))
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            conn.execute("DELETE FROM minutes WHERE min_filename = '2010_03_02.pdf'")
+        conn.close()
+
+        # execution
+        conn = connect(db_path)
+        rebuild_search_index(conn)
+
+        # validation
+        count = "SELECT COUNT(*) FROM minutes_fts WHERE minutes_fts MATCH 'item'"
+        assert conn.execute(count).fetchone()[0] == 4
+        results = search(conn, '"contract 1"')
+        assert [r["min_filename"] for r in results] == ["2010_03_01.pdf"]
+        assert results[0]["text"].endswith("Item 0 page 1 [contract 1]")
+        conn.close()
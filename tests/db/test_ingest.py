@@ -0,0 +1,87 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+from common.db_utils import ingest_pdf_dir
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+class TestIngestPdfDir:
+    """Tests ingest_pdf_dir() which only loads the pdfs that have changed"""
+
+    def setup_dir(self, tmp_path):
+        """Creates a pdf directory with two meetings on the same day"""
+        pdf_dir = tmp_path / "pdf_files"
+        (pdf_dir / "2010").mkdir(parents=True)
+        for name in ["2010_03_17", "2010_03_17_meeting2"]:
+            shutil.copy(PDF_PATH, pdf_dir / "2010" / (name + ".pdf"))
+        return pdf_dir
+
+    def query(self, db_path, sql):
+        """Runs a query against the database"""
+        conn = sqlite3.connect(str(db_path))
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_incremental(self, tmp_path):
+        """Tests that a second run skips the unchanged pdfs and only loads
+        the new and revised ones"""
+        # setup
+        pdf_dir = self.setup_dir(tmp_path)
+        db_path = tmp_path / "minutes.db"
+        first = ingest_pdf_dir(pdf_dir, db_path)
+        ids = self.query(db_path, "SELECT min_id, min_filename FROM minutes")
+        pages = self.query(db_path, "SELECT COUNT(*) FROM minutes_pages")
+
+        # execution
+        second = ingest_pdf_dir(pdf_dir, db_path)
+        with open(pdf_dir / "2010" / "2010_03_17_meeting2.pdf", "ab") as f:
+            f.write(b"\n% revised\n")  # changes the hash but not the text
+        shutil.copy(PDF_PATH, pdf_dir / "2010" / "2010_03_24.pdf")
+        third = ingest_pdf_dir(pdf_dir, db_path)
+
+        # validation
+        assert first == {
+            "added": 2,
+            "updated": 0,
+            "unchanged": 0,
+            "failed": 0,
+            "removed": 0,
+        }
+        assert second["unchanged"] == 2 and second["added"] == 0
+        assert third["added"] == 1 and third["updated"] == 1
+        assert third["unchanged"] == 1
+        rows = self.query(db_path, "SELECT min_id, min_filename FROM minutes")
+        assert rows[:2] == ids  # updated in place
+        assert rows[2][1] == "2010_03_24.pdf"
+        total = self.query(db_path, "SELECT COUNT(*) FROM minutes_pages")
+        assert total[0][0] == pages[0][0] * 3 // 2
+
+    def test_failed_and_prune(self, tmp_path):
+        """Tests that a pdf that can't be parsed is counted and retried on the
+        next run, and that prune removes meetings whose pdf was deleted"""
+        # setup
+        pdf_dir = self.setup_dir(tmp_path)
+        db_path = tmp_path / "minutes.db"
+        ingest_pdf_dir(pdf_dir, db_path)
+        (pdf_dir / "2010" / "2010_03_31.pdf").write_bytes(b"not a pdf")
+        (pdf_dir / "2010" / "2010_03_17.pdf").unlink()
+
+        # execution
+        kept = ingest_pdf_dir(pdf_dir, db_path)
+        pruned = ingest_pdf_dir(pdf_dir, db_path, prune=True)
+
+        # validation
+        assert kept["failed"] == 1 and kept["removed"] == 0
+        assert pruned["failed"] == 1 and pruned["removed"] == 1
+        rows = self.query(db_path, "SELECT min_filename FROM minutes")
+        assert rows == [("2010_03_17_meeting2.pdf",)]
+        orphans = self.query(
+            db_path,
+            "SELECT COUNT(*) FROM minutes_pages WHERE page_min_id NOT IN "
+            "(SELECT min_id FROM minutes)",
+        )
+        assert orphans == [(0,)]
@@ -0,0 +1,151 @@
+import shutil
+import sqlite3
+import pytest
+from pathlib import Path
+
+from common.db_utils import connect, create_schema, load_minutes, load_pdf_dir
+from tests.db.db_data import fake_minutes
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+def sample_minutes(count):
+    """Yields stand-ins for parsed Minutes objects"""
+    for i in range(count):
+        yield fake_minutes(
+            f"2010/2010_03_{i + 1:02d}.pdf",
+            [f"BOARD OF  ESTIMATES {i}", f"MINUTES {i}\n"],
+            clean_text=f"BOARD OF ESTIMATES {i}MINUTES {i}",
+        )
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Opens a new database with the schema in boe_min.sql"""
+    conn = connect(tmp_path / "minutes.db")
+    create_schema(conn)
+    yield conn
+    conn.close()
+
+
+class TestLoadMinutes:
+    """Tests load_minutes() which inserts parsed minutes in batches"""
+
+    def test_schema(self, conn):
+        """Tests that the schema applies with foreign keys on and that the
+        pragmas are set"""
+        # execution
+        create_schema(conn)  # applying it twice has no effect
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(minutes)")}
+
+        # validation
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert conn.execute("PRAGMA foreign_keys").fetchone() == (1,)
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+        assert {"min_date_idx", "min_filename_uq"} <= indexes
+
+    def test_batches(self, conn):
+        """Tests that every row is inserted across several batches"""
+        # execution
+        count = load_minutes(conn, sample_minutes(7), batch_size=3)
+
+        # validation
+        rows = conn.execute(
+            "SELECT min_filename, min_date FROM minutes ORDER BY min_id"
+        ).fetchall()
+        assert count == 7
+        assert rows[0] == ("2010_03_01.pdf", "2010-03-01")
+        assert rows[-1] == ("2010_03_07.pdf", "2010-03-07")
+        pages = conn.execute(
+            "SELECT page_min_id, page_number, page_text FROM minutes_pages"
+        ).fetchall()
+        assert len(pages) == 14
+        assert pages[:2] == [(1, 1, "BOARD OF ESTIMATES 0"), (1, 2, "MINUTES 0")]
+
+    def test_upsert(self, conn):
+        """Tests that loading the same minutes again has no effect, and that
+        minutes whose pdf has changed replace their pages and derived rows"""
+        # setup
+        load_minutes(conn, sample_minutes(3))
+        with conn:
+            conn.execute("INSERT INTO contractor_types VALUES (1, 'Paving')")
+            conn.execute("INSERT INTO accounts VALUES ('A1', 'Roads Inc')")
+            conn.execute(
+                "INSERT INTO contractors VALUES (1, 'Roads Inc', 'A1', 'MD', "
+                "'1 Main St', NULL, 1, 0)"
+            )
+            conn.execute(
+                "INSERT INTO prequal (min_date, min_id, con_id) "
+                "VALUES ('2010-03-02', 2, 1)"
+            )
+        revised = list(sample_minutes(3))
+        revised[1].sha256 = "1" * 64
+        revised[1].pages = ["REVISED"]
+
+        # execution
+        reloaded = load_minutes(conn, sample_minutes(3))
+        updated = load_minutes(conn, revised)
+
+        # validation
+        assert reloaded == 0
+        assert updated == 1
+        assert conn.execute("SELECT COUNT(*) FROM minutes").fetchone() == (3,)
+        pages = conn.execute(
+            "SELECT page_number, page_text FROM minutes_pages WHERE page_min_id = 2"
+        ).fetchall()
+        assert pages == [(1, "REVISED")]
+        assert conn.execute("SELECT COUNT(*) FROM prequal").fetchone() == (0,)
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+
+    def test_failed_batch(self, conn):
+        """Tests that a batch that fails is rolled back as a whole and the
+        earlier batches are kept"""
+        # setup
+        minutes = list(sample_minutes(5))
+        minutes[3].clean_text = None  # violates NOT NULL
+
+        # execution
+        with pytest.raises(sqlite3.IntegrityError):
+            load_minutes(conn, minutes, batch_size=3)
+
+        # validation
+        assert conn.execute("SELECT COUNT(*) FROM minutes").fetchone() == (3,)
+        assert conn.execute("SELECT COUNT(*) FROM minutes_pages").fetchone() == (6,)
+
+    def test_date_index(self, conn):
+        """Tests that lookups by date use the index"""
+        # setup
+        load_minutes(conn, sample_minutes(3))
+
+        # execution
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT min_id FROM minutes WHERE min_date = ?",
+            ("2010-03-02",),
+        ).fetchall()
+
+        # validation
+        assert "min_date_idx" in plan[0][-1]
+
+
+def test_load_pdf_dir(tmp_path):
+    """Tests that a directory of pdfs is parsed into the database"""
+    # setup
+    pdf_dir = tmp_path / "pdf_files"
+    (pdf_dir / "2010").mkdir(parents=True)
+    for name in ["2010_03_17", "2010_03_17_meeting2"]:
+        shutil.copy(PDF_PATH, pdf_dir / "2010" / (name + ".pdf"))
+
+    # execution
+    count = load_pdf_dir(pdf_dir, tmp_path / "minutes.db")
+
+    # validation
+    conn = sqlite3.connect(str(tmp_path / "minutes.db"))
+    rows = conn.execute("SELECT min_filename, min_date, min_text FROM minutes")
+    rows = rows.fetchall()
+    conn.close()
+    assert count == 2
+    assert [row[:2] for row in rows] == [
+        ("2010_03_17.pdf", "2010-03-17"),
+        ("2010_03_17_meeting2.pdf", "2010-03-17"),
+    ]
+    assert rows[0][2].startswith("708 BOARD OF ESTIMATES March 17, 2010")
@@ -0,0 +1,110 @@
+import pytest
+from datetime import date
+
+from common.db_utils import (
+    connect,
+    create_schema,
+    load_minutes,
+    phrase,
+    rebuild_search_index,
+    search,
+)
+from tests.db.db_data import fake_minutes
+
+# input
+MEETINGS = {
+    "2010-03-17": [
+        "BOARD OF ESTIMATES March 17, 2010 MINUTES",
+        "The Board approved the contract for the lease of parking spaces.",
+    ],
+    "2011-06-01": [
+        "BOARD OF ESTIMATES June 1, 2011 MINUTES",
+        "The Board approved the contractor prequalification for Café Roads.",
+    ],
+}
+
+
+@pytest.fixture
+def conn(tmp_path):
+    """Opens a new database with two meetings loaded"""
+    conn = connect(tmp_path / "minutes.db")
+    create_schema(conn)
+    minutes = [
+        fake_minutes(meeting_date.replace("-", "_") + ".pdf", pages)
+        for meeting_date, pages in MEETINGS.items()
+    ]
+    load_minutes(conn, minutes)
+    yield conn
+    conn.close()
+
+
+class TestSearch:
+    """Tests search() which queries the full-text index of the pages"""
+
+    def test_phrase(self, conn):
+        """Tests that a phrase is matched on the page it's on"""
+        # execution
+        results = search(conn, phrase("lease of parking"))
+
+        # validation
+        assert len(results) == 1
+        assert results[0]["min_filename"] == "2010_03_17.pdf"
+        assert results[0]["min_date"] == "2010-03-17"
+        assert results[0]["page_number"] == 2
+        assert "the [lease of parking] spaces" in results[0]["text"]
+
+    def test_prefix(self, conn):
+        """Tests that a prefix query matches every word that starts with it"""
+        # execution
+        results = search(conn, "contract*", highlight=True, markers=("<", ">"))
+
+        # validation
+        texts = sorted(result["text"] for result in results)
+        assert texts == [
+            "The Board approved the <contract> for the lease of parking spaces.",
+            "The Board approved the <contractor> prequalification for Café Roads.",
+        ]
+
+    def test_rank(self, conn):
+        """Tests that pages with more matches rank higher"""
+        # execution
+        results = search(conn, "board OR minutes")
+
+        # validation
+        assert len(results) == 4
+        assert [result["page_number"] for result in results[:2]] == [1, 1]
+        assert results[0]["rank"] <= results[-1]["rank"]
+
+    def test_dates_and_diacritics(self, conn):
+        """Tests filtering by date and matching words without their accents"""
+        # execution
+        results = search(conn, "cafe", since=date(2011, 1, 1))
+        none = search(conn, "cafe", until=date(2010, 12, 31))
+
+        # validation
+        assert [result["min_date"] for result in results] == ["2011-06-01"]
+        assert none == []
+
+    def test_invalid_query(self, conn):
+        """Tests that a query with bad syntax raises a ValueError"""
+        with pytest.raises(ValueError):
+            search(conn, '"unbalanced')
+
+    def test_sync(self, conn):
+        """Tests that the index follows pages that are updated and deleted,
+        including when their minutes are deleted, and survives a rebuild"""
+        # execution
+        with conn:
+            conn.execute(
+                "UPDATE minutes_pages SET page_text = 'towing fees' "
+                "WHERE page_text LIKE '%parking%'"
+            )
+        updated = search(conn, "towing")
+        with conn:
+            conn.execute("DELETE FROM minutes WHERE min_date = '2010-03-17'")
+        rebuild_search_index(conn)
+
+        # validation
+        assert len(updated) == 1
+        assert search(conn, "parking OR towing") == []
+        assert len(search(conn, "estimates")) == 1
@@ -0,0 +1,168 @@
+import shutil
+import pytest
+from datetime import date
+from pathlib import Path
+
+from common.db_utils import connect, create_schema, load_minutes, train_codec
+from common.parquet_utils import (
+    database_pages,
+    export_pages,
+    fiscal_year,
+    minutes_pages,
+    pa,
+    read_pages,
+    read_text_df,
+)
+from common.parse_utils import iter_minutes, store_pdf_text_to_df
+from tests.db.db_data import fake_minutes
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+# input
+MEETINGS = [
+    ("2010_06_30.pdf", ["708 BOARD OF ESTIMATES June 30", "contract"]),
+    ("2010_07_07.pdf", ["709 BOARD OF ESTIMATES July 7", "lease", "parking"]),
+    ("2010_07_07_meeting2.pdf", ["715 SPECIAL MEETING"]),
+    ("2011_06_29.pdf", ["800 BOARD OF ESTIMATES June 29"]),
+]
+
+
+def sample_minutes():
+    """Yields stand-ins for parsed Minutes objects"""
+    for filename, pages in MEETINGS:
+        yield fake_minutes(filename, pages)
+
+
+def test_fiscal_year():
+    """Tests that fiscal years start in July"""
+    assert fiscal_year(date(2010, 6, 30)) == 2010
+    assert fiscal_year(date(2010, 7, 1)) == 2011
+
+
+@pytest.mark.skipif(pa is None, reason="pyarrow isn't installed")
+class TestParquet:
+    """Tests exporting the pages of the minutes to a Parquet dataset and
+    loading them back"""
+
+    def test_partitions(self, tmp_path):
+        """Tests that the pages are partitioned by fiscal year and can be
+        loaded by column and date"""
+        # execution
+        years = export_pages(minutes_pages(sample_minutes()), tmp_path)
+        pages_df = read_pages(tmp_path)
+        metadata = read_pages(tmp_path, columns=["date", "page_number"])
+        fy2011 = read_pages(tmp_path, since=date(2010, 7, 1), until=date(2011, 6, 30))
+
+        # validation
+        assert years == [2010, 2011]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "fiscal_year=2010",
+            "fiscal_year=2011",
+        ]
+        assert len(pages_df) == 7
+        assert list(pages_df["fiscal_year"]) == [
+            2010,
+            2010,
+            2011,
+            2011,
+            2011,
+            2011,
+            2011,
+        ]
+        assert list(pages_df["page_number"]) == [1, 2, 1, 2, 3, 1, 1]
+        assert list(pages_df["meeting"]) == [1, 1, 1, 1, 1, 2, 1]
+        assert str(pages_df["min_filename"].dtype) == "category"
+        assert str(pages_df["date"].dtype) == "datetime64[ns]"
+        assert list(metadata.columns) == ["date", "page_number"]
+        assert list(fy2011["text"]) == [
+            "709 BOARD OF ESTIMATES July 7",
+            "lease",
+            "parking",
+            "715 SPECIAL MEETING",
+            "800 BOARD OF ESTIMATES June 29",
+        ]
+
+    def test_text_df(self, tmp_path):
+        """Tests that the table of minutes is rebuilt a row per meeting"""
+        # setup
+        export_pages(minutes_pages(sample_minutes()), tmp_path)
+
+        # execution
+        text_df = read_text_df(tmp_path, since=date(2010, 7, 1))
+
+        # validation
+        assert list(text_df.columns) == ["date", "page_number", "minutes"]
+        assert text_df.values.tolist() == [
+            [date(2010, 7, 7), "709", "709 BOARD OF ESTIMATES July 7leaseparking"],
+            [date(2010, 7, 7), "715", "715 SPECIAL MEETING"],
+            [date(2011, 6, 29), "800", "800 BOARD OF ESTIMATES June 29"],
+        ]
+
+    def test_raw_text_df(self, tmp_path):
+        """Tests that the table of minutes loaded from the dataset is the same
+        as the one parsed from the pdfs, with the raw text, while the clean
+        text matches the parsed minutes"""
+        # setup
+        pdf_dir = tmp_path / "pdf_files"
+        pdf_dir.mkdir()
+        shutil.copy(PDF_PATH, pdf_dir)
+        export_pages(minutes_pages(iter_minutes(pdf_dir)), tmp_path / "dataset")
+
+        # execution
+        text_df = read_text_df(tmp_path / "dataset")
+        clean_df = read_text_df(tmp_path / "dataset", clean=True)
+
+        # validation
+        assert text_df.equals(store_pdf_text_to_df(pdf_dir))
+        minutes = next(iter_minutes(pdf_dir))
+        assert clean_df["minutes"][0] == minutes.clean_text.strip()
+        assert clean_df["minutes"][0] != text_df["minutes"][0]
+
+    def test_replace(self, tmp_path):
+        """Tests that exporting a fiscal year again replaces it, and that
+        meetings out of date order are all kept"""
+        # setup
+        export_pages(minutes_pages(sample_minutes()), tmp_path)
+        minutes = list(sample_minutes())
+
+        # execution
+        export_pages(minutes_pages([minutes[1], minutes[0], minutes[2]]), tmp_path)
+
+        # validation
+        pages_df = read_pages(tmp_path, columns=["fiscal_year", "min_filename"])
+        assert pages_df["min_filename"].value_counts().to_dict() == {
+            "2010_07_07.pdf": 3,
+            "2010_06_30.pdf": 2,
+            "2010_07_07_meeting2.pdf": 1,
+        }  # 2011_06_29.pdf was in the fiscal year 2011 that was replaced
+
+    def test_from_database(self, tmp_path):
+        """Tests exporting compressed pages from the database and parsed pdfs
+        to the same rows"""
+        # setup
+        pdf_dir = tmp_path / "pdf_files"
+        pdf_dir.mkdir()
+        shutil.copy(PDF_PATH, pdf_dir)
+        conn = connect(tmp_path / "minutes.db")
+        create_schema(conn)
+        load_minutes(conn, iter_minutes(pdf_dir))
+        load_minutes(conn, sample_minutes(), codec=train_codec(conn))
+
+        # execution
+        export_pages(database_pages(conn), tmp_path / "from_db")
+        export_pages(minutes_pages(iter_minutes(pdf_dir)), tmp_path / "from_pdfs")
+        conn.close()
+
+        # validation
+        columns = ["date", "meeting", "min_filename", "page_number", "text"]
+        from_db = read_pages(tmp_path / "from_db", columns, since=date(2010, 3, 17))
+        from_db = from_db[from_db["date"] == "2010-03-17"].reset_index(drop=True)
+        from_pdfs = read_pages(tmp_path / "from_pdfs", columns)
+        for pages_df in [from_db, from_pdfs]:  # the categories are different
+            pages_df["min_filename"] = pages_df["min_filename"].astype(str)
+        assert len(from_pdfs) > 10
+        assert from_db.equals(from_pdfs)
+        assert len(read_pages(tmp_path / "from_db")) == len(from_pdfs) + 7
+        assert len(read_text_df(tmp_path / "from_db", clean=True)) == 5
+        with pytest.raises(ValueError):
+            read_text_df(tmp_path / "from_db")  # the database has no raw text
@@ -0,0 +1,68 @@
+import pytest
+from pathlib import Path
+
+from common.extract_utils import open_pdf, get_backend, available_backends
+from common.parse_utils import Minutes, text_version, TEXT_VERSION
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+class TestBackends:
+    """Tests the extraction backends in BACKENDS that are installed"""
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_open_pdf(self, backend):
+        """Tests that every backend reads the pages and metadata"""
+        # execution
+        document = open_pdf(PDF_PATH, backend)
+        first_page = document.extract_page(0)
+        document.close()
+
+        # validation
+        assert document.page_count == 105
+        assert document.producer == "Acrobat Distiller 7.0.5 (Windows)"
+        assert "BOARD OF ESTIMATES" in first_page
+        assert first_page == first_page.strip()
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_errors(self, backend, tmp_path):
+        """Tests that every backend raises the same errors"""
+        # setup
+        bad_pdf = tmp_path / "2010_03_17.pdf"
+        bad_pdf.write_bytes(b"%PDF-1.4 not really a pdf")
+
+        # validation
+        with pytest.raises(FileNotFoundError):
+            open_pdf(tmp_path / "missing.pdf", backend)
+        with pytest.raises(ValueError):
+            open_pdf(bad_pdf, backend)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            get_backend("acrobat")
+
+    def test_text_version(self):
+        """Tests that text from each backend is cached separately"""
+        assert text_version() == TEXT_VERSION
+        assert TEXT_VERSION.startswith("pypdf2-")
+        for backend in available_backends():
+            if backend != "pypdf2":
+                assert text_version(backend) != TEXT_VERSION
+
+
+@pytest.mark.skipif(
+    "pymupdf" not in available_backends(), reason="PyMuPDF isn't installed"
+)
+def test_minutes_backend():
+    """Tests that text from a backend that decodes the pdf correctly isn't
+    run through the replacements for PyPDF2's misread characters"""
+    # setup
+    minutes = Minutes(PDF_PATH, backend="pymupdf")
+
+    # execution
+    minutes.parse_and_clean_pages()
+
+    # validation
+    assert minutes.profiles == ()
+    assert "Honorable Bernard C. “Jack” Young" in minutes.clean_text
+    assert minutes.pages[7] == minutes.reader.extract_page(7)
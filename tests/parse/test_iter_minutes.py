@@ -0,0 +1,73 @@
+import shutil
+import pytest
+from datetime import date, datetime
+from pathlib import Path
+
+from common.parse_utils import iter_minutes, parse_pdf_date
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+@pytest.fixture
+def archive_dir(tmp_path):
+    """Creates a pdf directory with copies of the sample minutes named after
+    meetings out of order, including a second meeting on the same day"""
+    names = ["2011_01_05", "2010_03_17_meeting2", "2009_12_16", "2010_03_17"]
+    for name in names:
+        year_dir = tmp_path / name[:4]
+        year_dir.mkdir(exist_ok=True)
+        shutil.copy(PDF_PATH, year_dir / (name + ".pdf"))
+    shutil.copy("tests/parse/fake_name.pdf", tmp_path / "2010" / "fake_name.pdf")
+    return tmp_path
+
+
+class TestParsePDFDate:
+    """Tests parse_pdf_date() which parses the meeting date from a pdf name"""
+
+    @pytest.mark.parametrize(
+        "name,expected",
+        [
+            ("2010_03_17.pdf", (datetime(2010, 3, 17), 1)),
+            ("2010_03_17_meeting2.pdf", (datetime(2010, 3, 17), 2)),
+        ],
+    )
+    def test_parse_pdf_date(self, name, expected):
+        assert parse_pdf_date(Path("2010") / name) == expected
+
+    def test_no_date(self):
+        with pytest.raises(ValueError):
+            parse_pdf_date(Path("fake_name.pdf"))
+
+
+class TestIterMinutes:
+    """Tests iter_minutes() which parses the pdfs in a directory one at a
+    time in order of meeting date
+    """
+
+    def test_date_order(self, archive_dir, capsys):
+        """Tests that meetings are yielded by date then meeting number and
+        that pdfs without a date are skipped"""
+        # execution
+        minutes = iter_minutes(archive_dir)
+        first = next(minutes)
+        names = [first.pdf_path.stem] + [m.pdf_path.stem for m in minutes]
+
+        # validation
+        assert first.clean_text is not None
+        assert names == [
+            "2009_12_16",
+            "2010_03_17",
+            "2010_03_17_meeting2",
+            "2011_01_05",
+        ]
+        assert "No date found" in capsys.readouterr().out
+
+    def test_date_range(self, archive_dir):
+        """Tests that since and until are inclusive bounds"""
+        # execution
+        minutes = iter_minutes(
+            archive_dir, since=date(2010, 3, 17), until=date(2010, 12, 31)
+        )
+
+        # validation
+        assert [m.meeting_date for m in minutes] == ["2010-03-17", "2010-03-17"]
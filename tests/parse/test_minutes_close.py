@@ -0,0 +1,73 @@
+import os
+import pytest
+import shutil
+from pathlib import Path
+
+from common.extract_utils import available_backends
+from common.parse_utils import Minutes, iter_minutes, parse_pdf
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+def open_fds():
+    """Counts the file descriptors open in this process"""
+    return len(os.listdir("/proc/self/fd"))
+
+
+class TestMinutesClose:
+    """Tests that Minutes releases its pdf deterministically"""
+
+    def test_context_manager(self):
+        """Tests that the pdf is closed at the end of a with block and that
+        the parsed pages are still available afterwards"""
+        # execution
+        with Minutes(PDF_PATH) as minutes:
+            lazy_page = minutes.pages[3]
+            minutes.parse_and_clean_pages()
+
+        # validation
+        assert minutes.reader.closed
+        assert minutes.pages[3] == lazy_page
+        minutes.close()  # closing twice has no effect
+
+    def test_closed_pages(self):
+        """Tests that pages that were never extracted can't be read once the
+        pdf is closed"""
+        # setup
+        minutes = Minutes(PDF_PATH)
+        minutes.close()
+
+        # validation
+        with pytest.raises(ValueError):
+            minutes.pages[0]
+
+    @pytest.mark.parametrize("backend", available_backends())
+    def test_mmap(self, backend):
+        """Tests that memory-mapping the pdf gives the same text"""
+        # execution
+        expected = parse_pdf(PDF_PATH, backend=backend)
+        minutes = parse_pdf(PDF_PATH, backend=backend, use_mmap=True)
+
+        # validation
+        assert minutes.raw_text == expected.raw_text
+        assert minutes.reader.closed
+
+    @pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+    def test_no_leaks(self, tmp_path):
+        """Tests that parsing an archive, including pdfs that fail, doesn't
+        leave any files open"""
+        # setup
+        for name in ["2010_03_17", "2010_03_24", "2010_04_07"]:
+            shutil.copy(PDF_PATH, tmp_path / (name + ".pdf"))
+        (tmp_path / "2010_04_14.pdf").write_bytes(b"%PDF-1.4 not really a pdf")
+        shutil.copy("tests/parse/fake_name.pdf", tmp_path / "fake_name.pdf")
+        before = open_fds()
+
+        # execution
+        meetings = [m.meeting_date for m in iter_minutes(tmp_path, use_mmap=True)]
+        with pytest.raises(ValueError):
+            Minutes(tmp_path / "fake_name.pdf")
+
+        # validation
+        assert meetings == ["2010-03-17", "2010-03-24", "2010-04-07"]
+        assert open_fds() == before
@@ -0,0 +1,86 @@
+import pytest
+from pathlib import Path
+
+from common.cache_utils import TextCache
+from common.parse_utils import Minutes, parse_pdf, join_pages, TEXT_VERSION
+from tests.parse.parse_data import RAW_TEXT
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+class TestMinutesPages:
+    """Tests the pages of a Minutes object, which are extracted lazily until
+    the whole pdf has been parsed
+    """
+
+    def test_lazy_pages(self):
+        """Tests that pages are extracted one at a time and that only the
+        most recently used ones are kept"""
+        # setup
+        minutes = Minutes(PDF_PATH)
+        minutes.pages.maxsize = 2
+
+        # execution
+        first = minutes.pages[0]
+        last = minutes.pages[-1]
+        minutes.pages[50]
+
+        # validation
+        assert len(minutes.pages) == 105
+        assert first.startswith(RAW_TEXT["2010"][:20])
+        assert last == minutes.pages[104]
+        assert list(minutes.pages._pages) == [50, 104]
+        assert minutes.raw_text is None
+        with pytest.raises(IndexError):
+            minutes.pages[105]
+
+    def test_pages_match_raw_text(self):
+        """Tests that the pages extracted lazily join into the raw text"""
+        # setup
+        lazy = Minutes(PDF_PATH)
+        pages = lazy.pages[:3]
+
+        # execution
+        minutes = parse_pdf(PDF_PATH)
+
+        # validation
+        assert minutes.pages[:3] == pages
+        assert "".join(minutes.pages) == minutes.raw_text
+        assert minutes.page_span(1) == (
+            len(pages[0]),
+            len(pages[0]) + len(pages[1]),
+        )
+
+    def test_page_of(self):
+        """Tests that positions in the raw text are mapped to their page"""
+        # setup
+        minutes = Minutes(PDF_PATH)
+        with pytest.raises(ValueError):
+            minutes.page_of(0)
+        minutes.parse_and_clean_pages()
+        match_start = minutes.raw_text.index(minutes.pages[7][:30])
+
+        # validation
+        assert minutes.page_of(0) == 0
+        assert minutes.page_of(match_start) == 7
+        assert minutes.page_of(len(minutes.raw_text) - 1) == 104
+
+    def test_cached_offsets(self, tmp_path):
+        """Tests that the page offsets are stored with the cached text"""
+        # setup
+        cache = TextCache(tmp_path, version=TEXT_VERSION)
+        expected = parse_pdf(PDF_PATH, cache=cache)
+
+        # execution
+        minutes = Minutes(PDF_PATH)
+        minutes.reader = None  # parsing the pdf would now raise an error
+        minutes.parse_and_clean_pages(cache=cache)
+
+        # validation
+        assert minutes.page_offsets == expected.page_offsets
+        assert minutes.pages[7] == expected.pages[7]
+
+
+def test_join_pages():
+    """Tests that empty pages start where the next page starts"""
+    assert join_pages(["ab", "", "c"]) == ("abc", [0, 2, 2])
@@ -3,6 +3,7 @@ import PyPDF2
 from pathlib import Path
 
 from common.parse_utils import Minutes, parse_pdf
+from common.utils import NORMALIZER
 from tests.parse.parse_data import RAW_TEXT, CLEAN_TEXT
 
 
@@ -53,6 +54,20 @@ class TestMinutes:
         assert minutes.raw_text[:100] == raw
         assert minutes.clean_text[:100] == clean
 
+    def test_profiles(self):
+        """Tests that the sample minutes are cleaned with the profile for
+        its producer, giving the same text as the full replacement table"""
+        # setup
+        minutes = Minutes(Path("tests/parse/2010_03_17.pdf"))
+
+        # execution
+        minutes.parse_and_clean_pages()
+
+        # validation
+        assert minutes.producer.startswith("Acrobat Distiller")
+        assert minutes.profiles == ("pdfdoc",)
+        assert minutes.clean_text == NORMALIZER.normalize(minutes.raw_text)
+
 
 class TestParsePDF:
     """Tests the parse_pdf function which instantiates a Minutes object
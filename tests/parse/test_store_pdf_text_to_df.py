@@ -0,0 +1,73 @@
+import shutil
+import pytest
+from datetime import date
+from pathlib import Path
+
+from common.parse_utils import store_pdf_text_to_df, build_text_df
+from tests.parse.parse_data import RAW_TEXT
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+@pytest.fixture(scope="module")
+def corpus_dir(tmp_path_factory):
+    """Creates a small pdf directory with copies of the sample minutes"""
+    dir = tmp_path_factory.mktemp("corpus")
+    for date_string in ["2010_03_17", "2010_03_24", "2011_01_05"]:
+        year_dir = dir / date_string[:4]
+        year_dir.mkdir(exist_ok=True)
+        shutil.copy(PDF_PATH, year_dir / (date_string + ".pdf"))
+    shutil.copy("tests/parse/fake_name.pdf", dir / "2010" / "fake_name.pdf")
+    return dir
+
+
+class TestStorePDFTextToDF:
+    """Tests store_pdf_text_to_df() which parses every pdf in a directory
+    into a dataframe of minutes
+    """
+
+    def test_serial(self, corpus_dir):
+        """Tests that every pdf named after a date becomes a row"""
+        # execution
+        text_df = store_pdf_text_to_df(corpus_dir)
+
+        # validation
+        assert list(text_df.columns) == ["date", "page_number", "minutes"]
+        assert sorted(text_df["date"]) == [
+            date(2010, 3, 17),
+            date(2010, 3, 24),
+            date(2011, 1, 5),
+        ]
+        assert set(text_df["page_number"]) == {"708"}
+        assert text_df["minutes"][0][:50] == RAW_TEXT["2010"][:50]
+
+    def test_parallel(self, corpus_dir):
+        """Tests that the process pool returns the same frame in the same
+        order as parsing serially"""
+        # execution
+        serial = store_pdf_text_to_df(corpus_dir)
+        parallel = store_pdf_text_to_df(corpus_dir, workers=2, chunksize=1)
+
+        # validation
+        assert parallel.equals(serial)
+
+
+def test_build_text_df():
+    """Tests that the rows are gathered in order, skipping missing rows"""
+    # setup
+    rows = [
+        {"date": date(2010, 3, 17), "page_number": "708", "minutes": "a"},
+        None,
+        {"date": date(2010, 3, 24), "page_number": "", "minutes": "b"},
+    ]
+
+    # execution
+    text_df = build_text_df(rows)
+    empty_df = build_text_df([])
+
+    # validation
+    assert list(text_df.columns) == ["date", "page_number", "minutes"]
+    assert text_df.to_dict("records") == [rows[0], rows[2]]
+    assert list(text_df.index) == [0, 1]
+    assert list(empty_df.columns) == list(text_df.columns)
+    assert empty_df.empty
@@ -0,0 +1,124 @@
+import os
+import shutil
+import time
+import pytest
+from datetime import date
+from pathlib import Path
+
+from common.parse_utils import store_pdf_text_to_df
+from common.supervise_utils import ParseSupervisor, Quarantine
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+def fake_parse(pdf_path):
+    """Stands in for parse_pdf_row(), misbehaving for some file names"""
+    if pdf_path.stem == "slow":
+        time.sleep(30)
+    elif pdf_path.stem == "huge":
+        return bytearray(2 * 1024**3)
+    elif pdf_path.stem == "crash":
+        os._exit(3)
+    elif pdf_path.stem == "error":
+        raise KeyError("/Root")
+    return pdf_path.stem
+
+
+@pytest.fixture
+def pdf_paths(tmp_path):
+    """Creates a file for each way fake_parse() can behave"""
+    paths = []
+    for name in ["good1", "slow", "huge", "crash", "error", "good2"]:
+        path = tmp_path / (name + ".pdf")
+        path.write_bytes(b"%PDF-1.4 " + name.encode())
+        paths.append(path)
+    return paths
+
+
+class TestParseSupervisor:
+    """Tests the ParseSupervisor which parses each pdf in a worker process
+    with a time and memory limit
+    """
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_failures(self, pdf_paths, tmp_path, workers):
+        """Tests that the pdfs that fail are quarantined with the reason and
+        the rest are returned in order"""
+        # setup
+        quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+        supervisor = ParseSupervisor(
+            timeout=2, max_memory=256 * 1024**2, quarantine=quarantine
+        )
+
+        # execution
+        start = time.monotonic()
+        results = supervisor.map(fake_parse, pdf_paths, workers=workers)
+        elapsed = time.monotonic() - start
+
+        # validation
+        assert results == ["good1", None, None, None, None, "good2"]
+        assert elapsed < 15
+        reasons = {path.stem: reason for path, reason in supervisor.failures.items()}
+        assert reasons["slow"] == "timed out after 2 seconds"
+        assert reasons["huge"].startswith("ran out of memory")
+        assert reasons["crash"] == "worker exited with code 3"
+        assert reasons["error"] == "KeyError: '/Root'"
+
+    def test_quarantine(self, pdf_paths, tmp_path):
+        """Tests that quarantined pdfs are skipped by later runs until they
+        are released or their contents change"""
+        # setup
+        path = tmp_path / "quarantine.jsonl"
+        crash, error = pdf_paths[3], pdf_paths[4]
+        Quarantine(path).add(crash, "worker exited with code 3")
+        Quarantine(path).add(error, "KeyError: '/Root'")
+
+        # execution
+        quarantine = Quarantine(path)
+        quarantine.release(error)
+        crash.write_bytes(b"%PDF-1.4 fixed")
+        error_skipped = Quarantine(path).is_quarantined(error)
+        crash_skipped = quarantine.is_quarantined(crash)
+        results = ParseSupervisor(quarantine=Quarantine(path)).map(
+            fake_parse, pdf_paths[:1] + pdf_paths[4:]
+        )
+
+        # validation
+        assert not error_skipped
+        assert not crash_skipped
+        assert results == ["good1", None, "good2"]
+
+
+def test_store_pdf_text_to_df(tmp_path):
+    """Tests that supervised parsing gives the same rows"""
+    # setup
+    for date_string in ["2010_03_17", "2010_03_24"]:
+        shutil.copy(PDF_PATH, tmp_path / (date_string + ".pdf"))
+    supervisor = ParseSupervisor(timeout=60)
+
+    # execution
+    text_df = store_pdf_text_to_df(tmp_path, workers=2, supervisor=supervisor)
+
+    # validation
+    assert sorted(text_df["date"]) == [date(2010, 3, 17), date(2010, 3, 24)]
+    assert not supervisor.failures
+
+
+def test_unreadable_pdf(tmp_path):
+    """Tests that a pdf that can't be read is quarantined with the reason
+    when it's parsed under supervision, so the next run skips it"""
+    # setup
+    shutil.copy(PDF_PATH, tmp_path / "2010_03_17.pdf")
+    garbage = tmp_path / "2010_03_24.pdf"
+    garbage.write_bytes(b"this isn't a pdf")
+    quarantine = Quarantine(tmp_path / "quarantine.jsonl")
+    supervisor = ParseSupervisor(timeout=60, quarantine=quarantine)
+
+    # execution
+    text_df = store_pdf_text_to_df(tmp_path, workers=2, supervisor=supervisor)
+
+    # validation
+    assert list(text_df["date"]) == [date(2010, 3, 17)]
+    assert list(supervisor.failures) == [garbage]
+    assert supervisor.failures[garbage].startswith("ValueError: PyPDF2 couldn't read")
+    assert Quarantine(tmp_path / "quarantine.jsonl").is_quarantined(garbage)
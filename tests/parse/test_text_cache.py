@@ -0,0 +1,160 @@
+import shutil
+import pytest
+from pathlib import Path
+
+from common.cache_utils import TextCache
+from common.compress_utils import TextCodec
+from common.extract_utils import available_backends
+from common.parse_utils import (
+    Minutes,
+    parse_pdf,
+    parse_pdf_row,
+    store_pdf_text_to_df,
+    TEXT_VERSION,
+)
+from tests.parse.parse_data import RAW_TEXT, CLEAN_TEXT
+
+PDF_PATH = Path("tests/parse/2010_03_17.pdf")
+
+
+class TestTextCache:
+    """Tests the TextCache which stores the text extracted from each pdf so
+    that unchanged pdfs aren't parsed again
+    """
+
+    def test_warm_parse(self, tmp_path):
+        """Tests that a cached pdf is read from the cache, not the pdf"""
+        # setup
+        cache = TextCache(tmp_path, version=TEXT_VERSION)
+        parse_pdf(PDF_PATH, cache=cache)
+        minutes = Minutes(PDF_PATH)
+        minutes.reader = None  # parsing the pdf would now raise an error
+
+        # execution
+        minutes.parse_and_clean_pages(cache=cache)
+
+        # validation
+        assert minutes.raw_text[:100] == RAW_TEXT["2010"]
+        assert minutes.clean_text[:100] == CLEAN_TEXT["2010"]
+
+    def test_content_key(self, tmp_path):
+        """Tests that entries follow the pdf's contents rather than its path
+        and are missed when the parser version changes"""
+        # setup
+        cache = TextCache(tmp_path / "cache", version=TEXT_VERSION)
+        copy = tmp_path / "2010_03_18.pdf"
+        shutil.copy(PDF_PATH, copy)
+        cache.put(PDF_PATH, "raw", "clean")
+
+        # execution
+        renamed = cache.get(copy)
+        new_version = TextCache(tmp_path / "cache", version="other").get(PDF_PATH)
+
+        # validation
+        assert renamed == {"raw_text": "raw", "clean_text": "clean"}
+        assert new_version is None
+
+    @pytest.mark.skipif(
+        "pymupdf" not in available_backends(), reason="PyMuPDF isn't installed"
+    )
+    def test_backend_key(self, tmp_path):
+        """Tests that a cache created without a version still keys its
+        entries by the backend that extracted the text"""
+        # setup
+        cache = TextCache(tmp_path)
+        parse_pdf(PDF_PATH, cache=cache)
+
+        # execution
+        minutes = parse_pdf(PDF_PATH, cache=cache, backend="pymupdf")
+        row = parse_pdf_row(PDF_PATH, cache=cache)
+
+        # validation
+        assert "Honorable Bernard C. “Jack” Young" in minutes.clean_text
+        assert row["minutes"][:100] == RAW_TEXT["2010"].strip()[:100]
+        assert len(list(tmp_path.glob("*.z"))) == 2
+
+    def test_codec(self, tmp_path):
+        """Tests that entries compressed with a codec are read back, and are
+        missed by a cache with another codec"""
+        # setup
+        codec = TextCodec.train(["BOARD OF ESTIMATES MINUTES REGULAR MEETING"] * 2)
+        cache = TextCache(tmp_path, version=TEXT_VERSION, codec=codec)
+        cache.put(PDF_PATH, "raw", "clean", [0])
+
+        # execution
+        entry = cache.get(PDF_PATH)
+        other = TextCache(tmp_path, version=TEXT_VERSION).get(PDF_PATH)
+
+        # validation
+        assert entry == {"raw_text": "raw", "clean_text": "clean", "page_offsets": [0]}
+        assert other is None
+
+    def test_invalidate(self, tmp_path):
+        """Tests that invalidating a pdf removes it for every version"""
+        # setup
+        TextCache(tmp_path, version="old").put(PDF_PATH, "raw", "clean")
+        cache = TextCache(tmp_path, version=TEXT_VERSION)
+        cache.put(PDF_PATH, "raw", "clean")
+
+        # execution
+        cache.invalidate(PDF_PATH)
+
+        # validation
+        assert cache.get(PDF_PATH) is None
+        assert not any(tmp_path.iterdir())
+
+    def test_evict(self, tmp_path):
+        """Tests that the least recently used entries are evicted once the
+        cache is larger than max_bytes"""
+        # setup
+        pdfs = []
+        for i in range(3):
+            pdf = tmp_path / f"{i}.pdf"
+            pdf.write_bytes(b"%PDF " + bytes([i]))
+            pdfs.append(pdf)
+        cache = TextCache(tmp_path / "cache", max_bytes=10_000)
+        text = "".join(chr(0x4E00 + i) for i in range(2000))  # compresses poorly
+
+        # execution
+        for pdf in pdfs:
+            cache.put(pdf, text, text)
+
+        # validation
+        assert cache.get(pdfs[0]) is None
+        assert cache.get(pdfs[2]) is not None
+
+    def test_store_pdf_text_to_df(self, tmp_path):
+        """Tests that the dataframe is the same when read from the cache"""
+        # setup
+        pdf_dir = tmp_path / "pdf_files" / "2010"
+        pdf_dir.mkdir(parents=True)
+        shutil.copy(PDF_PATH, pdf_dir)
+        cache = TextCache(tmp_path / "cache", version=TEXT_VERSION)
+        cold = store_pdf_text_to_df(tmp_path / "pdf_files", cache=cache)
+
+        # execution
+        warm = store_pdf_text_to_df(tmp_path / "pdf_files", cache=cache)
+
+        # validation
+        assert warm.equals(cold)
+        assert len(list((tmp_path / "cache").glob("*.z"))) == 1
+
+    def test_workers_codec(self, tmp_path):
+        """Tests that a cache with a codec can be used by a process pool"""
+        # setup
+        for year in ["2010", "2011"]:
+            pdf_dir = tmp_path / "pdf_files" / year
+            pdf_dir.mkdir(parents=True)
+            shutil.copy(PDF_PATH, pdf_dir / f"{year}_03_17.pdf")
+        codec = TextCodec.train([RAW_TEXT["2010"], CLEAN_TEXT["2010"]])
+        cache = TextCache(tmp_path / "cache", version=TEXT_VERSION, codec=codec)
+        serial = store_pdf_text_to_df(tmp_path / "pdf_files")
+
+        # execution
+        cold = store_pdf_text_to_df(tmp_path / "pdf_files", workers=2, cache=cache)
+        warm = store_pdf_text_to_df(tmp_path / "pdf_files", workers=2, cache=cache)
+
+        # validation
+        assert cold.equals(serial)
+        assert warm.equals(serial)
+        assert len(list((tmp_path / "cache").glob("*.z"))) == 1
@@ -0,0 +1,250 @@
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common.scrape_utils import MONTHS
+
+MINUTES_PATH = "/boe/meetings/minutes"
+
+
+def meeting_dates(year, count):
+    """Returns the first `count` Wednesdays of a year, the usual day of the
+    week for BOE meetings"""
+    day = date(year, 1, 1)
+    day += timedelta(days=(2 - day.weekday()) % 7)
+    return [day + timedelta(weeks=i) for i in range(count)]
+
+
+def fake_pdf(day, size):
+    """Builds the bytes of a synthetic pdf of roughly `size` bytes"""
+    header = f"%PDF-1.4\n% BOE minutes {day.isoformat()}\n".encode()
+    trailer = b"\n%%EOF\n"
+    padding = max(0, size - len(header) - len(trailer))
+    return header + b"0" * padding + trailer
+
+
+class MockComptrollerSite:
+    """Creates a local stand-in for the Comptroller's website that serves a
+    landing page of year links, a page of meeting links for each year and a
+    synthetic pdf for each meeting. Latency, server errors and throttling can
+    be injected to test and benchmark the scraper without the live site
+
+    Usage:
+        with MockComptrollerSite(years=range(2018, 2021)) as site:
+            get_boe_pdfs(site.minutes_url, site.base_url, dir=pdf_dir)
+    """
+
+    def __init__(
+        self,
+        years=range(2009, 2021),
+        meetings_per_year=4,
+        pdf_size=64 * 1024,
+        latency=0.0,
+        error_rate=0.0,
+        max_rate=None,
+        retry_after=1,
+        seed=0,
+    ):
+
+        self.years = [str(year) for year in years]
+        self.meetings_per_year = meetings_per_year
+        self.pdf_size = pdf_size
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_rate = max_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.pdfs = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.reset_stats()
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    @property
+    def minutes_url(self):
+        return self.base_url + MINUTES_PATH
+
+    def meeting_links(self):
+        """Returns the nested dict of meeting links get_meeting_links() is
+        expected to find on each year page"""
+        links = {}
+        for year in self.years:
+            links[year] = {}
+            for day in meeting_dates(int(year), self.meetings_per_year):
+                key = day.strftime("%Y_%m_%d")
+                links[year][key] = self.base_url + self.pdf_path(day)
+        return links
+
+    def pdf_path(self, day):
+        return f"/files/{day.isoformat()}pdf"
+
+    def reset_stats(self):
+        """Zeroes the counts of requests and bytes served"""
+        with self.lock:
+            self.stats = {"pages": 0, "pdfs": 0, "bytes": 0, "errors": 0}
+            self.stats.update({"not_modified": 0, "throttled": 0, "requests": 0})
+            self.window = (time.monotonic(), 0)
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def should_throttle(self):
+        """Tracks requests per one second window against max_rate"""
+        if self.max_rate is None:
+            return False
+        with self.lock:
+            start, requests = self.window
+            now = time.monotonic()
+            if now - start >= 1:
+                start, requests = now, 0
+            self.window = (start, requests + 1)
+            return requests + 1 > self.max_rate
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def landing_page(self):
+        links = "".join(
+            f'<li><a href="/minutes-{year}">{year}</a></li>' for year in self.years
+        )
+        return f"<html><body><ul>{links}</ul></body></html>"
+
+    def year_page(self, year):
+        links = []
+        for day in meeting_dates(int(year), self.meetings_per_year):
+            text = f"{MONTHS[day.month - 1].title()} {day.day}, {day.year}"
+            links.append(f'<p><a href="{self.pdf_path(day)}">{text}</a></p>')
+        return f"<html><body>{''.join(links)}</body></html>"
+
+    def get_pdf(self, name):
+        day = date.fromisoformat(name[:10])
+        with self.lock:
+            if day not in self.pdfs:
+                self.pdfs[day] = fake_pdf(day, self.pdf_size)
+            return self.pdfs[day]
+
+    def start(self):
+        """Starts serving the site from a background thread on a free port"""
+
+        class Handler(MockComptrollerHandler):
+            site = self
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shuts the server down"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MockComptrollerHandler(BaseHTTPRequestHandler):
+    """Handles the requests for a MockComptrollerSite"""
+
+    site = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # keeps the test output quiet
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def respond(self, head):
+        site = self.site
+        site.count("requests")
+        if site.latency:
+            time.sleep(site.latency)
+        if site.should_throttle():
+            site.count("throttled")
+            return self.send_body(
+                429, b"", "text/plain", head, {"Retry-After": site.retry_after}
+            )
+        if site.should_fail():
+            site.count("errors")
+            return self.send_body(500, b"", "text/plain", head)
+
+        path = self.path.split("?")[0]
+        year_match = re.fullmatch(r"/minutes-(\d{4})", path)
+        pdf_match = re.fullmatch(r"/files/(\d{4}-\d{2}-\d{2})pdf", path)
+        if path == MINUTES_PATH:
+            self.send_html(site.landing_page(), head)
+        elif year_match and year_match.group(1) in site.years:
+            self.send_html(site.year_page(year_match.group(1)), head)
+        elif pdf_match:
+            self.send_pdf(site.get_pdf(pdf_match.group(1)), head)
+        else:
+            self.send_body(404, b"Not Found", "text/plain", head)
+
+    def send_html(self, html, head):
+        headers = {"ETag": f'"{zlib.crc32(html.encode()):x}"'}
+        headers["Last-Modified"] = self.site.last_modified
+        if self.headers.get("If-None-Match") == headers["ETag"]:
+            self.site.count("not_modified")
+            return self.send_body(304, b"", "text/html", True, headers)
+        if not head:
+            self.site.count("pages")
+            self.site.count("bytes", len(html.encode()))
+        self.send_body(200, html.encode(), "text/html", head, headers)
+
+    def send_pdf(self, content, head):
+        etag = f'"{zlib.crc32(content):x}"'
+        headers = {"ETag": etag, "Last-Modified": self.site.last_modified}
+        headers["Accept-Ranges"] = "bytes"
+
+        # serves the rest of the pdf when asked for a range of the same version
+        byte_range = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if byte_range and if_range in (None, etag, self.site.last_modified):
+            start = int(byte_range.group(1))
+            if start >= len(content):
+                return self.send_body(416, b"", "text/plain", head)
+            headers["Content-Range"] = (
+                f"bytes {start}-{len(content) - 1}/{len(content)}"
+            )
+            self.site.count("bytes", len(content) - start)
+            return self.send_body(
+                206, content[start:], "application/pdf", head, headers
+            )
+
+        if not head:
+            self.site.count("pdfs")
+            self.site.count("bytes", len(content))
+        self.send_body(200, content, "application/pdf", head, headers)
+
+    def send_body(self, status, body, content_type, head, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        if not head and status != 304:
+            self.wfile.write(body)
@@ -0,0 +1,109 @@
+import pytest
+from copy import deepcopy
+from datetime import datetime
+
+from tests.scrape.scrape_data import MEETING_LINKS
+
+from common.manifest_utils import CrawlManifest
+from common.utils import hash_file
+from common.scrape_utils import check_missing_pdfs
+
+
+class TestCrawlManifest:
+    """Tests the CrawlManifest which records each downloaded meeting so the
+    scraper can find missing pdfs without checking the pdf directory
+    """
+
+    def _create_pdf_files(self, dir, meeting_dict):
+        """Helper function used to populate the pdf directory"""
+        files = []
+        for year, meetings in meeting_dict.items():
+            year_dir = dir / year
+            year_dir.mkdir(parents=True, exist_ok=True)
+            for date in meetings:
+                pdf_file = year_dir / (date + ".pdf")
+                pdf_file.write_bytes(b"%PDF-1.4 " + date.encode())
+                files.append(pdf_file)
+        return files
+
+    def test_record_and_load(self, tmp_path):
+        """Tests that downloads are persisted and read back by a new manifest"""
+        # setup
+        path = tmp_path / "manifest.jsonl"
+        pdf_file = self._create_pdf_files(tmp_path, {"2020": ["2020_01_15"]})[0]
+        url = MEETING_LINKS["2020"]["2020_01_15"]
+        headers = {"etag": '"abc"', "last-modified": "Wed, 15 Jan 2020 GMT"}
+
+        # execution
+        CrawlManifest(path).record_download(
+            "2020", "2020_01_15", url, pdf_file, headers
+        )
+        manifest = CrawlManifest(path)
+
+        # validation
+        record = manifest.meetings["2020_01_15"]
+        assert record["url"] == url
+        assert record["size"] == pdf_file.stat().st_size
+        assert record["sha256"] == hash_file(pdf_file)
+        assert record["etag"] == '"abc"'
+        assert record["last_modified"] == "Wed, 15 Jan 2020 GMT"
+
+    def test_missing(self, tmp_path):
+        """Tests that the manifest diff matches check_missing_pdfs()"""
+        # setup
+        keep_links = deepcopy(MEETING_LINKS)
+        del keep_links["2020"]["2020_01_15"]
+        keep_links["2018"] = {"2018_01_10": "https://www.fake-path.com/2018-01-10"}
+        manifest = CrawlManifest(tmp_path / "manifest.jsonl")
+        self._create_pdf_files(tmp_path, keep_links)
+        manifest.sync(keep_links, dir=tmp_path)
+
+        # execution
+        missing, extra = check_missing_pdfs(MEETING_LINKS, manifest=manifest)
+
+        # validation
+        assert missing == {"2020": {"2020_01_15": MEETING_LINKS["2020"]["2020_01_15"]}}
+        assert extra == {"2018_01_10.pdf"}
+
+    @pytest.mark.parametrize(
+        "year,crawled_at,downloaded,expected",
+        [
+            ("2019", "2020-02-01T00:00:00", True, True),
+            ("2019", "2019-12-01T00:00:00", True, False),  # crawled mid-year
+            ("2019", "2020-02-01T00:00:00", False, False),  # pdf still missing
+            (str(datetime.now().year), "2099-01-01T00:00:00", True, False),
+        ],
+    )
+    def test_is_settled(self, tmp_path, year, crawled_at, downloaded, expected):
+        """Tests that only complete year pages from past years are skipped"""
+        # setup
+        manifest = CrawlManifest(tmp_path / "manifest.jsonl")
+        links = {f"{year}_01_09": "https://www.fake-path.com"}
+        manifest.years[year] = {
+            "type": "year",
+            "crawled_at": crawled_at,
+            "links": links,
+        }
+        if downloaded:
+            manifest.meetings[f"{year}_01_09"] = {"type": "meeting"}
+
+        # execution
+        settled = manifest.is_settled(year)
+
+        # validation
+        assert settled is expected
+
+    def test_compact(self, tmp_path):
+        """Tests that compacting keeps only the latest record for each year"""
+        # setup
+        path = tmp_path / "manifest.jsonl"
+        manifest = CrawlManifest(path)
+        manifest.record_year("2020", {"2020_01_15": "old"})
+        manifest.record_year("2020", {"2020_01_15": "new"})
+
+        # execution
+        manifest.compact()
+
+        # validation
+        assert len(path.read_text().splitlines()) == 1
+        assert CrawlManifest(path).years["2020"]["links"] == {"2020_01_15": "new"}
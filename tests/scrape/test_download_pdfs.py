@@ -0,0 +1,44 @@
+import time
+import pytest
+from pathlib import Path
+
+from tests.scrape.scrape_data import MEETING_LINKS
+
+import common.scrape_utils as scrape_utils
+from common.scrape_utils import download_pdfs
+
+
+def fake_download_pdf(year, date, url, dir=None, session=None, manifest=None):
+    """Stands in for download_pdf() so the tests don't need the live site,
+    finishing the earlier meetings last to scramble completion order"""
+    time.sleep(0.05 if date.endswith("15") or date.endswith("09") else 0)
+    if date == "2019_01_16":
+        return False, f"An error occurred requesting {url}", None
+    return True, f"Successfully saved pdf from {url}", Path(year) / (date + ".pdf")
+
+
+class TestDownloadPDFs:
+    """Tests download_pdfs() which downloads each of the pdfs returned by
+    check_missing_pdfs(), optionally several at a time
+    """
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_download_pdfs(self, monkeypatch, capsys, workers):
+        """Tests that the serial and concurrent modes return the same
+        downloads and report the same errors"""
+        # setup
+        monkeypatch.setattr(scrape_utils, "download_pdf", fake_download_pdf)
+        expected = {
+            "2020": ["2020_01_15.pdf", "2020_01_22.pdf"],
+            "2019": ["2019_01_09.pdf"],
+        }
+
+        # execution
+        output = download_pdfs(MEETING_LINKS, workers=workers)
+        printed = capsys.readouterr().out
+
+        # validation
+        assert output == expected
+        assert list(output) == list(expected)
+        assert "An error occurred requesting" in printed
+        assert "Wrote 3 pdf files to local repo." in printed
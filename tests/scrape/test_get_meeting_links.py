@@ -6,7 +6,7 @@ from copy import deepcopy
 
 from tests.scrape.scrape_data import HTML_TEXT, LINKS_2017
 
-from common.scrape_utils import get_meeting_links, get_boe_pdfs
+from common.scrape_utils import get_meeting_links, get_boe_pdfs, LINK_STRAINER
 
 
 class TestGetMeetingLinks:
@@ -32,3 +32,15 @@ class TestGetMeetingLinks:
 
         # validation
         assert output == expected
+
+    def test_anchors_only(self):
+        """Tests that parsing only the anchor tags finds the same links"""
+        # setup
+        expected = LINKS_2017
+        soup = BeautifulSoup(HTML_TEXT, "html.parser", parse_only=LINK_STRAINER)
+
+        # execution
+        output = get_meeting_links(soup, url="https://www.google.com")
+
+        # validation
+        assert output == expected
@@ -0,0 +1,150 @@
+import pytest
+
+from tests.scrape.scrape_data import HTML_TEXT, YEAR_LINKS
+
+from common.cache_utils import PageCache
+from common.scrape_utils import get_page_links, get_year_links
+
+
+class FakeResponse:
+    """Stands in for the response to a page request"""
+
+    def __init__(self, status_code, text="", headers=None, reason="OK"):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.reason = reason
+
+
+class FakeSession:
+    """Returns a queue of responses and records the headers of each request"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None):
+        self.sent.append(headers)
+        return self.responses.pop(0)
+
+
+class TestGetPageLinks:
+    """Tests get_page_links() which requests a page conditionally and reuses
+    the cached links when the page hasn't changed
+    """
+
+    url = "https://comptroller.baltimorecity.gov/boe/meetings/minutes"
+    validators = {"etag": '"abc123"', "last-modified": "Wed, 15 Jan 2020 GMT"}
+
+    def test_not_modified(self, tmp_path):
+        """Tests that a 304 response returns the cached links without parsing"""
+        # setup
+        cache = PageCache(tmp_path)
+        session = FakeSession(
+            [FakeResponse(200, HTML_TEXT, self.validators), FakeResponse(304)]
+        )
+        parsed = []
+
+        def get_links(soup):
+            parsed.append(soup)
+            return get_year_links(soup)
+
+        # execution
+        first = get_page_links(self.url, get_links, session, cache)
+        second = get_page_links(self.url, get_links, session, cache)
+
+        # validation
+        assert first[0] and second[0]
+        assert first[2] == second[2] == YEAR_LINKS
+        assert len(parsed) == 1
+        assert session.sent == [
+            {},
+            {
+                "If-None-Match": '"abc123"',
+                "If-Modified-Since": "Wed, 15 Jan 2020 GMT",
+            },
+        ]
+
+    def test_evicted_during_request(self, tmp_path):
+        """Tests that a 304 returns the links the request was made with when
+        the entry expires or is evicted while the page is requested"""
+        # setup
+        cache = PageCache(tmp_path)
+        cache.put(self.url, self.validators, YEAR_LINKS)
+
+        class EvictingSession(FakeSession):
+            def get(self, url, headers=None):
+                cache.clear()  # e.g. another process evicted the entry
+                return super().get(url, headers)
+
+        session = EvictingSession([FakeResponse(304)])
+
+        # execution
+        passed, _, links = get_page_links(self.url, get_year_links, session, cache)
+
+        # validation
+        assert passed
+        assert links == YEAR_LINKS
+        assert session.sent[0]["If-None-Match"] == '"abc123"'
+        assert cache.get(self.url)["links"] == YEAR_LINKS
+
+    def test_request_fail(self, tmp_path):
+        """Tests that an error response is reported and not cached"""
+        # setup
+        cache = PageCache(tmp_path)
+        session = FakeSession([FakeResponse(404, reason="Not Found")])
+        expected = f"Encountered an issue accessing '{self.url}': Not Found"
+
+        # execution
+        passed, message, links = get_page_links(
+            self.url, get_year_links, session, cache
+        )
+
+        # validation
+        assert not passed
+        assert message == expected
+        assert links is None
+        assert cache.get(self.url) is None
+
+
+class TestPageCache:
+    """Tests the expiry and eviction of the PageCache"""
+
+    def test_ttl(self, tmp_path):
+        """Tests that expired entries are dropped rather than revalidated"""
+        # setup
+        cache = PageCache(tmp_path, ttl=-1)
+        cache.put("https://www.fake-path.com", {"etag": '"abc"'}, {"2020": "x"})
+
+        # execution
+        headers = cache.conditional_headers("https://www.fake-path.com")
+
+        # validation
+        assert headers == {}
+        assert not any(tmp_path.iterdir())
+
+    def test_touch_missing(self, tmp_path):
+        """Tests that touching a url that isn't cached finds nothing"""
+        # setup
+        cache = PageCache(tmp_path)
+
+        # execution
+        links = cache.touch("https://www.fake-path.com")
+
+        # validation
+        assert links is None
+        assert not any(tmp_path.iterdir())
+
+    def test_max_entries(self, tmp_path):
+        """Tests that the oldest entries are evicted past max_entries"""
+        # setup
+        cache = PageCache(tmp_path, max_entries=2)
+        urls = [f"https://www.fake-path.com/{i}" for i in range(3)]
+
+        # execution
+        for i, url in enumerate(urls):
+            cache.put(url, {}, {"page": i})
+
+        # validation
+        assert len(list(tmp_path.glob("*.json"))) == 2
+        assert cache.get(urls[2])["links"] == {"page": 2}
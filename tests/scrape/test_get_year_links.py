@@ -3,7 +3,7 @@ from pprint import pprint
 
 from tests.scrape.scrape_data import HTML_TEXT, YEAR_LINKS
 
-from common.scrape_utils import get_year_links
+from common.scrape_utils import get_year_links, LINK_STRAINER
 
 
 class TestGetYearLinks:
@@ -29,3 +29,11 @@ class TestGetYearLinks:
         print("OUTPUT")
         pprint(output)
         assert output == expected
+
+    def test_anchors_only(self):
+        """Tests that parsing only the anchor tags finds the same year links"""
+        soup = BeautifulSoup(HTML_TEXT, "html.parser", parse_only=LINK_STRAINER)
+
+        output = get_year_links(soup)
+
+        assert output == YEAR_LINKS
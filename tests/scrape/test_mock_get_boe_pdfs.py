@@ -0,0 +1,83 @@
+from common.cache_utils import PageCache
+from common.manifest_utils import CrawlManifest
+from common.scrape_utils import get_boe_pdfs, ScraperSession, RateLimiter
+
+
+def fast_session():
+    """Session whose rate limit is well above what the mock site can serve"""
+    return ScraperSession(backoff_factor=0, limiter=RateLimiter(rate=1000))
+
+
+def expected_downloads(site):
+    return {
+        year: [date + ".pdf" for date in meetings]
+        for year, meetings in site.meeting_links().items()
+    }
+
+
+class TestGetBoePDFsMockSite:
+    """Tests get_boe_pdfs() end to end against a local MockComptrollerSite
+    instead of the live website
+    """
+
+    def test_full_crawl(self, mock_site, tmp_path):
+        """Tests that every meeting on the site is downloaded concurrently"""
+        # execution
+        output = get_boe_pdfs(
+            mock_site.minutes_url,
+            mock_site.base_url,
+            workers=4,
+            session=fast_session(),
+            dir=tmp_path,
+        )
+
+        # validation
+        assert output == expected_downloads(mock_site)
+        assert mock_site.stats["pages"] == 1 + len(mock_site.years)
+        pdf_file = tmp_path / "2019" / "2019_01_02.pdf"
+        assert pdf_file.read_bytes().startswith(b"%PDF")
+
+    def test_incremental_crawl(self, mock_site, tmp_path):
+        """Tests that a second run with a cache and manifest downloads nothing
+        and only revalidates the landing page, since every year on the site
+        is in the past and fully downloaded"""
+        # setup
+        cache = PageCache(tmp_path / "cache")
+        manifest = CrawlManifest(tmp_path / "manifest.jsonl")
+        args = (mock_site.minutes_url, mock_site.base_url)
+        kwargs = {"session": fast_session(), "cache": cache, "manifest": manifest}
+        get_boe_pdfs(*args, dir=tmp_path, **kwargs)
+        mock_site.reset_stats()
+
+        # execution
+        output = get_boe_pdfs(*args, dir=tmp_path, **kwargs)
+
+        # validation
+        assert output is None
+        assert mock_site.stats["pages"] == 0
+        assert mock_site.stats["not_modified"] == 1  # only the landing page
+        assert mock_site.stats["bytes"] == 0
+
+    def test_errors_and_throttling(self, mock_site, tmp_path):
+        """Tests that injected server errors and 429s are retried"""
+        # setup
+        mock_site.error_rate = 0.3
+        mock_site.max_rate = 15
+        mock_site.retry_after = 1
+        session = ScraperSession(
+            retries=6, backoff_factor=0, limiter=RateLimiter(rate=1000)
+        )
+
+        # execution
+        output = get_boe_pdfs(
+            mock_site.minutes_url,
+            mock_site.base_url,
+            workers=4,
+            session=session,
+            dir=tmp_path,
+        )
+
+        # validation
+        assert output == expected_downloads(mock_site)
+        assert mock_site.stats["errors"] > 0
+        assert mock_site.stats["throttled"] > 0
@@ -0,0 +1,104 @@
+import pytest
+
+from common.manifest_utils import CrawlManifest
+from common.scrape_utils import check_pdf_changed, revalidate_pdfs
+
+OLD_PDF = b"%PDF-1.4 original minutes"
+NEW_PDF = b"%PDF-1.4 corrected minutes"
+
+
+class FakeResponse:
+    """Stands in for the response to a pdf request"""
+
+    def __init__(self, content, headers):
+        self.content = content
+        self.status_code = 200
+        self.headers = {"content-type": "application/pdf", **headers}
+        self.headers["content-length"] = str(len(content))
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    """Serves the current version of each pdf and counts the downloads"""
+
+    def __init__(self, pdfs):
+        self.pdfs = pdfs
+        self.downloads = []
+
+    def head(self, url, allow_redirects=True):
+        content, headers = self.pdfs[url]
+        return FakeResponse(content, headers)
+
+    def get(self, url, headers=None, stream=False):
+        self.downloads.append(url)
+        content, headers = self.pdfs[url]
+        return FakeResponse(content, headers)
+
+
+class TestRevalidatePDFs:
+    """Tests revalidate_pdfs() which downloads again only the pdfs that
+    changed upstream and flags the revised meetings in the manifest
+    """
+
+    def test_revalidate_pdfs(self, tmp_path):
+        """Tests that only the republished pdf is fetched and flagged"""
+        # setup
+        manifest = CrawlManifest(tmp_path / "manifest.jsonl")
+        pdfs = {
+            "https://www.fake-path.com/2020-01-15": (OLD_PDF, {"etag": '"a"'}),
+            "https://www.fake-path.com/2020-01-22": (OLD_PDF, {"etag": '"b"'}),
+        }
+        for url, (content, headers) in pdfs.items():
+            date = "2020_" + url[-5:].replace("-", "_")
+            pdf_file = tmp_path / "2020" / (date + ".pdf")
+            pdf_file.parent.mkdir(exist_ok=True)
+            pdf_file.write_bytes(content)
+            manifest.record_download("2020", date, url, pdf_file, headers)
+        pdfs["https://www.fake-path.com/2020-01-22"] = (NEW_PDF, {"etag": '"c"'})
+        session = FakeSession(pdfs)
+
+        # execution
+        revised = revalidate_pdfs(manifest, dir=tmp_path, session=session)
+
+        # validation
+        assert revised == {"2020": ["2020_01_22"]}
+        assert session.downloads == ["https://www.fake-path.com/2020-01-22"]
+        assert (tmp_path / "2020" / "2020_01_22.pdf").read_bytes() == NEW_PDF
+        assert manifest.meetings["2020_01_22"]["etag"] == '"c"'
+        assert list(CrawlManifest(manifest.path).revisions) == ["2020_01_22"]
+
+    @pytest.mark.parametrize(
+        "headers,expected",
+        [
+            ({"etag": '"a"', "last-modified": "Thu, 16 Jan 2020 GMT"}, False),
+            ({"etag": '"b"'}, True),
+            ({"last-modified": "Thu, 16 Jan 2020 GMT"}, True),
+            ({"last-modified": "Wed, 15 Jan 2020 GMT"}, False),
+        ],
+    )
+    def test_check_pdf_changed(self, headers, expected):
+        """Tests that the etag takes precedence over the other validators"""
+        # setup
+        url = "https://www.fake-path.com/2020-01-15"
+        record = {
+            "url": url,
+            "size": len(OLD_PDF),
+            "etag": '"a"' if "etag" in headers else None,
+            "last_modified": "Wed, 15 Jan 2020 GMT",
+        }
+        session = FakeSession({url: (OLD_PDF, headers)})
+
+        # execution
+        passed, error, changed = check_pdf_changed(record, session=session)
+
+        # validation
+        assert passed
+        assert changed is expected
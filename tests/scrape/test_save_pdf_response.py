@@ -0,0 +1,152 @@
+import json
+import pytest
+import requests
+
+from common.scrape_utils import download_pdf, resume_headers, save_pdf_response
+
+PDF_BYTES = b"%PDF-1.4\n" + b"x" * 1000 + b"\n%%EOF"
+URL = "https://www.fake-path.com/2020-01-15"
+
+
+class FakeResponse:
+    """Stands in for a streamed requests.Response"""
+
+    def __init__(self, content, headers=None, status_code=200, fail_after=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {"content-type": "application/pdf", "etag": '"v1"'}
+        self.headers["content-length"] = str(len(content))
+        self.headers.update(headers or {})
+        self.fail_after = fail_after
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        chunk_size = min(chunk_size, 256)  # splits the body like a slow network
+        for i in range(0, len(self.content), chunk_size):
+            if self.fail_after is not None and i >= self.fail_after:
+                raise requests.exceptions.ChunkedEncodingError("connection reset")
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+
+class RangeSession:
+    """Serves PDF_BYTES, honouring Range requests if supports_range is set,
+    and drops the connection part way through the first request"""
+
+    def __init__(self, supports_range=True):
+        self.supports_range = supports_range
+        self.sent = []
+
+    def get(self, url, headers=None, stream=False):
+        headers = headers or {}
+        self.sent.append(headers)
+        fail_after = 512 if len(self.sent) == 1 else None
+        if "Range" in headers and self.supports_range:
+            start = int(headers["Range"][6:-1])
+            content_range = f"bytes {start}-{len(PDF_BYTES) - 1}/{len(PDF_BYTES)}"
+            return FakeResponse(
+                PDF_BYTES[start:], {"content-range": content_range}, 206
+            )
+        return FakeResponse(PDF_BYTES, fail_after=fail_after)
+
+
+class TestSavePDFResponse:
+    """Tests save_pdf_response() which streams a downloaded pdf to a .part
+    file and only moves it into place once the download has been checked
+    """
+
+    def test_success(self, tmp_path):
+        """Tests that a complete pdf is written in chunks and renamed"""
+        # setup
+        pdf_file = tmp_path / "2020_01_15.pdf"
+
+        # execution
+        passed, error = save_pdf_response(
+            FakeResponse(PDF_BYTES), pdf_file, URL, chunk_size=64
+        )
+
+        # validation
+        assert passed
+        assert error is None
+        assert pdf_file.read_bytes() == PDF_BYTES
+        assert [p.name for p in tmp_path.iterdir()] == ["2020_01_15.pdf"]
+
+    @pytest.mark.parametrize(
+        "response,expected",
+        [
+            (FakeResponse(PDF_BYTES, fail_after=256), "The download was interrupted"),
+            (
+                FakeResponse(PDF_BYTES, {"content-length": "99999"}),
+                f"Expected 99999 bytes but received {len(PDF_BYTES)}",
+            ),
+        ],
+    )
+    def test_partial(self, tmp_path, response, expected):
+        """Tests that a truncated download is kept as a .part file along
+        with the validators needed to resume it"""
+        # setup
+        pdf_file = tmp_path / "2020_01_15.pdf"
+
+        # execution
+        passed, error = save_pdf_response(response, pdf_file, URL, chunk_size=64)
+
+        # validation
+        assert not passed
+        assert error.startswith(expected)
+        assert not pdf_file.exists()
+        assert resume_headers(pdf_file, URL)["If-Range"] == '"v1"'
+
+    def test_not_pdf(self, tmp_path):
+        """Tests that a download that isn't a pdf leaves nothing behind"""
+        # setup
+        pdf_file = tmp_path / "2020_01_15.pdf"
+
+        # execution
+        passed, error = save_pdf_response(FakeResponse(b"<html></html>"), pdf_file)
+
+        # validation
+        assert not passed
+        assert error == "The downloaded file is not a pdf"
+        assert not any(tmp_path.iterdir())
+
+
+class TestResumeDownload:
+    """Tests that download_pdf() resumes interrupted downloads with Range
+    requests and falls back to downloading the whole pdf"""
+
+    @pytest.mark.parametrize("supports_range", [True, False])
+    def test_resume(self, tmp_path, supports_range):
+        """Tests that the second attempt completes the pdf either way"""
+        # setup
+        session = RangeSession(supports_range)
+        pdf_file = tmp_path / "2020" / "2020_01_15.pdf"
+
+        # execution
+        first = download_pdf("2020", "2020_01_15", URL, tmp_path, session)
+        second = download_pdf("2020", "2020_01_15", URL, tmp_path, session)
+
+        # validation
+        assert not first[0]
+        assert second[0]
+        assert pdf_file.read_bytes() == PDF_BYTES
+        assert session.sent[1] == {"Range": "bytes=512-", "If-Range": '"v1"'}
+        assert [p.name for p in pdf_file.parent.iterdir()] == ["2020_01_15.pdf"]
+
+    def test_no_validator(self, tmp_path):
+        """Tests that a partial file without a validator isn't resumed"""
+        # setup
+        pdf_file = tmp_path / "2020_01_15.pdf"
+        (tmp_path / "2020_01_15.pdf.part").write_bytes(PDF_BYTES[:512])
+        with open(tmp_path / "2020_01_15.pdf.part.json", "w") as f:
+            json.dump({"url": URL, "etag": 'W/"weak"', "last_modified": None}, f)
+
+        # execution
+        headers = resume_headers(pdf_file, URL)
+
+        # validation
+        assert headers == {}
+        assert not any(tmp_path.iterdir())
@@ -0,0 +1,289 @@
+import gc
+import threading
+import time
+import pytest
+import requests
+
+import common.scrape_utils as scrape_utils
+from common.scrape_utils import (
+    ScraperSession,
+    RateLimiter,
+    download_pdf,
+    get_session,
+    parse_retry_after,
+    PAUSE_STATUSES,
+    RETRY_STATUSES,
+    TIMEOUT,
+)
+
+
+class FakeResponse:
+    """Stands in for the response returned by requests.Session.request"""
+
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def close(self):
+        pass
+
+
+class TestScraperSession:
+    """Tests ScraperSession which pools connections, retries transient
+    failures and applies a default timeout to the scraper's requests
+    """
+
+    def test_retry_config(self):
+        """Tests that both http and https requests share the retry policy"""
+        # execution
+        session = ScraperSession(retries=5, backoff_factor=2, pool_size=4)
+
+        # validation
+        for prefix in ["https://", "http://"]:
+            adapter = session.get_adapter(prefix + "comptroller.baltimorecity.gov")
+            assert adapter.max_retries.total == 5
+            assert adapter.max_retries.backoff_factor == 2
+            assert not adapter.max_retries.respect_retry_after_header
+            assert set(adapter.max_retries.status_forcelist) == (
+                set(RETRY_STATUSES) - set(PAUSE_STATUSES)
+            )
+            assert adapter._pool_maxsize == 4
+
+    def test_default_timeout(self, monkeypatch):
+        """Tests that requests get the session timeout unless one is passed"""
+        # setup
+        sent = []
+
+        def fake_request(self, method, url, **kwargs):
+            sent.append(kwargs["timeout"])
+            return FakeResponse()
+
+        monkeypatch.setattr(requests.Session, "request", fake_request)
+        session = ScraperSession(timeout=3)
+
+        # execution
+        session.get("https://www.fake-path.com")
+        session.get("https://www.fake-path.com", timeout=7)
+
+        # validation
+        assert sent == [3, 7]
+
+    def test_retry_after(self, monkeypatch):
+        """Tests that a Retry-After header pauses the host in the limiter
+        before the request is retried, and that a 503 without one backs off"""
+        # setup
+        paused = []
+        limiter = RateLimiter()
+        monkeypatch.setattr(limiter, "pause", lambda url, s: paused.append((url, s)))
+        responses = [FakeResponse(429, {"retry-after": "2"}), FakeResponse(503)]
+        responses += [FakeResponse(200), FakeResponse(503), FakeResponse(503)]
+        monkeypatch.setattr(
+            requests.Session,
+            "request",
+            lambda self, method, url, **kwargs: responses.pop(0),
+        )
+        session = ScraperSession(backoff_factor=0.5, limiter=limiter)
+
+        # execution
+        retried = session.get("https://www.fake-path.com")
+        session.retries = 1
+        failed = session.get("https://www.fake-path.com")
+
+        # validation
+        assert retried.status_code == 200
+        assert failed.status_code == 503
+        assert [seconds for _, seconds in paused] == [2.0, 1.0, 0.5, 1.0]
+        assert limiter._host_state("https://www.fake-path.com")["in_flight"] == 0
+
+    def test_pause_host(self, mock_site, monkeypatch):
+        """Tests that a 429 from the server pauses every concurrent request to
+        the host, not only the one that got it, until they all succeed"""
+        # setup
+        mock_site.max_rate = 2
+        limiter = RateLimiter(rate=1000, burst=1000, max_in_flight=6)
+        pauses = []
+        pause = limiter.pause
+        monkeypatch.setattr(
+            limiter, "pause", lambda url, s: pauses.append(s) or pause(url, s)
+        )
+        session = ScraperSession(retries=5, limiter=limiter)
+        statuses = []
+        start = time.monotonic()
+
+        # execution
+        threads = [
+            threading.Thread(
+                target=lambda: statuses.append(session.get(mock_site.minutes_url))
+            )
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # validation
+        assert [r.status_code for r in statuses] == [200] * 6
+        assert pauses and set(pauses) == {1.0}
+        assert mock_site.stats["throttled"] <= 6
+        assert time.monotonic() - start >= 0.9
+
+    def test_stream_in_flight(self, mock_site):
+        """Tests that a streamed response holds its slot of the host's
+        max_in_flight until it's closed"""
+        # setup
+        limiter = RateLimiter(max_in_flight=1)
+        session = ScraperSession(limiter=limiter)
+        url = mock_site.meeting_links()["2018"]["2018_01_03"]
+
+        # execution
+        with session.get(url, stream=True) as response:
+            in_flight = limiter._host_state(url)["in_flight"]
+            response.content
+        closed = limiter._host_state(url)["in_flight"]
+        session.get(url).close()
+
+        # validation
+        assert in_flight == 1
+        assert closed == 0
+        assert limiter._host_state(url)["in_flight"] == 0
+
+    def test_missing_pdf_in_flight(self, mock_site, tmp_path):
+        """Tests that a pdf which 404s releases its slot of the host's
+        max_in_flight without waiting for the garbage collector, so the next
+        request to the host isn't blocked"""
+        # setup
+        limiter = RateLimiter(max_in_flight=1)
+        session = ScraperSession(limiter=limiter)
+        url = mock_site.base_url + "/files/missing.pdf"
+        next_url = mock_site.meeting_links()["2018"]["2018_01_03"]
+
+        # execution
+        gc.disable()
+        try:
+            passed, message, _ = download_pdf(
+                "2018", "2018_01_03", url, dir=tmp_path, session=session
+            )
+            released = limiter._host_state(url)["in_flight"]
+            if released == 0:  # the next request would block otherwise
+                session.get(next_url).close()
+        finally:
+            gc.enable()
+
+        # validation
+        assert not passed
+        assert "404" in message
+        assert released == 0
+        assert limiter._host_state(url)["in_flight"] == 0
+
+    def test_dropped_stream_in_flight(self, mock_site):
+        """Tests that a streamed response that is never closed releases its
+        slot as soon as it's dropped"""
+        # setup
+        limiter = RateLimiter(max_in_flight=1)
+        session = ScraperSession(limiter=limiter)
+        url = mock_site.meeting_links()["2018"]["2018_01_03"]
+
+        # execution
+        gc.disable()
+        try:
+            response = session.get(url, stream=True)
+            in_flight = limiter._host_state(url)["in_flight"]
+            del response
+        finally:
+            gc.enable()
+
+        # validation
+        assert in_flight == 1
+        assert limiter._host_state(url)["in_flight"] == 0
+
+
+class TestRateLimiter:
+    """Tests the RateLimiter which schedules the scraper's requests"""
+
+    url = "https://comptroller.baltimorecity.gov/minutes-2020"
+
+    def test_rate(self):
+        """Tests that requests beyond the burst are spaced out by the rate"""
+        # setup
+        limiter = RateLimiter(rate=20, burst=1, max_in_flight=10)
+        start = time.monotonic()
+
+        # execution
+        for _ in range(5):
+            limiter.acquire(self.url)
+            limiter.release(self.url)
+
+        # validation
+        assert time.monotonic() - start >= 4 / 20 * 0.9
+
+    def test_max_in_flight(self):
+        """Tests that no more than max_in_flight requests run at once"""
+        # setup
+        limiter = RateLimiter(rate=1000, burst=1000, max_in_flight=2)
+        lock = threading.Lock()
+        counts = {"current": 0, "max": 0}
+
+        def fetch():
+            limiter.acquire(self.url)
+            with lock:
+                counts["current"] += 1
+                counts["max"] = max(counts["max"], counts["current"])
+            time.sleep(0.02)
+            with lock:
+                counts["current"] -= 1
+            limiter.release(self.url)
+
+        # execution
+        threads = [threading.Thread(target=fetch) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # validation
+        assert counts["max"] == 2
+
+    def test_pause(self):
+        """Tests that a paused host isn't requested until the pause ends,
+        while other hosts are unaffected"""
+        # setup
+        limiter = RateLimiter(rate=1000, burst=1000)
+        limiter.pause(self.url, 0.2)
+        start = time.monotonic()
+
+        # execution
+        limiter.acquire("https://www.fake-path.com")
+        other_host = time.monotonic() - start
+        limiter.acquire(self.url)
+        same_host = time.monotonic() - start
+
+        # validation
+        assert other_host < 0.1
+        assert same_host >= 0.18
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("120", 120.0), ("-5", 0.0), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0), ("x", None)],
+)
+def test_parse_retry_after(value, expected):
+    """Tests parsing both the seconds and http date forms of Retry-After"""
+    assert parse_retry_after(value) == expected
+
+
+def test_get_session(monkeypatch):
+    """Tests that the shared session is created once and reused, while an
+    explicitly passed session always takes precedence"""
+    # setup
+    monkeypatch.setattr(scrape_utils, "_session", None)
+    custom = requests.Session()
+
+    # execution
+    shared = get_session()
+
+    # validation
+    assert isinstance(shared, ScraperSession)
+    assert shared.timeout == TIMEOUT
+    assert get_session() is shared
+    assert get_session(custom) is custom
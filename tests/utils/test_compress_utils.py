@@ -0,0 +1,109 @@
+import pickle
+import pytest
+
+from common.compress_utils import (
+    CODECS,
+    decompress_text,
+    train_dictionary,
+    TextCodec,
+    zstandard,
+)
+
+# input
+PAGES = [
+    f"BOARD OF ESTIMATES {day}/17/10 MINUTES UPON MOTION duly made and seconded, "
+    f"the Board approved and authorized execution of the agreement number {day}."
+    for day in range(1, 30)
+]
+
+
+class TestTextCodec:
+    """Tests the TextCodec which compresses text with a shared dictionary"""
+
+    def test_round_trip(self):
+        """Tests that text is decompressed to what was compressed"""
+        # setup
+        codec = TextCodec.train(PAGES)
+        text = "Café “quoted” — " + PAGES[0]
+
+        # execution
+        data = codec.compress(text)
+
+        # validation
+        assert isinstance(data, bytes)
+        assert codec.decompress(data) == text
+        assert decompress_text(data) == text
+
+    def test_dictionary(self):
+        """Tests that the dictionary holds the boilerplate shared by the
+        samples once, and makes pages that share it smaller"""
+        # setup
+        plain = TextCodec()
+        trained = TextCodec.train(PAGES[:20])
+
+        # execution
+        dictionary = train_dictionary(PAGES[:20]).decode("utf-8")
+        plain_size = sum(len(plain.compress(page)) for page in PAGES[20:])
+        trained_size = sum(len(trained.compress(page)) for page in PAGES[20:])
+
+        # validation
+        assert dictionary.count("duly made and seconded") == 1
+        assert trained_size < plain_size * 0.6
+
+    def test_keys(self):
+        """Tests that text passes through decompress_text() unless it's
+        compressed, and that each codec only reads its own text"""
+        # setup
+        codec = TextCodec.train(PAGES)
+        data = TextCodec().compress("text")
+
+        # validation
+        assert decompress_text("text") == "text"
+        assert decompress_text(None) is None
+        assert decompress_text(data) == "text"
+        with pytest.raises(ValueError):
+            codec.decompress(data)
+        with pytest.raises(ValueError):
+            decompress_text(b"\x00\x00\x00\x00text")
+        with pytest.raises(ValueError):
+            TextCodec("bz2")
+
+    @pytest.mark.skipif(zstandard is None, reason="zstandard isn't installed")
+    def test_zstd(self):
+        """Tests compressing with a zstd dictionary trained on the samples"""
+        # setup
+        codec = TextCodec.train(PAGES * 10, method="zstd", size=4096)
+
+        # execution
+        data = codec.compress(PAGES[0])
+
+        # validation
+        assert decompress_text(data) == PAGES[0]
+
+    @pytest.mark.parametrize(
+        "method",
+        [
+            "zlib",
+            pytest.param(
+                "zstd",
+                marks=pytest.mark.skipif(
+                    zstandard is None, reason="zstandard isn't installed"
+                ),
+            ),
+        ],
+    )
+    def test_pickle(self, method):
+        """Tests that a codec can be pickled, e.g. to send it to a worker
+        process, and is registered when it's unpickled"""
+        # setup
+        codec = TextCodec.train(PAGES * 10, method=method, size=4096, level=5)
+        data = codec.compress(PAGES[0])
+        CODECS.clear()
+
+        # execution
+        copy = pickle.loads(pickle.dumps(codec))
+
+        # validation
+        assert (copy.method, copy.level, copy.key) == (method, 5, codec.key)
+        assert decompress_text(data) == PAGES[0]
+        assert copy.compress(PAGES[0]) == data
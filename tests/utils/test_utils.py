@@ -2,6 +2,9 @@ import pytest
 
 from common.scrape_utils import MONTHS
 from common.utils import replace_chars, levenshtein_match, levenshtein
+from common.utils import TextNormalizer, NORMALIZER, REPLACEMENTS
+from common.utils import detect_profiles, get_normalizer
+from tests.parse.parse_data import RAW_TEXT
 
 alphabet = "abcdefghijklmnopqrstuvwxyz"
 
@@ -18,6 +21,100 @@ def test_replace_chars(text, expected):
     assert output == expected
 
 
+def chained_replace(text, replacement_list=REPLACEMENTS):
+    """Applies each replacement in order, the way replace_chars() used to"""
+    for current, new in replacement_list:
+        text = text.replace(current, new)
+    return text
+
+
+class TestTextNormalizer:
+    """Tests the TextNormalizer which applies a list of replacements in a
+    single compiled step"""
+
+    @pytest.mark.parametrize("year", ["2010", "2013"])
+    def test_fixtures(self, year):
+        """Tests that the raw text of the fixtures is cleaned as before"""
+        # input
+        raw_text = RAW_TEXT[year]
+
+        # validation
+        expected = chained_replace(" ".join(raw_text.split()))
+        assert NORMALIZER.normalize(raw_text) == expected
+
+    def test_every_replacement(self):
+        """Tests that chained replacements, such as Ž to ™ when ™ is
+        replaced by an earlier entry, keep their sequential result"""
+        # input
+        text = " ".join(old for old, _ in REPLACEMENTS) + " ™Ž –Ð"
+
+        # validation
+        assert NORMALIZER.replace(text) == chained_replace(text)
+        assert NORMALIZER.replace("Ž™") == "™'"
+        assert NORMALIZER.replace("–Ð") == "…–"
+
+    @pytest.mark.parametrize(
+        "replacement_list,text",
+        [
+            ([("a", "b"), ("b", "a")], "abba"),
+            ([("a", "bc"), ("c", "a"), ("b", "d")], "abcabc"),
+            ([("a", "aa"), ("a", "b")], "aba"),
+            ([("ab", "x"), ("x", "ab")], "abxab"),
+            ([("c", "ed"), ("e", "d"), ("d", "dc")], "cde"),
+        ],
+    )
+    def test_compose(self, replacement_list, text):
+        """Tests lists that chain into each other or use longer sources"""
+        # execution
+        normalizer = TextNormalizer(replacement_list)
+
+        # validation
+        assert normalizer.replace(text) == chained_replace(text, replacement_list)
+        assert replace_chars(text, replacement_list) == normalizer.replace(text)
+
+
+class TestReplacementProfiles:
+    """Tests detect_profiles() and get_normalizer() which apply only the
+    replacements for the ways a document is known to be misread"""
+
+    @pytest.mark.parametrize(
+        "text,producer,expected",
+        [
+            ("Bernard C. ﬁJackﬂ Young", None, ("pdfdoc",)),
+            ("the artist™s studio", "Acrobat Distiller 7.0.5 (Windows)", ("pdfdoc",)),
+            ("Õ2009Ð2010Ó and ˜scal", None, ("ligatures", "macroman")),
+            ("the artist™s studio", "Mac OS X 10.6.8 Quartz PDFContext", ("macroman",)),
+            ("the artist’s studio", None, ()),
+        ],
+    )
+    def test_detect_profiles(self, text, producer, expected):
+        assert detect_profiles(text, producer) == expected
+
+    def test_conflicting_entries(self):
+        """Tests that ™ and – are only replaced in documents that misread
+        them, unlike the full table of replacements"""
+        # input
+        text = "ÒFY 2009–2010Ó Trademark™"
+
+        # execution
+        output = get_normalizer(detect_profiles(text)).replace(text)
+
+        # validation
+        assert output == '"FY 2009–2010" Trademark™'
+        assert replace_chars(text) == '"FY 2009…2010" Trademark\''
+
+    def test_all_profiles(self):
+        """Tests that every profile together matches the full table"""
+        # input
+        text = " ".join(old for old, _ in REPLACEMENTS)
+
+        # execution
+        normalizer = get_normalizer(("pdfdoc", "ligatures", "macroman"))
+
+        # validation
+        assert normalizer.replace(text) == replace_chars(text)
+
+
 @pytest.mark.parametrize(
     "word_a,word_b,expected_distance",
     [